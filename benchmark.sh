@@ -6,7 +6,7 @@ fi
 PYTHON=$PYTHON
 ROOT=$(cd `dirname $0`; pwd)
 TESTCASE=$HOME/testcase
-export PYTHONPATH=$ROOT/hachoir-core:$ROOT/hachoir-parser:$ROOT/hachoir-metadata:$PYTHONPATH
+export PYTHONPATH=$ROOT/hachoir-core:$ROOT/hachoir-parser:$ROOT/hachoir-metadata:$ROOT/hachoir-regex:$ROOT/hachoir-subfile:$PYTHONPATH
 
 function prepare_benchmark
 {
@@ -28,3 +28,19 @@ prepare_benchmark "hachoir-metadata: set A (mp3, wav, png, au, mkv)"
     sheep_on_drugs.mp3 KDE_Click.wav logo-Kubuntu.png \
     audio_8khz_8bit_ulaw_4s39.au flashmob.mkv 10min.mkv)
 
+
+prepare_benchmark "import hachoir_parser (20 processes)"
+time (for i in `seq 20`; do
+    $PYTHON -OO -c "import hachoir_parser"
+done)
+
+prepare_benchmark "createParser(): png picture (20 processes)"
+time (for i in `seq 20`; do
+    $PYTHON -OO -c "from hachoir_parser import createParser; createParser(u'$TESTCASE/logo-Kubuntu.png')"
+done)
+
+prepare_benchmark "hachoir-subfile: magic search (random, zeros, disk image)"
+$PYTHON -OO $ROOT/hachoir-subfile/bench_magic.py $TESTCASE/dell8.fat16
+
+prepare_benchmark "hachoir-core: searchBytes() (chunks, needles, reverse, bits)"
+$PYTHON -OO $ROOT/hachoir-core/bench_search.py
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks of InputStream.searchBytes(): compare the previous
+implementation (4 KB reads and a sliding buffer) to the chunked search on
+string, memory mapped and file streams, and benchmark searches of multiple
+needles, reverse searches (rsearchBytes) and bit-granular searches.
+
+Usage: bench_search.py
+"""
+
+from hachoir_core import config
+from hachoir_core.endian import BIG_ENDIAN
+from hachoir_core.stream import StringInputStream, FileInputStream
+from tempfile import mkstemp
+from time import time
+import os
+
+SIZE = 16*1024*1024   # Size of the random data (16 MB)
+LOOPS = 3
+NEEDLE = "\0hachoir\0"
+
+def legacySearchBytes(stream, needle, start_address=0, end_address=None):
+    """
+    InputStream.searchBytes() of hachoir-core 1.3.3
+    """
+    length = len(needle)
+    size = max(3 * length, 4096)
+    buffer = ''
+    if stream.size and (end_address is None or stream.size < end_address):
+        end_address = stream.size
+    while True:
+        if end_address is not None:
+            todo = (end_address - start_address) >> 3
+            if todo < size:
+                if todo <= 0:
+                    return None
+                size = todo
+        data = stream.readBytes(start_address, size)
+        start_address += 8 * size
+        buffer = buffer[len(buffer) - length + 1:] + data
+        found = buffer.find(needle)
+        if found >= 0:
+            return start_address + (found - len(buffer)) * 8
+
+def bench(func, count=1):
+    best = None
+    for loop in xrange(LOOPS):
+        start = time()
+        for index in xrange(count):
+            func()
+        duration = (time() - start) / count
+        if best is None or duration < best:
+            best = duration
+    return best
+
+def displayRate(name, duration, size=SIZE):
+    print "   %s: %.1f MB/sec" % (name, size / duration / (1024*1024))
+
+def displayTime(name, duration):
+    print "   %s: %.1f usec" % (name, duration * 1e6)
+
+def benchStream(name, stream):
+    print "%s stream (%s MB, needle not found):" % (name, SIZE // (1024*1024))
+    displayRate("legacy searchBytes()",
+        bench(lambda: legacySearchBytes(stream, NEEDLE)))
+    displayRate("searchBytes()",
+        bench(lambda: stream.searchBytes(NEEDLE)))
+
+    print "%s stream (short search, needle found after 20 bytes):" % name
+    address = 8 * (SIZE // 2)
+    end = address + 8 * 100
+    displayTime("legacy searchBytes()",
+        bench(lambda: legacySearchBytes(stream, "\n", address, end), 1000))
+    displayTime("searchBytes()",
+        bench(lambda: stream.searchBytes("\n", address, end), 1000))
+
+def benchNeedles(stream):
+    print "Two needles (first found at the end of the stream):"
+    def twoSearches():
+        stream.searchBytesLength("\r", False)
+        stream.searchBytesLength("\n", False)
+    displayRate("two searchBytesLength() calls", bench(twoSearches))
+    displayRate("one searchBytesLength() call",
+        bench(lambda: stream.searchBytesLength(("\r", "\n"), False)))
+
+def benchReverse(stream):
+    print "Last occurrence (trailer, 1 KB before the end):"
+    def forward():
+        address = 0
+        last = None
+        while True:
+            address = stream.searchBytes("TRAILER", address)
+            if address is None:
+                return last
+            last = address
+            address += 8
+    displayTime("searchBytes() loop", bench(forward))
+    displayTime("rsearchBytes()",
+        bench(lambda: stream.rsearchBytes("TRAILER"), 100))
+
+def benchBits(stream):
+    print "Bit-granular search (needle not found):"
+    displayRate("searchBytes() at bit 3",
+        bench(lambda: stream.searchBytes(NEEDLE, 3, endian=BIG_ENDIAN)))
+
+def main():
+    data = os.urandom(SIZE).replace("\r", "").replace("\n", "")
+    data = data.replace("TRAILER", "")
+    data = data[:SIZE//2 + 20] + "\n" + data[SIZE//2 + 21:]
+    data = data[:-1024] + "TRAILER" + data[-1024 + 7:-2] + "\r\n"
+    fd, filename = mkstemp()
+    try:
+        os.write(fd, data)
+        os.close(fd)
+        benchStream("String", StringInputStream(data))
+        config.use_mmap = True
+        benchStream("Memory mapped file", FileInputStream(unicode(filename)))
+        config.use_mmap = False
+        benchStream("File", FileInputStream(unicode(filename)))
+
+        stream = StringInputStream(data)
+        benchNeedles(stream)
+        benchReverse(stream)
+        benchBits(stream)
+    finally:
+        os.unlink(filename)
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@ from hachoir_core.endian import BIG_ENDIAN, LITTLE_ENDIAN, MIDDLE_ENDIAN
 from hachoir_core.compatibility import reversed
 from itertools import chain, repeat
 from struct import calcsize, unpack, error as struct_error
+from array import array
+from sys import byteorder
+from binascii import hexlify, unhexlify
 
 def swap16(value):
     """
@@ -303,3 +306,89 @@ def str2long(data, endian):
         value += (byte << shift)
         shift += 8
     return value
+
+def _createArrayTypecode():
+    """
+    Create a dictionary (size in bytes, signed) => array typecode
+    """
+    typecode = {}
+    for code in "bBhHiIlL":
+        key = (array(code).itemsize, code.islower())
+        typecode.setdefault(key, code)
+    return typecode
+_array_typecode = _createArrayTypecode()
+_array_endian = {"little": LITTLE_ENDIAN, "big": BIG_ENDIAN}[byteorder]
+
+def str2array(data, size, signed, endian):
+    r"""
+    Convert raw data (type 'str') into integers of 'size' bytes. All
+    integers are decoded at once: the result is an array.array if the
+    machine has a matching type, or a list otherwise.
+
+    >>> list(str2array("\x01\x00\x02\x00", 2, False, LITTLE_ENDIAN))
+    [1, 2]
+    >>> list(str2array("\xff\xfe", 1, True, BIG_ENDIAN))
+    [-1, -2]
+    >>> list(str2array("\x00\x00\x01\x00\x00\x00\x00\x02", 4, False, BIG_ENDIAN)) == [256, 2]
+    True
+    >>> list(str2array("\x01\x02\x03\x04\x05\x06", 3, False, BIG_ENDIAN)) == [0x010203, 0x040506]
+    True
+    """
+    assert not (len(data) % size)
+    code = _array_typecode.get((size, signed))
+    if code and endian is not MIDDLE_ENDIAN:
+        values = array(code)
+        values.fromstring(data)
+        if endian is not _array_endian:
+            values.byteswap()
+        return values
+    if endian is not MIDDLE_ENDIAN and size in (1, 2, 4, 8):
+        code = {1: "B", 2: "H", 4: "I", 8: "Q"}[size]
+        if signed:
+            code = code.lower()
+        if endian is BIG_ENDIAN:
+            code = ">%u%s" % (len(data) // size, code)
+        else:
+            code = "<%u%s" % (len(data) // size, code)
+        return list(unpack(code, data))
+    values = []
+    sign = 1 << (size * 8 - 1)
+    for index in xrange(0, len(data), size):
+        value = str2long(data[index:index+size], endian)
+        if signed and sign <= value:
+            value -= sign << 1
+        values.append(value)
+    return values
+
+def alignBytes(data, shift, endian):
+    r"""
+    Get the bytes of raw data (type 'str') starting at the bit 'shift'
+    (1..7) of the first byte: return len(data)-1 bytes. Bits are read in
+    the order of 'endian', as InputStream.readBits() does.
+
+    >>> alignBytes("\x12\x34\x56", 4, BIG_ENDIAN)
+    '#E'
+    >>> alignBytes("\x12\x34\x56", 4, LITTLE_ENDIAN)
+    'Ac'
+    >>> alignBytes("\x80\x01", 1, BIG_ENDIAN)
+    '\x00'
+    >>> alignBytes("\x80\x01", 7, LITTLE_ENDIAN)
+    '\x03'
+    """
+    assert endian in (BIG_ENDIAN, LITTLE_ENDIAN)
+    assert 1 <= shift <= 7
+    size = len(data) - 1
+    if size <= 0:
+        return ""
+    if endian is LITTLE_ENDIAN:
+        data = data[::-1]
+    value = long(hexlify(data), 16)
+    if endian is BIG_ENDIAN:
+        value >>= 8 - shift
+    else:
+        value >>= shift
+    value &= (1 << (8 * size)) - 1
+    data = unhexlify("%0*x" % (2 * size, value))
+    if endian is LITTLE_ENDIAN:
+        data = data[::-1]
+    return data
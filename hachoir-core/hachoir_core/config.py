@@ -26,4 +26,11 @@ else:
 # Parser global options
 autofix = True            # Enable Autofix? see hachoir_core.field.GenericFieldSet
 check_padding_pattern = True   # Check padding fields pattern?
+stream_window = 1000      # Number of fields kept by GenericFieldSet.iterStream()
+
+# Stream options
+use_mmap = True           # Use mmap() to read regular files (see FileInputStream)
+io_cache_page_size = 1 << 16   # Size in bytes of an InputIOStream cache page
+io_cache_pages = 64       # Max. number of pages in InputIOStream cache (0: disable)
+io_cache_readahead = 8    # Max. number of pages read ahead by InputIOStream
 
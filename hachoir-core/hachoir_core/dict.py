@@ -154,6 +154,22 @@ class Dict(object):
             if index < item_index:
                 self._index[key] -= 1
 
+    def deleteFirst(self, count):
+        """
+        Delete the first count items.
+
+        >>> d=Dict( ((6, 'six'), (9, 'neuf'), (4, 'quatre')) )
+        >>> d.deleteFirst(2)
+        >>> d
+        {4: 'quatre'}
+        >>> d.index(4)
+        0
+        """
+        self._key_list = self._key_list[count:]
+        self._value_list = self._value_list[count:]
+        self._index = dict( (key, index)
+            for index, key in enumerate(self._key_list) )
+
     def insert(self, index, key, value):
         """
         Insert an item at specified position index.
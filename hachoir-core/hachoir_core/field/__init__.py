@@ -29,7 +29,10 @@ from hachoir_core.field.seekable_field_set import SeekableFieldSet, RootSeekable
 from hachoir_core.field.field_set import FieldSet
 from hachoir_core.field.static_field_set import StaticFieldSet
 from hachoir_core.field.parser import Parser
-from hachoir_core.field.vector import GenericVector, UserVector
+from hachoir_core.field.vector import (GenericVector, UserVector,
+    GenericIntegerArray,
+    Int8Array,  Int16Array,  Int24Array,  Int32Array,  Int64Array,
+    UInt8Array, UInt16Array, UInt24Array, UInt32Array, UInt64Array)
 
 # Complex types
 from hachoir_core.field.float import Float32, Float64, Float80
@@ -13,6 +13,7 @@ class RawBits(Field):
     """
     Unknown content with a size in bits.
     """
+    __slots__ = ()
     static_size = staticmethod(lambda *args, **kw: args[1])
 
     def __init__(self, parent, name, size, description=None):
@@ -43,7 +44,7 @@ class Bits(RawBits):
     @see: L{Bit}
     @see: L{RawBits}
     """
-    pass
+    __slots__ = ()
 
 class Bit(RawBits):
     """
@@ -51,6 +52,7 @@ class Bit(RawBits):
 
     @see: L{Bits}
     """
+    __slots__ = ()
     static_size = 1
 
     def __init__(self, parent, name, description=None):
@@ -16,6 +16,7 @@ class RawBytes(Field):
 
     @see: L{Bytes}
     """
+    __slots__ = ("_display",)
     static_size = staticmethod(lambda *args, **kw: args[1]*8)
 
     def __init__(self, parent, name, length, description="Raw data"):
@@ -27,7 +28,7 @@ class RawBytes(Field):
 
     def _createDisplay(self, human):
         max_bytes = config.max_byte_length
-        if type(self._getValue) is type(lambda: None):
+        if hasattr(self, "_Field__value"):
             display = self.value[:max_bytes]
         else:
             if self._display is None:
@@ -69,5 +70,5 @@ class Bytes(RawBytes):
 
     @see: L{RawBytes}
     """
-    pass
+    __slots__ = ()
 
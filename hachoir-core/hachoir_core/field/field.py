@@ -37,6 +37,12 @@ class MissingField(KeyError, FieldError):
         return u'Can\'t get field "%s" from %s' % (self.key, self.field.path)
 
 class Field(Logger):
+    # Attributes are stored in slots to reduce memory usage. Instance
+    # dictionary is only created if needed, eg. when textHandler() replaces
+    # createDisplay() method.
+    __slots__ = ("_parent", "_name", "_address", "_size", "_description",
+        "__value", "__display", "__raw_display", "__dict__")
+
     # static size can have two differents value: None (no static size), an
     # integer (number of bits), or a function which returns an integer.
     #
@@ -109,12 +115,16 @@ class Field(Logger):
     def createValue(self):
         raise NotImplementedError()
     def _getValue(self):
+        try:
+            return self.__value
+        except AttributeError:
+            pass
         try:
             value = self.createValue()
         except HACHOIR_ERRORS, err:
             self.error(_("Unable to create value: %s") % unicode(err))
             value = None
-        self._getValue = lambda: value
+        self.__value = value
         return value
     value = property(lambda self: self._getValue(), doc="Value of field")
 
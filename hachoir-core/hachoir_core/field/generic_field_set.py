@@ -41,10 +41,25 @@ class GenericFieldSet(BasicFieldSet):
     - create a class which inherite from FieldSet ;
     - write createFields() method using lines like:
          yield Class(self, "name", ...) ;
-    - and maybe set endian and static_size class attributes.
+    - and maybe set endian and static_size class attributes ;
+    - if the size can be read from a header, write createSize() method to
+      avoid creating all fields when only the size is needed.
     """
 
     _current_size = 0
+    _evicted = 0
+    _evicted_names = None
+    _skipped = False
+    _checkpoints = None
+    _indexed_fields = None
+
+    # Field index of the root parser (see hachoir_parser.field_index): fields
+    # are created from the index without parsing the previous fields
+    field_index = None
+
+    # Create a checkpoint each checkpoint_interval fields (None: disabled),
+    # see createCheckpoint()
+    checkpoint_interval = None
 
     def __init__(self, parent, name, stream, description=None, size=None):
         """
@@ -90,6 +105,9 @@ class GenericFieldSet(BasicFieldSet):
         self._field_generator = self.createFields()
         self._current_size = 0
         self._array_cache = {}
+        self._evicted = 0
+        self._skipped = False
+        self._indexed_fields = None
 
     def __str__(self):
         return '<%s path=%s, current_size=%s, current length=%s>' % \
@@ -102,15 +120,25 @@ class GenericFieldSet(BasicFieldSet):
         """
         if self._field_generator is not None:
             self._feedAll()
-        return len(self._fields)
+        return self._evicted + len(self._fields)
 
     def _getCurrentLength(self):
-        return len(self._fields)
+        return self._evicted + len(self._fields)
     current_length = property(_getCurrentLength)
 
+    def createSize(self):
+        """
+        Compute the field set size (in bits) without creating any field,
+        eg. by reading a header directly from the stream. Returns None if
+        the size is unknown: all fields are then created to compute it.
+        """
+        return None
+
     def _getSize(self):
         if self._size is None:
-            self._feedAll()
+            self._size = self.createSize()
+            if self._size is None:
+                self._feedAll()
         return self._size
     size = property(_getSize, doc="Size in bits, may create all fields to get size")
 
@@ -124,6 +152,9 @@ class GenericFieldSet(BasicFieldSet):
     def _checkSize(self, size, strict):
         field = self
         while field._size is None:
+            field._size = field.createSize()
+            if field._size is not None:
+                break
             if not field._parent:
                 assert self.stream.size is None
                 if not strict:
@@ -192,6 +223,9 @@ class GenericFieldSet(BasicFieldSet):
             field._name += "[]"
             self.setUniqueFieldName(field)
             self._fields.append(field._name, field)
+        if self.checkpoint_interval \
+        and not (self.current_length % self.checkpoint_interval):
+            self._addCheckpoint()
         if ask_stop:
             raise StopIteration()
 
@@ -212,8 +246,37 @@ class GenericFieldSet(BasicFieldSet):
         if field is None:
             if name in self._fields:
                 field = self._fields[name]
-            elif self._field_generator is not None and not const:
-                field = self._feedUntil(name)
+            elif not const:
+                if self.root.field_index is not None:
+                    field = self._getIndexedField(name)
+                    if field is not None:
+                        return field
+                if self._checkpoints:
+                    item = self._splitArrayItem(name)
+                    if item:
+                        key, number = item
+                        self._jumpToCheckpoint(self._findCheckpoint(
+                            lambda checkpoint: checkpoint[2].get(key, -1) < number))
+                if self._evicted:
+                    field = self._getEvictedField(name)
+                if field is None and self._field_generator is not None:
+                    field = self._feedUntil(name)
+        return field
+
+    def _getIndexedField(self, name):
+        """
+        Create the field 'name' from the field index of the root parser,
+        without parsing the previous fields. The field is kept in the field
+        set but is not added to its field list: it's not the field created
+        by parsing. Returns None if the field can't be created from the
+        index.
+        """
+        if self._indexed_fields is None:
+            self._indexed_fields = {}
+        elif name in self._indexed_fields:
+            return self._indexed_fields[name]
+        field = self.root.field_index.createField(self, name)
+        self._indexed_fields[name] = field
         return field
 
     def getField(self, key, const=True):
@@ -221,7 +284,19 @@ class GenericFieldSet(BasicFieldSet):
             if key < 0:
                 raise KeyError("Key must be positive!")
             if not const:
+                if self._checkpoints:
+                    self._jumpToCheckpoint(self._findCheckpoint(
+                        lambda checkpoint: checkpoint[0] <= key))
                 self.readFirstFields(key+1)
+            if key < self._evicted:
+                field = None
+                if not const:
+                    field = self._replayFields(lambda index, field: index == key,
+                        self._findCheckpoint(lambda checkpoint: checkpoint[0] <= key))
+                if field is None:
+                    raise MissingField(self, key)
+                return field
+            key -= self._evicted
             if len(self._fields.values) <= key:
                 raise MissingField(self, key)
             return self._fields.values[key]
@@ -372,6 +447,11 @@ class GenericFieldSet(BasicFieldSet):
         Create a generator to iterate on each field, may create new
         fields when needed
         """
+        if self._skipped or self._evicted:
+            # Fields were skipped by a checkpoint or evicted by
+            # iterStream(): parse again from the beginning to iterate on
+            # all fields
+            self.reset()
         try:
             done = 0
             while True:
@@ -399,6 +479,200 @@ class GenericFieldSet(BasicFieldSet):
                 for f in field:
                     yield f
 
+    def iterStream(self, window=None):
+        """
+        Create a generator to iterate on each field, as __iter__() does,
+        but without keeping all fields in memory: once yielded, a field is
+        evicted from the field set when it's not one of the last window
+        fields (default: config.stream_window). Memory usage is then
+        bounded whatever the number of fields.
+
+        Evicted fields can still be read (eg. fieldset["frame[3]"]), but
+        they are recreated by parsing the field set again from its
+        beginning. If fields were evicted, calling iterStream() again, or
+        iterating on the field set, restarts parsing.
+        """
+        if window is None:
+            window = config.stream_window
+        if self._evicted:
+            self.reset()
+        index = 0
+        while index < self.current_length or self.readMoreFields(1):
+            yield self._fields.values[index - self._evicted]
+            index += 1
+            self._evictFields(index, window)
+
+    def _evictFields(self, done, window):
+        """
+        Evict fields which have already been read (index < done), except
+        the last window ones. Fields are evicted by blocks of (at least)
+        window fields.
+        """
+        count = done - self._evicted - window
+        if count <= 0 or count < window:
+            return
+        # Remember name of evicted fields which are not array items
+        # (eg. "header") to be able to recreate them
+        if not self._evicted:
+            self._evicted_names = {}
+        for index, field in enumerate(self._fields.values[:count]):
+            name = field._name
+            if not(name.endswith("]")
+            and name[:name.rfind("[")] in self._field_array_count):
+                self._evicted_names[name] = self._evicted + index
+        self._fields.deleteFirst(count)
+        self._evicted += count
+
+    def _splitArrayItem(self, name):
+        """
+        Split the name of an array item: "frame[12]" => ("frame", 12).
+        Returns None if name is not an array item.
+        """
+        if not name.endswith("]"):
+            return None
+        pos = name.rfind("[")
+        try:
+            return name[:pos], int(name[pos+1:-1])
+        except ValueError:
+            return None
+
+    def _getEvictedField(self, name):
+        """
+        Recreate an evicted field using its name. Returns None if the field
+        is not an evicted field.
+        """
+        if self._evicted_names and name in self._evicted_names:
+            key = self._evicted_names[name]
+            return self._replayFields(lambda index, field: index == key,
+                self._findCheckpoint(lambda checkpoint: checkpoint[0] <= key))
+        item = self._splitArrayItem(name)
+        if item:
+            key, number = item
+            if self._field_array_count.get(key, -1) < number:
+                return None
+            return self._replayFields(lambda index, field: field._name == name,
+                self._findCheckpoint(lambda checkpoint:
+                    checkpoint[2].get(key, -1) < number))
+        if self._skipped:
+            # Fields between two checkpoints were skipped
+            return self._replayFields(lambda index, field: field._name == name,
+                end=self._evicted)
+        return None
+
+    def _replayFields(self, match, checkpoint=None, end=None):
+        """
+        Recreate an evicted field: parse the field set again from its
+        beginning (or from checkpoint) until match(index, field) returns
+        True. Returns the field, or None if no field matches (before the
+        index end). State of the field set is restored at exit.
+        """
+        state = (self._fields, self._field_generator, self._current_size,
+            self._size, self._field_array_count, self._array_cache,
+            self._evicted, self._evicted_names)
+        self._fields = Dict()
+        self._array_cache = {}
+        if checkpoint:
+            self._evicted, self._current_size, count, args = checkpoint
+            self._field_array_count = dict(count)
+            self._field_generator = self.resumeFields(*args)
+            if self._evicted_names is None:
+                self._evicted_names = {}
+        else:
+            self._evicted = 0
+            self._current_size = 0
+            self._field_array_count = {}
+            self._field_generator = self.createFields()
+        try:
+            window = config.stream_window
+            index = self._evicted
+            while (end is None or index < end) \
+            and (index < self.current_length or self.readMoreFields(1)):
+                field = self._fields.values[index - self._evicted]
+                if match(index, field):
+                    return field
+                index += 1
+                self._evictFields(index, window)
+            return None
+        finally:
+            (self._fields, self._field_generator, self._current_size,
+             self._size, self._field_array_count, self._array_cache,
+             self._evicted, self._evicted_names) = state
+
+    #
+    # Checkpoints
+    #
+    def createCheckpoint(self):
+        """
+        Create a checkpoint after the last created field: returns the
+        arguments (tuple) of resumeFields() to continue parsing from
+        there, or None if parsing can't be resumed at this position.
+
+        It's only called if checkpoint_interval is set.
+        """
+        return None
+
+    def resumeFields(self, *args):
+        """
+        Generator continuing createFields() from a checkpoint: the
+        arguments are the ones returned by createCheckpoint().
+        """
+        raise NotImplementedError()
+
+    def _addCheckpoint(self):
+        index = self.current_length
+        if self._checkpoints is None:
+            self._checkpoints = []
+        elif self._checkpoints and index <= self._checkpoints[-1][0]:
+            # Known checkpoint (fields are recreated)
+            return
+        args = self.createCheckpoint()
+        if args is not None:
+            self._checkpoints.append((index, self._current_size,
+                dict(self._field_array_count), args))
+
+    def _getCheckpoints(self):
+        return list(self._checkpoints or ())
+    checkpoints = property(_getCheckpoints, doc="List of checkpoints: "
+        "(field index, address, array counters, resumeFields() arguments)")
+
+    def setCheckpoints(self, checkpoints):
+        """
+        Set checkpoints of a previous parser of the same stream (see the
+        checkpoints attribute). The field set then directly jumps to the
+        nearest checkpoint when a far field is requested.
+        """
+        self._checkpoints = list(checkpoints)
+
+    def _findCheckpoint(self, before):
+        """
+        Find the last checkpoint for which before(checkpoint) is True.
+        Checkpoints are sorted: before() is True for the first checkpoints
+        and then False, a binary search is used.
+        """
+        if self._checkpoints:
+            index = lowerBound(self._checkpoints, before)
+            if index:
+                return self._checkpoints[index-1]
+        return None
+
+    def _jumpToCheckpoint(self, checkpoint):
+        """
+        Continue parsing from a checkpoint if it's after the last created
+        field: fields before it are evicted (or never created).
+        """
+        if not checkpoint \
+        or checkpoint[0] <= self.current_length \
+        or self._field_generator is None:
+            return
+        self._evictFields(self.current_length, 0)
+        if self._evicted_names is None:
+            self._evicted_names = {}
+        self._evicted, self._current_size, count, args = checkpoint
+        self._field_array_count = dict(count)
+        self._array_cache = {}
+        self._field_generator = self.resumeFields(*args)
+        self._skipped = True
+
     def _isDone(self):
         return (self._field_generator is None)
     done = property(_isDone, doc="Boolean to know if parsing is done or not")
@@ -484,7 +758,12 @@ class GenericFieldSet(BasicFieldSet):
         if address < self._current_size:
             i = lowerBound(self._fields.values, lambda x: x.address + x.size <= address)
             if i is not None:
-                return self._fields.values[i]
+                field = self._fields.values[i]
+                if field._address <= address or not (feed and self._evicted):
+                    return field
+                return self._replayFields(
+                    lambda index, field: address < field._address + field.size,
+                    self._findCheckpoint(lambda checkpoint: checkpoint[1] <= address))
         return None
 
     def writeFieldsIn(self, old_field, address, new_fields):
@@ -528,5 +807,8 @@ class GenericFieldSet(BasicFieldSet):
         return self._current_size
 
     def getFieldIndex(self, field):
-        return self._fields.index(field._name)
+        index = self._fields.index(field._name)
+        if index is None:
+            return None
+        return self._evicted + index
 
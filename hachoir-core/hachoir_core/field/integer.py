@@ -10,11 +10,15 @@ class GenericInteger(Bits):
     """
     Generic integer class used to generate other classes.
     """
+    __slots__ = ("_signed",)
+
     def __init__(self, parent, name, signed, size, description=None):
         if not (8 <= size <= 16384):
             raise FieldError("Invalid integer size (%s): have to be in 8..16384" % size)
         Bits.__init__(self, parent, name, size, description)
-        self.signed = signed
+        self._signed = signed
+
+    signed = property(lambda self: self._signed, doc="Signed integer?")
 
     def createValue(self):
         return self._parent.stream.readInteger(
@@ -23,7 +27,9 @@ class GenericInteger(Bits):
 def integerFactory(name, is_signed, size, doc):
     class Integer(GenericInteger):
         __doc__ = doc
+        __slots__ = ()
         static_size = size
+        signed = is_signed
         def __init__(self, parent, name, description=None):
             GenericInteger.__init__(self, parent, name, is_signed, size, description)
     cls = Integer
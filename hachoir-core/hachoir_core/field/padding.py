@@ -13,6 +13,7 @@ class PaddingBits(Bits):
     Optional arguments:
      * pattern (int): Content pattern, eg. 0 if all bits are set to 0
     """
+    __slots__ = ("pattern", "_display_pattern")
     static_size = staticmethod(lambda *args, **kw: args[1])
     MAX_SIZE = 128
 
@@ -56,7 +57,7 @@ class PaddingBytes(Bytes):
     Optional arguments:
      * pattern (str): Content pattern, eg. "\0" for nul bytes
     """
-
+    __slots__ = ("pattern", "_display_pattern")
     static_size = staticmethod(lambda *args, **kw: args[1]*8)
     MAX_SIZE = 4096
 
@@ -109,6 +110,7 @@ class NullBits(PaddingBits):
     Arguments:
      * nbits: Size of the field in bits
     """
+    __slots__ = ()
 
     def __init__(self, parent, name, nbits, description=None):
         PaddingBits.__init__(self, parent, name, nbits, description, pattern=0)
@@ -127,6 +129,8 @@ class NullBytes(PaddingBytes):
     Arguments:
      * nbytes: Size of the field in bytes
     """
+    __slots__ = ()
+
     def __init__(self, parent, name, nbytes, description=None):
         PaddingBytes.__init__(self, parent, name, nbytes, description, pattern="\0")
 
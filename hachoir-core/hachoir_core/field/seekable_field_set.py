@@ -33,6 +33,28 @@ class RootSeekableFieldSet(GenericFieldSet):
     def seekByte(self, address, relative=True):
         return self.seekBit(address*8, relative)
 
+    def searchTrailer(self, needle, max_size=None):
+        """
+        Search the last occurrence of needle (a string or a tuple of strings)
+        in the field set, or only in its last max_size bytes. The stream is
+        read backward from the end: use it to locate the trailer of formats
+        indexed from their end (eg. ZIP end of central directory), seek to
+        it and parse it first, and then seek to the indexed fields.
+
+        Return the address (in bits, relative to the field set) or None.
+        """
+        start = self.absolute_address
+        if self._size is not None:
+            end = start + self._size
+        else:
+            end = self.stream.size
+        if max_size is not None and end is not None:
+            start = max(start, end - max_size * 8)
+        address = self.stream.rsearchBytes(needle, start, end)
+        if address is None:
+            return None
+        return address - self.absolute_address
+
     def _fixLastField(self):
         """
         Try to fix last field when we know current field set size.
@@ -50,6 +72,14 @@ class RootSeekableFieldSet(GenericFieldSet):
             message.append("delete field %s" % field.path)
         assert self._current_size <= self._size
 
+        if self._evicted:
+            # Fields were evicted or skipped (see checkpoints): gaps are
+            # unknown
+            self.seekBit(self._size + self.absolute_address, relative=False)
+            if len(message) > 1:
+                self.warning("[Autofix] Fix parser error: " + ", ".join(message))
+            return []
+
         blocks = [(x.absolute_address, x.size) for x in self._fields]
         fields = []
         self._size = max(self._size, max(a+b for a,b in blocks) - self.absolute_address)
@@ -71,8 +101,8 @@ class RootSeekableFieldSet(GenericFieldSet):
         if self._size is None:
             if self._parent:
                 self._size = self._current_size
-
-        new_field = self._fixLastField()
+        if self._size is not None:
+            new_field = self._fixLastField()
         self._field_generator = None
         return new_field
 
@@ -109,7 +109,9 @@ class GenericString(Bytes):
 
     # Raw value: with prefix and suffix, not stripped,
     # and not converted to Unicode
-    _raw_value = None
+    __slots__ = ("_format", "_strip", "_truncate", "_charset",
+        "_character_size", "_content_size", "_content_offset", "_length",
+        "_raw_value")
 
     def __init__(self, parent, name, format, description=None,
     strip=None, charset=None, nbytes=None, truncate=None):
@@ -122,6 +124,7 @@ class GenericString(Bytes):
         self._format = format
         self._strip = strip
         self._truncate = truncate
+        self._raw_value = None
 
         # Check charset and compute character size in bytes
         # (or None when it's not possible to guess character size)
@@ -353,6 +356,7 @@ class GenericString(Bytes):
 def stringFactory(name, format, doc):
     class NewString(GenericString):
         __doc__ = doc
+        __slots__ = ()
         def __init__(self, parent, name, description=None,
         strip=None, charset=None, truncate=None):
             GenericString.__init__(self, parent, name, format, description,
@@ -392,6 +396,7 @@ class String(GenericString):
     String with fixed size (size in bytes).
     See GenericString to get more information.
     """
+    __slots__ = ()
     static_size = staticmethod(lambda *args, **kw: args[1]*8)
 
     def __init__(self, parent, name, nbytes, description=None,
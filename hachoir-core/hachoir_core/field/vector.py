@@ -1,4 +1,8 @@
-from hachoir_core.field import Field, FieldSet, ParserError
+from hachoir_core.field import (Field, FieldSet, ParserError, MissingField,
+    GenericInteger,
+    Int8,  Int16,  Int24,  Int32,  Int64,
+    UInt8, UInt16, UInt24, UInt32, UInt64)
+from hachoir_core.bits import str2array
 
 class GenericVector(FieldSet):
     def __init__(self, parent, name, nb_items, item_class, item_name="item", description=None):
@@ -36,3 +40,110 @@ class UserVector(GenericVector):
     def __init__(self, parent, name, nb_items, description=None):
         GenericVector.__init__(self, parent, name, nb_items, self.item_class, self.item_name, description)
 
+
+class GenericIntegerArray(GenericVector):
+    """
+    Vector of integers of the same type (item_class is UInt8, Int16,
+    UInt32, etc.).
+
+    All values are decoded at once by getValues(). Item fields are only
+    created when they are requested (eg. array["item[42]"] or array[42]),
+    so a large table doesn't create one field per item.
+
+    Set first_index attribute to name the first item "item[first_index]"
+    instead of "item[0]".
+    """
+    first_index = 0
+
+    def __init__(self, parent, name, nb_items, item_class, item_name="item", description=None):
+        assert issubclass(item_class, GenericInteger)
+        if item_class.static_size % 8:
+            raise ParserError('Unable to create integer array "%s" of %s bits integers' \
+                % (name, item_class.static_size))
+        GenericVector.__init__(self, parent, name, nb_items, item_class, item_name, description)
+        self._item_format = item_name + "[%u]"
+        self._items = {}
+        self._values = None
+
+    def getValues(self):
+        """
+        Get the value of all items as an array (or a list)
+        """
+        if self._values is None:
+            data = self.stream.readBytes(self.absolute_address, self._size // 8)
+            self._values = str2array(data, self._item_class.static_size // 8,
+                self._item_class.signed, self.endian)
+        return self._values
+
+    def createItem(self, name):
+        """
+        Create an item field: override this method to set a text handler
+        for example.
+        """
+        return self._item_class(self, name)
+
+    def _getItem(self, index):
+        try:
+            return self._items[index]
+        except KeyError:
+            save_size = self._current_size
+            try:
+                self._current_size = index * self._item_class.static_size
+                field = self.createItem(self._item_format % (self.first_index + index))
+            finally:
+                self._current_size = save_size
+            self._items[index] = field
+            return field
+
+    def _getItemIndex(self, name):
+        prefix = self._item_name + "["
+        if not(name.startswith(prefix) and name.endswith("]")):
+            return None
+        try:
+            index = int(name[len(prefix):-1]) - self.first_index
+        except ValueError:
+            return None
+        if not(0 <= index < len(self)):
+            return None
+        return index
+
+    def createFields(self):
+        for index in xrange(len(self)):
+            yield self._getItem(index)
+
+    def _getField(self, name, const):
+        index = self._getItemIndex(name)
+        if index is not None:
+            return self._getItem(index)
+        return GenericVector._getField(self, name, const)
+
+    def getField(self, key, const=True):
+        if isinstance(key, (int, long)):
+            if not(0 <= key < len(self)):
+                raise MissingField(self, key)
+            return self._getItem(key)
+        return GenericVector.getField(self, key, const)
+
+    def getFieldIndex(self, field):
+        return self._getItemIndex(field._name)
+
+def integerArrayFactory(name, item_class):
+    class IntegerArray(GenericIntegerArray):
+        __doc__ = "Array of " + item_class.__doc__[0].lower() + item_class.__doc__[1:]
+        def __init__(self, parent, name, nb_items, item_name="item", description=None):
+            GenericIntegerArray.__init__(self, parent, name, nb_items, item_class, item_name, description)
+    cls = IntegerArray
+    cls.__name__ = name
+    return cls
+
+UInt8Array = integerArrayFactory("UInt8Array", UInt8)
+UInt16Array = integerArrayFactory("UInt16Array", UInt16)
+UInt24Array = integerArrayFactory("UInt24Array", UInt24)
+UInt32Array = integerArrayFactory("UInt32Array", UInt32)
+UInt64Array = integerArrayFactory("UInt64Array", UInt64)
+
+Int8Array = integerArrayFactory("Int8Array", Int8)
+Int16Array = integerArrayFactory("Int16Array", Int16)
+Int24Array = integerArrayFactory("Int24Array", Int24)
+Int32Array = integerArrayFactory("Int32Array", Int32)
+Int64Array = integerArrayFactory("Int64Array", Int64)
@@ -142,10 +142,16 @@ def _initGettext():
     translate = gettext.gettext
     ngettext = gettext.ngettext
 
-    # TODO: translate_unicode lambda function really sucks!
-    # => find native function to do that
-    unicode_gettext = lambda text: \
-        unicode(translate(text), charset)
+    # gettext.gettext() looks for the catalog at each call: cache the
+    # translations (eg. metadata create their item descriptions each time)
+    translations = {}
+    def unicode_gettext(text):
+        try:
+            return translations[text]
+        except KeyError:
+            translated = unicode(translate(text), charset)
+            translations[text] = translated
+            return translated
     unicode_ngettext = lambda singular, plural, count: \
         unicode(ngettext(singular, plural, count), charset)
     return (unicode_gettext, unicode_ngettext)
@@ -2,7 +2,7 @@ from hachoir_core.endian import BIG_ENDIAN, LITTLE_ENDIAN
 from hachoir_core.stream.stream import StreamError
 from hachoir_core.stream.input import (
         InputStreamError,
-        InputStream, InputIOStream, StringInputStream,
+        InputStream, InputIOStream, MmapInputStream, StringInputStream,
         InputSubStream, InputFieldStream,
         FragmentedStream, ConcatStream)
 from hachoir_core.stream.input_helper import FileInputStream, guessStreamCharset
@@ -1,14 +1,20 @@
 from hachoir_core.endian import BIG_ENDIAN, LITTLE_ENDIAN, MIDDLE_ENDIAN
 from hachoir_core.error import info
 from hachoir_core.log import Logger
-from hachoir_core.bits import str2long
+from hachoir_core.bits import str2long, alignBytes
 from hachoir_core.i18n import getTerminalCharset
 from hachoir_core.tools import lowerBound
 from hachoir_core.i18n import _
 from hachoir_core.tools import alignValue
+from collections import deque
 from errno import ESPIPE
+from mmap import mmap, ACCESS_READ
+from os import fstat
+from stat import S_ISREG
+from sys import maxint
 from weakref import ref as weakref_ref
 from hachoir_core.stream import StreamError
+import hachoir_core.config as config
 
 class InputStreamError(StreamError):
     pass
@@ -121,6 +127,7 @@ class FileFromInputStream:
 class InputStream(Logger):
     _set_size = None
     _current_size = 0
+    search_size = 1 << 16   # max. size in bytes of a searchBytes() chunk
 
     def __init__(self, source=None, size=None, packets=None, **args):
         self.source = source
@@ -212,47 +219,152 @@ class InputStream(Logger):
         Returns None is needle can't be found.
         """
 
-        pos = self.searchBytes(needle, start_address, end_address)
-        if pos is None:
+        found = self._search(needle, start_address, end_address,
+            False, BIG_ENDIAN)
+        if found is None:
             return None
+        pos, needle = found
         length = (pos - start_address) // 8
         if include_needle:
             length += len(needle)
         return length
 
-    def searchBytes(self, needle, start_address=0, end_address=None):
+    def searchBytes(self, needle, start_address=0, end_address=None,
+    endian=BIG_ENDIAN):
         """
-        Search some bytes in [start_address;end_address[. Addresses must
-        be aligned to byte. Returns the address of the bytes if found,
-        None else.
+        Search some bytes in [start_address;end_address[: needle is a string
+        or a tuple of strings (search the first occurrence of any of them).
+        Returns the address of the bytes if found, None else.
+
+        If start_address is not aligned to byte, the bytes are searched at
+        the addresses start_address+8*n, bits are read in the 'endian' order.
+
+        >>> from hachoir_core.stream import StringInputStream
+        >>> stream = StringInputStream("x" * 4093 + "ABZDEFGH" + "x" * 8000)
+        >>> stream.searchBytes(("ABZDEFGH", "Z")) // 8
+        4093
+        >>> stream.searchBytes(("Z", "ABZDEFGH"), 8 * 4094) // 8
+        4095
         """
-        if start_address % 8:
-            raise InputStreamError("Unable to search bytes with address with bit granularity")
-        length = len(needle)
-        size = max(3 * length, 4096)
-        buffer = ''
+        found = self._search(needle, start_address, end_address,
+            False, endian)
+        if found is None:
+            return None
+        return found[0]
 
-        if self._size and (end_address is None or self._size < end_address):
-            end_address = self._size
+    def rsearchBytes(self, needle, start_address=0, end_address=None,
+    endian=BIG_ENDIAN):
+        """
+        Search the last occurrence of some bytes in [start_address;
+        end_address[: see searchBytes(). If end_address is None and the
+        stream size is unknown, the stream is read until its end.
+        """
+        found = self._search(needle, start_address, end_address,
+            True, endian)
+        if found is None:
+            return None
+        return found[0]
 
-        while True:
-            if end_address is not None:
-                todo = (end_address - start_address) >> 3
-                if todo < size:
-                    if todo <= 0:
+    def _search(self, needles, start, end, reverse, endian):
+        """
+        Search needles in [start;end[ by chunks: the size of the chunks
+        grows from 4 KB to search_size bytes. The chunks overlap by the
+        length of the longest needle minus one byte.
+        Returns (address, needle) or None.
+        """
+        if isinstance(needles, str):
+            needles = (needles,)
+            min_length = max_length = len(needles[0])
+        else:
+            lengths = [len(needle) for needle in needles]
+            min_length = min(lengths)
+            max_length = max(lengths)
+        overlap = max_length - 1
+        size = 4096
+        if size < 2 * max_length:
+            size = 2 * max_length
+
+        # Compute the end address (None if unknown)
+        if self._size is not None and (end is None or self._size < end):
+            end = self._size
+        if reverse:
+            if end is None:
+                end = self._readSize(start)
+            elif not self.sizeGe(end):
+                end = self._size
+        if end is not None:
+            end -= (end - start) % 8
+            if end - start < 8 * min_length:
+                return None
+
+        if reverse:
+            chunk_end = end
+            while True:
+                chunk = max(start, chunk_end - 8 * size)
+                data = self._readChunk(chunk, (chunk_end - chunk) // 8, endian)
+                found = None
+                for needle in needles:
+                    pos = data.rfind(needle)
+                    if 0 <= pos and (found is None or found[0] < pos):
+                        found = (pos, needle)
+                if found:
+                    return (chunk + found[0] * 8, found[1])
+                if chunk == start:
+                    return None
+                chunk_end = chunk + 8 * overlap
+                size = min(size * 2, max(self.search_size, 2 * max_length))
+        else:
+            chunk = start
+            while True:
+                if end is not None:
+                    size = min(size, (end - chunk) // 8)
+                if not self.sizeGe(chunk + 8 * size):
+                    # End of a stream of unknown size
+                    end = self._size - (self._size - start) % 8
+                    size = (end - chunk) // 8
+                    if size <= 0:
                         return None
-                    size = todo
-            data = self.readBytes(start_address, size)
-            if end_address is None and self._size:
-                end_address = self._size
-                size = (end_address - start_address) >> 3
-                assert size > 0
-                data = data[:size]
-            start_address += 8 * size
-            buffer = buffer[len(buffer) - length + 1:] + data
-            found = buffer.find(needle)
-            if found >= 0:
-                return start_address + (found - len(buffer)) * 8
+                if start % 8:
+                    data = self._readChunk(chunk, size, endian)
+                else:
+                    data = self.readBytes(chunk, size)
+                found = None
+                for needle in needles:
+                    pos = data.find(needle)
+                    if 0 <= pos and (found is None or pos < found[0]):
+                        found = (pos, needle)
+                # A longer needle may start in the overlap and cross the end
+                # of the chunk: the overlap is searched again with the next
+                # chunk
+                last = (end is not None and end <= chunk + 8 * size)
+                if found and (last or found[0] < size - overlap):
+                    return (chunk + found[0] * 8, found[1])
+                if last:
+                    return None
+                chunk += 8 * (size - overlap)
+                size = min(size * 2, max(self.search_size, 2 * max_length))
+
+    def _readChunk(self, address, size, endian):
+        """
+        Read 'size' bytes at 'address' for _search(): if address is not
+        aligned to byte, bits are read in the 'endian' order.
+        """
+        if not (address % 8):
+            return self.readBytes(address, size)
+        shift, data, missing = self.read(address, 8 * size)
+        if missing:
+            raise ReadStreamError(8 * size, address)
+        return alignBytes(data, shift, endian)
+
+    def _readSize(self, address):
+        """
+        Read the stream until its end to get its size (in bits), starting
+        at 'address'.
+        """
+        size = max(address, 1 << 16)
+        while self.sizeGe(size):
+            size *= 2
+        return self._size
 
     def file(self):
         return FileFromInputStream(self)
@@ -286,9 +398,14 @@ class InputPipe(object):
      * Only if there are more than self.buffer_nb_min blocks in memory.
      * While self.buffers[self.first] is that least recently used block.
 
+    If self.buffer_nb_max is set, the memory usage is bounded: the first
+    blocks are always discarded to keep at most self.buffer_nb_max blocks,
+    even while reading new blocks.
+
     Property: There is no hole in self.buffers, except at the beginning.
     """
     buffer_nb_min = 256
+    buffer_nb_max = None
     buffer_size = 16
     last = None
     size = None
@@ -341,6 +458,17 @@ class InputPipe(object):
             self.buffers[buf[1]][2] = self.last
             self.buffers[self.first] = None
             self.first += 1
+        if self.buffer_nb_max:
+            lim = len(self.buffers) - self.buffer_nb_max
+            while self.first < lim:
+                buf = self.buffers[self.first]
+                info("Discarding buffer %u." % self.first)
+                if self.last == self.first:
+                    self.last = buf[2]
+                self.buffers[buf[2]][1] = buf[1]
+                self.buffers[buf[1]][2] = buf[2]
+                self.buffers[self.first] = None
+                self.first += 1
 
     def seek(self, address):
         assert 0 <= address
@@ -358,6 +486,8 @@ class InputPipe(object):
                     self._append(data)
                 break
             self._append(data)
+            if self.buffer_nb_max:
+                self._flush()
         block, offset = divmod(self.address, 1 << self.buffer_size)
         data = ''.join(self._get(index)
                 for index in xrange(block, (end - 1 >> self.buffer_size) + 1)
@@ -367,6 +497,19 @@ class InputPipe(object):
         return data
 
 class InputIOStream(InputStream):
+    """
+    Input stream reading a file object. Data of seekable files are read
+    by pages of config.io_cache_page_size bytes and kept in a LRU cache of
+    (at most) config.io_cache_pages pages. When pages are read in forward
+    order, next pages are read ahead (up to config.io_cache_readahead pages
+    in one read() call).
+
+    Cache statistics: cache_hits and cache_misses attributes (number of
+    pages found or not found in the cache).
+    """
+    cache_hits = 0
+    cache_misses = 0
+
     def __init__(self, input, size=None, **args):
         if not hasattr(input, "seek"):
             if size is None:
@@ -388,6 +531,23 @@ class InputIOStream(InputStream):
         self._input = input
         InputStream.__init__(self, size=size, **args)
 
+        # InputPipe already has its own cache
+        if isinstance(input, InputPipe):
+            self._cache_max = 0
+        else:
+            self._cache_max = config.io_cache_pages
+        self._page_size = config.io_cache_page_size
+        self._readahead_max = max(config.io_cache_readahead, 1)
+        self._readahead = 1
+        self._cache = {}
+        # Access time of the cached pages, and (access time, page) in access
+        # order: entries of pages accessed again later are obsolete
+        self._cache_atime = {}
+        self._cache_queue = deque()
+        self._clock = 0
+        self._next_page = None
+        self._last_page = None
+
     def __current_size(self):
         if self._size:
             return self._size
@@ -396,13 +556,90 @@ class InputIOStream(InputStream):
         return 8 * self._input.current_size
     _current_size = property(__current_size)
 
+    def _readPages(self, first, last):
+        """
+        Read pages first..last (included) using the cache
+        """
+        pages = []
+        for index in xrange(first, last + 1):
+            try:
+                data = self._cache[index]
+                self.cache_hits += 1
+            except KeyError:
+                self.cache_misses += 1
+                data = self._fillCache(index)
+            self._clock += 1
+            self._cache_atime[index] = self._clock
+            self._cache_queue.append((self._clock, index))
+            pages.append(data)
+        self._next_page = last + 1
+        self._last_page = last
+        self._last_data = data
+        return pages
+
+    def _fillCache(self, index):
+        """
+        Read the page index (and maybe next pages) from the input file,
+        store them in the cache, and return content of the page index.
+        """
+        if index == self._next_page:
+            # Forward streaming: increase read-ahead
+            self._readahead = min(self._readahead * 2, self._readahead_max)
+        else:
+            self._readahead = 1
+        count = min(self._readahead, self._cache_max)
+        page_size = self._page_size
+        self._clock += 1
+        self._input.seek(index * page_size)
+        data = self._input.read(count * page_size)
+        for page in xrange(count):
+            content = data[page * page_size:(page + 1) * page_size]
+            if page and (not content or index + page in self._cache):
+                break
+            self._cache[index + page] = content
+            self._cache_atime[index + page] = self._clock
+            self._cache_queue.append((self._clock, index + page))
+        self._flushCache()
+        return data[:page_size]
+
+    def _flushCache(self):
+        """
+        Drop least recently used pages until the cache is small enough
+        """
+        atime = self._cache_atime
+        queue = self._cache_queue
+        while self._cache_max < len(self._cache):
+            clock, index = queue.popleft()
+            if atime.get(index) == clock:
+                del self._cache[index]
+                del atime[index]
+        if 4 * (self._cache_max + 1) < len(queue):
+            # Drop obsolete entries
+            queue = [ (clock, index) for index, clock in atime.iteritems() ]
+            queue.sort()
+            self._cache_queue = deque(queue)
+
     def read(self, address, size):
         assert size > 0
         _size = self._size
         address, shift = divmod(address, 8)
-        self._input.seek(address)
         size = (size + shift + 7) >> 3
-        data = self._input.read(size)
+        first, offset = divmod(address, self._page_size)
+        last = (address + size - 1) // self._page_size
+        if first == last == self._last_page:
+            # Fast path: read in the same page than the previous read
+            self.cache_hits += 1
+            data = self._last_data[offset:offset + size]
+        elif self._cache_max and last - first <= self._cache_max // 2:
+            pages = self._readPages(first, last)
+            if len(pages) == 1:
+                data = pages[0][offset:offset + size]
+            else:
+                data = ''.join(pages)[offset:offset + size]
+        else:
+            # Cache disabled or too large read
+            self._input.seek(address)
+            data = self._input.read(size)
         got = len(data)
         missing = size != got
         if missing and _size == self._size:
@@ -419,6 +656,57 @@ class InputIOStream(InputStream):
         return InputStream.file(self)
 
 
+class MmapInputStream(InputStream):
+    """
+    Input stream reading a regular file through a read-only memory map:
+    read(), readBytes() and searchBytes() are served by slicing the map,
+    without any seek() or read() system call.
+
+    Raise an EnvironmentError, ValueError or OverflowError if the file
+    can't be mapped (pipe, device, file larger than the address space, ...):
+    use InputIOStream in this case.
+    """
+    search_size = 1 << 20   # max. size in bytes of a searchBytes() chunk
+
+    def __init__(self, input, size=None, **args):
+        fileno = input.fileno()
+        if size is None:
+            stat = fstat(fileno)
+            if not S_ISREG(stat.st_mode):
+                raise ValueError("MmapInputStream: not a regular file")
+            size = 8 * stat.st_size
+        if maxint < size // 8:
+            raise OverflowError("MmapInputStream: file is too large to be mapped")
+        InputStream.__init__(self, size=size, **args)
+        self.data = mmap(fileno, size // 8, access=ACCESS_READ)
+        self._input = input
+        self._current_size = self._size
+
+    def read(self, address, size):
+        address, shift = divmod(address, 8)
+        size = (size + shift + 7) >> 3
+        data = self.data[address:address+size]
+        got = len(data)
+        if got != size:
+            raise ReadStreamError(8 * size, 8 * address, 8 * got)
+        return shift, data, False
+
+    def readBytes(self, address, nb_bytes):
+        if address % 8:
+            raise InputStreamError("TODO: handle non-byte-aligned data")
+        address >>= 3
+        data = self.data[address:address+nb_bytes]
+        if len(data) != nb_bytes:
+            raise ReadStreamError(8 * nb_bytes, 8 * address)
+        return data
+
+    def file(self):
+        from os import dup, fdopen
+        new_file = fdopen(dup(self._input.fileno()), "r")
+        new_file.seek(0)
+        return new_file
+
+
 class StringInputStream(InputStream):
     def __init__(self, data, source="<string>", **args):
         self.data = data
@@ -451,6 +739,7 @@ class InputSubStream(InputStream):
         self.stream.askSize(self)
 
     _current_size = property(lambda self: min(self._size, max(0, self.stream._current_size - self._offset)))
+    search_size = property(lambda self: self.stream.search_size)
 
     def read(self, address, size):
         return self.stream.read(self._offset + address, size)
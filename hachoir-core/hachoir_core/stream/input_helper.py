@@ -1,5 +1,20 @@
 from hachoir_core.i18n import getTerminalCharset, guessBytesCharset, _
-from hachoir_core.stream import InputIOStream, InputSubStream, InputStreamError
+from hachoir_core.stream import (InputIOStream, MmapInputStream,
+    InputSubStream, InputStreamError)
+import hachoir_core.config as config
+
+def _openInputStream(inputio, **args):
+    """
+    Create a memory mapped stream if possible (and enabled in the
+    configuration), or fallback to InputIOStream (pipe, device, file too
+    large for the address space, ...).
+    """
+    if config.use_mmap:
+        try:
+            return MmapInputStream(inputio, **args)
+        except (EnvironmentError, ValueError, OverflowError):
+            pass
+    return InputIOStream(inputio, **args)
 
 def FileInputStream(filename, real_filename=None, **args):
     """
@@ -25,11 +40,11 @@ def FileInputStream(filename, real_filename=None, **args):
     if offset or size:
         if size:
             size = 8 * size
-        stream = InputIOStream(inputio, source=source, **args)
+        stream = _openInputStream(inputio, source=source, **args)
         return InputSubStream(stream, 8 * offset, size, **args)
     else:
         args.setdefault("tags",[]).append(("filename", filename))
-        return InputIOStream(inputio, source=source, **args)
+        return _openInputStream(inputio, source=source, **args)
 
 def guessStreamCharset(stream, address, size, default=None):
     size = min(size, 1024*8)
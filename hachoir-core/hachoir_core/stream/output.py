@@ -129,6 +129,19 @@ class OutputStream(object):
             raise NotImplementedError()
         self._output.write(bytes)
 
+    def writeHole(self, nb_bytes):
+        """
+        Skip nb_bytes bytes (read as nul bytes). In a sparse file, no disk
+        space is allocated for the hole. The output must be seekable.
+        """
+        if self._bit_pos != 0:
+            raise NotImplementedError()
+        self._output.seek(nb_bytes, 1)
+        self._output.truncate()
+
+    def close(self):
+        self._output.close()
+
     def readBytes(self, address, nbytes):
         """
         Read bytes from the stream at specified address (in bits).
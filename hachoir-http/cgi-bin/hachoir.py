@@ -117,6 +117,13 @@ def get_sessid():
         return c['sess'].value
     return ''
 
+def save_checkpoints(data, parser, sessid):
+    """Save the checkpoints of the parser of the original file."""
+    checkpoints = parser.checkpoints
+    if checkpoints != data.get('checkpoints', []):
+        data['checkpoints'] = checkpoints
+        save_data(data, sessid)
+
 def get_parser(data, streamdata, sessid):
     """Guess or retrieve the parser based on the stream.
 
@@ -130,12 +137,14 @@ def get_parser(data, streamdata, sessid):
     # must remake parser EVERY TIME because parsers can't be pickled
     # (they contain generators which are currently not pickleable)
     # best I can do here is cache the parser, so at least we're not
-    # taking time to re-guess the parser...
+    # taking time to re-guess the parser... and restore its checkpoints,
+    # so far fields are reached without parsing from offset 0
     if streamdata[0] is None: # original file
         stream = FileInputStream(data['filename'],
                             real_filename = unicode(tmp_dir+sessid+'.file'))
         if 'parser_cache' in data:
             parser = data['parser_cache'](stream)
+            parser.setCheckpoints(data.get('checkpoints', ()))
         else:
             parser = guessParser(stream)
             if not parser:
@@ -477,6 +486,8 @@ def handle_form():
             print '</tr>'
         print '</table>'
         print_path(path, data, stream_id)
+        if data['streams'][stream_id][0] is None:
+            save_checkpoints(data, parser, sessid)
         if sys.stderr.getvalue():
             print_error('Error(s) encountered:', print_headers=False)
             print '<pre class="parseerror">%s</pre>'%sys.stderr.getvalue()
@@ -4,6 +4,7 @@ from hachoir_metadata.metadata import (
     RootMetadata, Metadata, MultipleMetadata, registerExtractor)
 from hachoir_parser.archive import (Bzip2Parser, CabFile, GzipParser,
     TarFile, ZipFile, MarFile)
+from hachoir_parser.archive.zip import getZip64Field
 from hachoir_core.tools import humanUnixAttributes
 from hachoir_core.i18n import _
 
@@ -69,9 +70,10 @@ class ZipMetadata(MultipleMetadata):
             if field["data_desc/file_compressed_size"].value:
                 meta.compr_size = field["data_desc/file_compressed_size"].value
         else:
-            meta.file_size = field["uncompressed_size"].value
-            if field["compressed_size"].value:
-                meta.compr_size = field["compressed_size"].value
+            meta.file_size = getZip64Field(field, "uncompressed_size").value
+            compr_size = getZip64Field(field, "compressed_size").value
+            if compr_size:
+                meta.compr_size = compr_size
         computeCompressionRate(meta)
         self.addGroup(field.name, meta, "File \"%s\"" % meta.get('filename'))
 
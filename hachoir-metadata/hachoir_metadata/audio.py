@@ -1,13 +1,19 @@
 from hachoir_metadata.metadata import (registerExtractor,
     Metadata, RootMetadata, MultipleMetadata)
 from hachoir_parser.audio import AuFile, MpegAudioFile, RealAudioFile, AiffFile, FlacParser
+from hachoir_parser.audio.mpeg_audio import SAMPLES_PER_FRAME
 from hachoir_parser.container import OggFile, RealMediaFile
 from hachoir_core.i18n import _
 from hachoir_core.tools import makePrintable, timedelta2seconds, humanBitRate
 from datetime import timedelta
+from random import Random
 from hachoir_metadata.metadata_item import QUALITY_FAST, QUALITY_NORMAL, QUALITY_BEST
 from hachoir_metadata.safe import fault_tolerant, getValue
 
+# Size in bytes of the frames read at each sample to estimate the MPEG
+# audio bit rate
+SAMPLE_SIZE = 4096
+
 def computeComprRate(meta, size):
     if not meta.has("duration") \
     or not meta.has("sample_rate") \
@@ -307,7 +313,11 @@ class MpegAudioMetadata(RootMetadata):
                 (frame["version"].display, frame["layer"].display)
             self.sample_rate = frame.getSampleRate()
             self.bits_per_sample = 16
-            if mp3["frames"].looksConstantBitRate():
+            frames = mp3["frames"]
+            vbr = frames.readVbrHeader()
+            if vbr and vbr["frames"]:
+                self.computeVbrHeader(frame, vbr)
+            elif frames.looksConstantBitRate():
                 self.computeBitrate(frame)
             else:
                 self.computeVariableBitrate(mp3)
@@ -333,28 +343,99 @@ class MpegAudioMetadata(RootMetadata):
         self.bit_rate = (bit_rate, _("%s (constant)") % humanBitRate(bit_rate))
         self.duration = timedelta(seconds=float(frame["/frames"].size) / bit_rate)
 
+    def computeVbrHeader(self, frame, vbr):
+        """
+        Compute duration and bit rate using the VBR header (Xing, Info
+        or VBRI) of the first frame: number of frames and size of the
+        frames, and encoder delay and padding (LAME).
+        """
+        sample_rate = frame.getSampleRate()
+        if not sample_rate:
+            return
+        nb_samples = vbr["frames"] * SAMPLES_PER_FRAME[frame["version"].value][frame["layer"].value]
+        seconds = float(nb_samples) / sample_rate
+        if vbr["bytes"]:
+            size = vbr["bytes"] * 8
+        else:
+            size = frame["/frames"].size - frame.size
+        bit_rate = size / seconds
+        if vbr["tag"] == "Info":
+            text = _("%s (constant)")
+        else:
+            text = _("%s (Variable bit rate)")
+        self.bit_rate = (bit_rate, text % humanBitRate(bit_rate))
+        nb_samples -= vbr["delay"] + vbr["padding"]
+        if 0 < nb_samples:
+            seconds = float(nb_samples) / sample_rate
+        self.duration = timedelta(seconds=seconds)
+
     def computeVariableBitrate(self, mp3):
+        """
+        Estimate the average bit rate from the headers of frames sampled
+        in evenly sized segments (500*quality samples), or compute the exact
+        bit rate reading all frame headers with the best quality.
+
+        >>> from struct import pack
+        >>> from hachoir_core.stream import StringInputStream
+        >>> from hachoir_metadata import extractMetadata
+        >>> def frame(index, bit_rate):
+        ...     # MPEG-1 layer III, 44.1 kHz, joint stereo
+        ...     header = pack(">I", 0xFFFB0040 | (index << 12))
+        ...     return header + "\\0" * (144 * bit_rate // 44100 - 4)
+        >>> rates = ((5, 64000), (9, 128000), (14, 320000))
+        >>> data = "".join([frame(index, bit_rate)
+        ...     for count in xrange(2000) for index, bit_rate in rates])
+        >>> exact = (208 + 417 + 1044) * 8 / (3 * 1152 / 44100.0)
+        >>> for quality in (QUALITY_NORMAL, QUALITY_BEST):
+        ...     mp3 = MpegAudioFile(StringInputStream(data))
+        ...     bit_rate = extractMetadata(mp3, quality).get("bit_rate")
+        ...     print abs(bit_rate - exact) < exact * 0.01
+        True
+        True
+        """
         if self.quality <= QUALITY_FAST:
             return
-        count = 0
+        frames = mp3["frames"]
         if QUALITY_BEST <= self.quality:
-            self.warning("Process all MPEG audio frames to compute exact duration")
-            max_count = None
+            size = 0
+            seconds = 0.0
+            for header in frames.iterFrameHeaders():
+                size += header[4]
+                seconds += float(header[5]) / header[3]
+            if not seconds:
+                return
+            bit_rate = size * 8 / seconds
         else:
-            max_count = 500 * self.quality
-        total_bit_rate = 0.0
-        for index, frame in enumerate(mp3.array("frames/frame")):
-            if index < 3:
-                continue
-            bit_rate = frame.getBitRate()
-            if bit_rate:
-                total_bit_rate += float(bit_rate)
-                count += 1
-                if max_count and max_count <= count:
-                    break
-        if not count:
-            return
-        bit_rate = total_bit_rate / count
+            # Split the frames in segments of the same size and read the
+            # frames starting in SAMPLE_SIZE bytes at a pseudo-random offset
+            # of each segment (a fixed offset would be biased by periodic
+            # bit rates). The bit rate is the total size divided by the
+            # total duration of the samples: averaging the bit rates of the
+            # samples is biased, and samples of a fixed number of frames
+            # would give more weight to the parts of higher bit rate.
+            start = frames["frame[0]"].absolute_address
+            end = frames.absolute_address + frames.size
+            count = int(500 * self.quality)
+            step = max((end - start) // (count * 8), 1)
+            random = Random(frames.size)
+            size = 0
+            seconds = 0.0
+            for address in xrange(start, end, step * 8):
+                address += random.randrange(step) * 8
+                found = frames.findFrameHeader(address)
+                if not found:
+                    continue
+                address += SAMPLE_SIZE * 8
+                offset = found[0]
+                for header in frames.iterFrameHeaders(offset, SAMPLE_SIZE):
+                    if address <= offset:
+                        break
+                    size += header[4]
+                    seconds += float(header[5]) / header[3]
+                    offset += header[4] * 8
+            if not seconds:
+                return
+            bit_rate = size * 8 / seconds
         self.bit_rate = (bit_rate,
             _("%s (Variable bit rate)") % humanBitRate(bit_rate))
         duration = timedelta(seconds=float(mp3["frames"].size) / bit_rate)
@@ -0,0 +1,205 @@
+"""
+Batch processing: call a function on a list of files, in the current
+process or in worker processes, with a timeout per file, and compute
+throughput statistics.
+
+Results are processed in the order of the filenames, whatever the number
+of worker processes. The number of files queued in the worker processes
+is bounded, so the list of files can be a generator walking big directory
+trees.
+"""
+
+from hachoir_core.i18n import _
+from hachoir_core.timeout import limitedTime, fixTimeout, Timeout
+from hachoir_core.tools import humanDuration, humanDurationNanosec, humanFilesize
+from array import array
+from os import path, walk
+from time import time
+try:
+    from multiprocessing import Pool, TimeoutError
+except ImportError:
+    # Python < 2.6
+    Pool = None
+
+PENDING_PER_JOB = 4     # Maximum number of queued files per worker process
+WAIT_RESULT = 1.0       # Wait for a result by steps of 1 second (CTRL+C)
+
+def iterFilenames(names, recursive=False):
+    """
+    Generator of the filenames: with recursive=True, directories are
+    walked in sorted order.
+    """
+    for name in names:
+        if recursive and path.isdir(name):
+            for dirpath, dirnames, filenames in walk(name):
+                dirnames.sort()
+                filenames.sort()
+                for filename in filenames:
+                    yield path.join(dirpath, filename)
+        else:
+            yield name
+
+def processFile(func, args, filename, timeout):
+    """
+    Call func(filename, *args) with a timeout in seconds (None means no
+    timeout). Return (result, timed_out, duration, size): result is None on
+    timeout, duration is in seconds, size is the file size in bytes.
+
+    Parsers catch most errors, including Timeout, and go on with the next
+    fields: the call also fails if the duration exceeds the timeout.
+    """
+    start = time()
+    try:
+        if timeout:
+            result = limitedTime(timeout, func, filename, *args)
+        else:
+            result = func(filename, *args)
+        timed_out = False
+    except Timeout:
+        result = None
+        timed_out = True
+    duration = time() - start
+    if timeout and fixTimeout(timeout) <= duration:
+        result = None
+        timed_out = True
+    try:
+        size = path.getsize(filename)
+    except OSError:
+        size = 0
+    return (result, timed_out, duration, size)
+
+# (function, arguments, timeout) of a worker process (see initWorker())
+_worker = None
+
+def initWorker(func, args, timeout):
+    global _worker
+    _worker = (func, args, timeout)
+
+def processWorker(filename):
+    func, args, timeout = _worker
+    return processFile(func, args, filename, timeout)
+
+class BatchStats:
+    """
+    Throughput statistics of a batch: number of files, total size and
+    duration of each file.
+    """
+    def __init__(self):
+        self.start = time()
+        self.end = None
+        self.durations = array("d")
+        self.size = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def add(self, duration, size):
+        self.durations.append(duration)
+        self.size += size
+
+    def stop(self):
+        self.end = time()
+
+    def percentile(self, percent):
+        """
+        Duration (in seconds) of the file at the given percentile
+        (nearest rank), or None if no file was processed.
+
+        >>> stats = BatchStats()
+        >>> for duration in (0.5, 0.1, 0.4, 0.2, 0.3):
+        ...     stats.add(duration, 0)
+        >>> stats.percentile(50), stats.percentile(99)
+        (0.3, 0.5)
+        """
+        if not self.durations:
+            return None
+        durations = sorted(self.durations)
+        index = (len(durations) * percent + 99) // 100 - 1
+        return durations[max(index, 0)]
+
+    def report(self):
+        """
+        Create the throughput report: list of unicode strings.
+        """
+        if self.end is not None:
+            elapsed = self.end - self.start
+        else:
+            elapsed = time() - self.start
+        elapsed = max(elapsed, 1e-6)
+        count = len(self.durations)
+        text = [_("Files: %s (%s errors, %s timeouts) in %s") % (
+            count, self.errors, self.timeouts, humanDuration(elapsed * 1000))]
+        text.append(_("Throughput: %.1f files/sec, %s/sec") % (
+            count / elapsed, humanFilesize(int(self.size / elapsed))))
+        if count:
+            text.append(_("Latency per file: p50=%s, p99=%s, max=%s") % tuple(
+                humanDurationNanosec(duration * 1e9) for duration in
+                (self.percentile(50), self.percentile(99), max(self.durations))))
+        return text
+
+class Batch:
+    """
+    Call func(filename, *args) on files using 'jobs' worker processes
+    (jobs=1: in the current process), with a timeout in seconds per file.
+    With worker processes, func and args are not pickled: they are
+    inherited by the processes (fork).
+    """
+    def __init__(self, func, args=(), jobs=1, timeout=None):
+        if 1 < jobs and Pool is None:
+            raise ImportError("Parallel processing requires the multiprocessing module (Python 2.6+)")
+        self.func = func
+        self.args = args
+        self.jobs = jobs
+        self.timeout = timeout
+        self.stats = BatchStats()
+
+    def run(self, filenames, callback):
+        """
+        Process the files: call callback(filename, result, timeout) in the
+        order of the filenames. The callback returns False on error.
+        Return True if all files were processed without error.
+        """
+        self.stats = BatchStats()
+        if self.jobs <= 1:
+            for filename in filenames:
+                self.processResult(filename,
+                    processFile(self.func, self.args, filename, self.timeout),
+                    callback)
+        else:
+            self.runPool(filenames, callback)
+        self.stats.stop()
+        return not(self.stats.errors)
+
+    def runPool(self, filenames, callback):
+        pool = Pool(self.jobs, initWorker, (self.func, self.args, self.timeout))
+        try:
+            max_pending = self.jobs * PENDING_PER_JOB
+            pending = []
+            for filename in filenames:
+                if max_pending <= len(pending):
+                    self.processPending(pending.pop(0), callback)
+                pending.append((filename,
+                    pool.apply_async(processWorker, (filename,))))
+            while pending:
+                self.processPending(pending.pop(0), callback)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def processPending(self, item, callback):
+        filename, async_result = item
+        while True:
+            try:
+                result = async_result.get(WAIT_RESULT)
+                break
+            except TimeoutError:
+                continue
+        self.processResult(filename, result, callback)
+
+    def processResult(self, filename, item, callback):
+        result, timed_out, duration, size = item
+        self.stats.add(duration, size)
+        if timed_out:
+            self.stats.timeouts += 1
+        if not callback(filename, result, timed_out):
+            self.stats.errors += 1
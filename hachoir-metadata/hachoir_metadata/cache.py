@@ -0,0 +1,235 @@
+"""
+Persistent cache of the extracted metadata, stored in a SQLite database,
+to skip the files which didn't change since the previous run.
+
+An entry is identified by the absolute path of the file and the
+extraction options (quality, keys, etc.). It is only valid if the file
+size, modification time and inode, and the hachoir-parser and
+hachoir-metadata versions didn't change. Old entries are evicted by age
+(max_age) and the oldest entries are evicted when the cache is too big
+(max_size).
+
+Each process opens its own database connection, so a cache can be shared
+by worker processes (see hachoir_metadata.batch).
+"""
+
+from hachoir_core.i18n import _
+from hachoir_core.tools import humanFilesize
+from hachoir_metadata.metadata import Metadata, restoreMetadata
+from hachoir_metadata.version import VERSION as METADATA_VERSION
+from hachoir_parser.version import __version__ as PARSER_VERSION
+from os import getpid, path, stat
+from time import time
+import cPickle
+import sys
+
+VERSION = "%s/%s" % (PARSER_VERSION, METADATA_VERSION)
+LOCK_TIMEOUT = 60.0   # Wait for a locked database up to 60 seconds
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS metadata ("
+        "path BLOB, options TEXT, size INTEGER, mtime REAL, inode INTEGER, "
+        "version TEXT, stored REAL, data BLOB, PRIMARY KEY (path, options))",
+    "CREATE INDEX IF NOT EXISTS metadata_stored ON metadata (stored)",
+)
+
+def _cachePath(filename):
+    filename = path.abspath(filename)
+    if isinstance(filename, unicode):
+        filename = filename.encode(sys.getfilesystemencoding() or "utf-8")
+    return buffer(filename)
+
+class MetadataCache:
+    """
+    Cache stored in the SQLite database 'filename': entries older than
+    max_age seconds are evicted, and the oldest entries are evicted if the
+    stored data are bigger than max_size bytes (None means no limit). The
+    eviction is done by evict().
+
+    Stored values are metadata (see Metadata.exportState()) or error
+    messages (unicode) of the files which can't be parsed. Only the main
+    process writes the cache, once the result of a file is validated.
+
+    >>> from hachoir_metadata.metadata import RootMetadata
+    >>> from tempfile import mkdtemp
+    >>> from shutil import rmtree
+    >>> from time import sleep
+    >>> import os
+    >>> directory = mkdtemp()
+    >>> filename = os.path.join(directory, "file")
+    >>> open(filename, "w").write("data")
+    >>> cache = MetadataCache(os.path.join(directory, "cache.db"), max_age=3600)
+    >>> meta = RootMetadata()
+    >>> meta.title = u"Hachoir"
+    >>> cache.set(filename, "quality=0.5", meta)
+    >>> print unicode(cache.get(filename, "quality=0.5"))
+    Metadata:
+    - Title: Hachoir
+    >>> cache.get(filename, "quality=1.0") is None
+    True
+
+    The entry is invalid if the modification time or the size of the file
+    changes:
+
+    >>> os.utime(filename, (1000000000, 1000000000))
+    >>> cache.get(filename, "quality=0.5") is None
+    True
+    >>> cache.set(filename, "quality=0.5", u"Parser error")
+    >>> cache.get(filename, "quality=0.5")
+    u'Parser error'
+    >>> open(filename, "a").write("more data")
+    >>> cache.get(filename, "quality=0.5") is None
+    True
+
+    Evict the oldest entries by size, and then by age:
+
+    >>> cache.set(filename, "quality=0.5", meta)
+    >>> sleep(0.01)
+    >>> count, size = cache.getSize()
+    >>> cache.set(filename, "quality=1.0", meta)
+    >>> cache.max_size = cache.getSize()[1] - size
+    >>> cache.evict()
+    1
+    >>> cache.getSize()[0], cache.get(filename, "quality=1.0") is not None
+    (1, True)
+    >>> cache.max_size = None
+    >>> cache.evict()
+    0
+    >>> cache.max_age = 0
+    >>> sleep(0.01)
+    >>> cache.evict(), cache.getSize()
+    (1, (0, 0))
+    >>> cache.close()
+    >>> rmtree(directory)
+    """
+    def __init__(self, filename, max_age=None, max_size=None):
+        # Python 2.5+
+        import sqlite3
+        self.sqlite3 = sqlite3
+        self.filename = filename
+        self.max_age = max_age
+        self.max_size = max_size
+        self.evicted = 0
+        self._db = None
+        self._pid = None
+
+    def _connect(self):
+        # A connection can't be used after fork(): open a new connection
+        # in worker processes
+        pid = getpid()
+        if self._db is None or self._pid != pid:
+            db = self.sqlite3.connect(self.filename, timeout=LOCK_TIMEOUT)
+            # Losing the last entries on a crash is not an issue for a cache
+            db.execute("PRAGMA synchronous = OFF")
+            for sql in SCHEMA:
+                db.execute(sql)
+            db.commit()
+            self._db = db
+            self._pid = pid
+        return self._db
+
+    def _getKey(self, filename):
+        info = stat(filename)
+        return (info.st_size, info.st_mtime, info.st_ino)
+
+    def get(self, filename, options):
+        """
+        Get the cached metadata (a Metadata object) or error message
+        (unicode) of the file 'filename' extracted with 'options' (a
+        string). Returns None if the entry is missing or outdated.
+        """
+        try:
+            size, mtime, inode = self._getKey(filename)
+        except OSError:
+            return None
+        row = self._connect().execute(
+            "SELECT data FROM metadata WHERE path=? AND options=? "
+            "AND size=? AND mtime=? AND inode=? AND version=?",
+            (_cachePath(filename), options, size, mtime, inode, VERSION)).fetchone()
+        if row is None:
+            return None
+        kind, value = cPickle.loads(str(row[0]))
+        if kind == "metadata":
+            return restoreMetadata(value)
+        return value
+
+    def set(self, filename, options, value):
+        """
+        Store the metadata (a Metadata object or its exported state, see
+        Metadata.exportState()) or the error message (unicode) of the file
+        'filename' extracted with 'options'.
+        """
+        try:
+            size, mtime, inode = self._getKey(filename)
+        except OSError:
+            return
+        if isinstance(value, Metadata):
+            value = value.exportState()
+        if isinstance(value, unicode):
+            value = ("error", value)
+        else:
+            value = ("metadata", value)
+        data = cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+        db = self._connect()
+        db.execute("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (_cachePath(filename), options, size, mtime, inode, VERSION,
+             time(), buffer(data)))
+        db.commit()
+
+    def evict(self):
+        """
+        Remove the entries older than max_age and the oldest entries while
+        the cache is bigger than max_size. Returns the number of removed
+        entries.
+        """
+        db = self._connect()
+        count = 0
+        if self.max_age is not None:
+            cursor = db.execute("DELETE FROM metadata WHERE stored < ?",
+                (time() - self.max_age,))
+            count += cursor.rowcount
+        if self.max_size is not None:
+            size = db.execute("SELECT TOTAL(LENGTH(data)) FROM metadata").fetchone()[0]
+            rowids = []
+            if self.max_size < size:
+                for rowid, length in db.execute(
+                "SELECT rowid, LENGTH(data) FROM metadata ORDER BY stored"):
+                    if size <= self.max_size:
+                        break
+                    rowids.append((rowid,))
+                    size -= length
+            db.executemany("DELETE FROM metadata WHERE rowid=?", rowids)
+            count += len(rowids)
+        db.commit()
+        self.evicted += count
+        return count
+
+    def getSize(self):
+        """
+        Get (number of entries, size of the stored data in bytes).
+        """
+        count, size = self._connect().execute(
+            "SELECT COUNT(*), TOTAL(LENGTH(data)) FROM metadata").fetchone()
+        return (count, int(size))
+
+    def close(self):
+        if self._db is not None and self._pid == getpid():
+            self._db.close()
+        self._db = None
+
+    def report(self, hits, misses):
+        """
+        Create the cache report, using the number of cache hits and misses
+        counted by the caller: list of unicode strings.
+        """
+        total = hits + misses
+        if total:
+            rate = hits * 100.0 / total
+        else:
+            rate = 0.0
+        count, size = self.getSize()
+        return [
+            _("Cache: %s hits, %s misses (hit rate: %.1f%%)") % (hits, misses, rate),
+            _("Cache: %s entries (%s), %s evicted") % (
+                count, humanFilesize(size), self.evicted),
+        ]
@@ -0,0 +1,119 @@
+"""
+Export metadata as machine-readable records, one record per file: JSON
+Lines (one JSON object per line) or CSV (one row per file). Records contain
+the raw values (see Metadata.exportDictionary()), not the human text, and
+are written as soon as they are added, so a consumer can read them
+incrementally.
+"""
+
+from hachoir_core.compatibility import sorted
+from hachoir_metadata.metadata import RootMetadata
+from hachoir_metadata.metadata_item import MIN_PRIORITY, MAX_PRIORITY
+import csv
+
+class Exporter:
+    """
+    Write records in the file object 'output', skipping datas with priority
+    lower than specified priority.
+    """
+    def __init__(self, output, priority=None):
+        self.output = output
+        self.priority = priority
+
+    def write(self, filename, metadata):
+        """
+        Write the record of the metadata of file 'filename'.
+        """
+        self.writeRecord(filename, metadata.exportDictionary(self.priority))
+
+    def writeRecord(self, filename, values=None, error=None):
+        """
+        Write the record of file 'filename': values is the result of
+        Metadata.exportDictionary(), or None if the extraction failed with
+        the error message 'error'.
+        """
+        raise NotImplementedError()
+
+class JSONLinesExporter(Exporter):
+    """
+    Write a JSON object per line: {"path": ..., "metadata": {key:
+    [value, ...]}, "groups": {...}} or {"path": ..., "error": ...}.
+    """
+    def __init__(self, output, priority=None):
+        # Python 2.6+
+        from json import dumps
+        Exporter.__init__(self, output, priority)
+        self.dumps = dumps
+
+    def writeRecord(self, filename, values=None, error=None):
+        record = {"path": filename}
+        if values is not None:
+            record.update(values)
+        if error is not None:
+            record["error"] = error
+        self.output.write(self.dumps(record, sort_keys=True) + "\n")
+        self.output.flush()
+
+class CSVExporter(Exporter):
+    """
+    Write a CSV row per file (encoded in UTF-8): the path, the values
+    of each key and the error message. The values of the common metadata
+    and of the groups are separated by 'separator'. Keys are all metadata
+    keys, sorted by priority, if 'keys' is not set. Floats are written
+    with repr() to keep all their digits.
+
+    >>> from StringIO import StringIO
+    >>> output = StringIO()
+    >>> exporter = CSVExporter(output, keys=["duration", "title"])
+    >>> exporter.writeRecord(u"a.mp3", {"metadata": {
+    ...     "duration": [100000000.0625], "title": [u"Sheep", u"Drugs"]}})
+    >>> for line in output.getvalue().splitlines():
+    ...     print line
+    path,duration,title,error
+    a.mp3,100000000.0625,Sheep|Drugs,
+    """
+    def __init__(self, output, priority=None, keys=None, separator=u"|"):
+        Exporter.__init__(self, output, priority)
+        if keys is None:
+            if priority is None:
+                priority = MAX_PRIORITY
+            priority = max(priority, MIN_PRIORITY)
+            keys = [ data.key for data in sorted(RootMetadata())
+                if data.priority <= priority ]
+        self.keys = keys
+        self.separator = separator
+        self.csv = csv.writer(output)
+        self.csv.writerow(["path"] + self.keys + ["error"])
+        self.output.flush()
+
+    def writeRecord(self, filename, values=None, error=None):
+        columns = dict((key, []) for key in self.keys)
+        if values is not None:
+            self.addValues(columns, values)
+        row = [filename]
+        for key in self.keys:
+            row.append(self.separator.join(
+                [ self.formatValue(value) for value in columns[key] ]))
+        row.append(error or u"")
+        self.csv.writerow([ text.encode("UTF-8") for text in row ])
+        self.output.flush()
+
+    def formatValue(self, value):
+        if isinstance(value, float):
+            return unicode(repr(value))
+        return unicode(value)
+
+    def addValues(self, columns, values):
+        """
+        Add the values of the common metadata and then of the groups,
+        skipping duplicates.
+        """
+        for key, items in values["metadata"].iteritems():
+            if key not in columns:
+                continue
+            for value in items:
+                if value not in columns[key]:
+                    columns[key].append(value)
+        groups = values.get("groups", {})
+        for key in sorted(groups):
+            self.addValues(columns, groups[key])
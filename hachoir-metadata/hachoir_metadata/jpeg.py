@@ -8,7 +8,7 @@ from hachoir_parser.image.jpeg import (
 from hachoir_core.field import MissingField
 from hachoir_core.i18n import _
 from hachoir_core.tools import makeUnicode
-from hachoir_metadata.safe import fault_tolerant
+from hachoir_metadata.safe import fault_tolerant, produces
 from datetime import datetime
 
 def deg2float(degree, minute, second):
@@ -55,35 +55,63 @@ class JpegMetadata(RootMetadata):
     }
 
     def extract(self, jpeg):
+        self.extractFrame(jpeg)
+        self.extractJFIF(jpeg)
+        self.extractExif(jpeg)
+        self.extractPhotoshop(jpeg)
+        self.extractComments(jpeg)
+        self.computeQuality(jpeg)
+        self.extractComprRate(jpeg)
+        if self.has("compression"):
+            self.compression = "JPEG"
+
+    # The compression rate is computed from the image size
+    @produces("compression", "width", "height", "bits_per_pixel",
+        "pixel_format", "nb_colors", "compr_rate")
+    def extractFrame(self, jpeg):
         if "start_frame/content" in jpeg:
             self.startOfFrame(jpeg["start_frame/content"])
         elif "start_scan/content/nr_components" in jpeg:
             self.bits_per_pixel = 8 * jpeg["start_scan/content/nr_components"].value
+
+    @produces("format_version", "width_dpi", "height_dpi")
+    def extractJFIF(self, jpeg):
         if "app0/content" in jpeg:
             self.extractAPP0(jpeg["app0/content"])
 
+    # EXIF width and height are ignored if the frame has a size: don't
+    # parse EXIF only for them
+    @produces("latitude", "longitude", "altitude", "creation_date",
+        *[ key for key in EXIF_KEY.itervalues() if key not in ("width", "height") ])
+    def extractExif(self, jpeg):
         if "exif/content" in jpeg:
             for ifd in jpeg['exif/content']:
                 if not isinstance(ifd, IFD): continue
                 for entry in ifd.array("entry"):
                     self.processIfdEntry(ifd, entry)
                 self.readGPS(ifd)
+
+    @produces("producer", "creation_date", *IPTC_KEY.values())
+    def extractPhotoshop(self, jpeg):
         if "photoshop/content" in jpeg:
             psd = jpeg["photoshop/content"]
             if "version/content/reader_name" in psd:
                 self.producer = psd["version/content/reader_name"].value
             if "iptc/content" in psd:
                 self.parseIPTC(psd["iptc/content"])
+        if not self.has("producer") and "photoshop" in jpeg:
+            self.producer = u"Adobe Photoshop"
+
+    @produces("comment")
+    def extractComments(self, jpeg):
         for field in jpeg.array("comment"):
             if "content/comment" in field:
                 self.comment = field["content/comment"].value
-        self.computeQuality(jpeg)
+
+    @produces("compr_rate")
+    def extractComprRate(self, jpeg):
         if "data" in jpeg:
             computeComprRate(self, jpeg["data"].size)
-        if not self.has("producer") and "photoshop" in jpeg:
-            self.producer = u"Adobe Photoshop"
-        if self.has("compression"):
-            self.compression = "JPEG"
 
     @fault_tolerant
     def startOfFrame(self, sof):
@@ -102,6 +130,7 @@ class JpegMetadata(RootMetadata):
             self.pixel_format = _("Grayscale")
             self.nb_colors = 256
 
+    @produces("comment")
     @fault_tolerant
     def computeQuality(self, jpeg):
         # This function is an adaption to Python of ImageMagick code
@@ -7,7 +7,7 @@ from hachoir_core.error import error, HACHOIR_ERRORS
 from hachoir_core.i18n import _
 from hachoir_core.log import Logger
 from hachoir_metadata.metadata_item import (
-    MIN_PRIORITY, MAX_PRIORITY, QUALITY_NORMAL)
+    MIN_PRIORITY, MAX_PRIORITY, QUALITY_NORMAL, DataValue, exportValue)
 from hachoir_metadata.register import registerAllItems
 
 extractors = {}
@@ -19,14 +19,17 @@ class Metadata(Logger):
         assert isinstance(self.header, unicode)
 
         # Limit to 0.0 .. 1.0
-        if parent:
+        if parent is not None:
             quality = parent.quality
+            requested_keys = parent.requested_keys
         else:
             quality = min(max(0.0, quality), 1.0)
+            requested_keys = None
 
         object.__init__(self)
         object.__setattr__(self, "_Metadata__data", {})
         object.__setattr__(self, "quality", quality)
+        object.__setattr__(self, "requested_keys", requested_keys)
         header = self.__class__.header
         object.__setattr__(self, "_Metadata__header", header)
 
@@ -109,6 +112,49 @@ class Metadata(Logger):
         else:
             return default
 
+    def requestKeys(self, keys):
+        """
+        Only extract the metadata 'keys' (list of keys, None means all
+        keys): extractor steps which don't produce any of them are skipped
+        (see hachoir_metadata.safe.produces()). Groups created later use
+        the same keys.
+
+        >>> meta = RootMetadata()
+        >>> meta.requestKeys(["width", "height"])
+        >>> meta.wants("duration"), meta.wants("duration", "width")
+        (False, True)
+        >>> try:
+        ...     meta.requestKeys(["witdh"])
+        ... except KeyError, err:
+        ...     print err.args[0]
+        RootMetadata has no metadata 'witdh'
+        """
+        if keys is not None:
+            for key in keys:
+                if key not in self.__data:
+                    raise KeyError(_("%s has no metadata '%s'") % (self.__class__.__name__, key))
+            keys = frozenset(keys)
+        object.__setattr__(self, "requested_keys", keys)
+
+    def wants(self, *keys):
+        """
+        Check if one of the metadata 'keys' is requested (see requestKeys()).
+        """
+        if self.requested_keys is None:
+            return True
+        return any(key in self.requested_keys for key in keys)
+
+    def keepRequestedKeys(self):
+        """
+        Remove the values of the metadata which are not requested: an
+        extractor step may produce other keys than the requested ones.
+        """
+        if self.requested_keys is None:
+            return
+        for data in self.__data.itervalues():
+            if data.key not in self.requested_keys:
+                data.values = []
+
     def register(self, data):
         assert data.key not in self.__data
         data.metadata = self
@@ -177,11 +223,10 @@ class Metadata(Logger):
         if not title:
             title = self.header
         text = ["%s:" % title]
-        for data in sorted(self):
+        # Only sort the datas with values
+        for data in sorted([ data for data in self if data.values ]):
             if priority < data.priority:
                 break
-            if not data.values:
-                continue
             if human:
                 title = data.description
             else:
@@ -197,6 +242,48 @@ class Metadata(Logger):
         else:
             return None
 
+    def exportDictionary(self, priority=None):
+        """
+        Export the raw values (see exportValue()) as a dictionary:
+        {"metadata": {key: [value, ...]}}, skipping datas with priority
+        lower than specified priority. Values are not converted to text,
+        the dictionary can be written in JSON.
+
+        >>> from datetime import timedelta
+        >>> meta = RootMetadata()
+        >>> meta.duration = timedelta(seconds=2300)
+        >>> meta.title = u"Hachoir"
+        >>> values = meta.exportDictionary()["metadata"]
+        >>> values["duration"], values["title"]
+        ([2300.0], [u'Hachoir'])
+        >>> meta.exportDictionary(priority=100)
+        {'metadata': {'title': [u'Hachoir']}}
+
+        @see exportPlaintext()
+        """
+        if priority is not None:
+            priority = max(priority, MIN_PRIORITY)
+            priority = min(priority, MAX_PRIORITY)
+        else:
+            priority = MAX_PRIORITY
+        values = {}
+        for data in sorted([ data for data in self if data.values ]):
+            if priority < data.priority:
+                break
+            values[data.key] = [ exportValue(item.value) for item in data.values ]
+        return {"metadata": values}
+
+    def exportState(self):
+        """
+        Export the header and the values with their text, to store the
+        metadata and create them again later with restoreMetadata():
+        (header, [(key, [(value, text), ...]), ...], groups). groups is
+        None if the metadata has no group.
+        """
+        items = [ (data.key, [ (item.value, item.text) for item in data.values ])
+            for data in self if data.values ]
+        return (self.header, items, None)
+
     def __nonzero__(self):
         return any(item for item in self.__data.itervalues())
 
@@ -265,27 +352,94 @@ class MultipleMetadata(RootMetadata):
         else:
             return None
 
+    def keepRequestedKeys(self):
+        Metadata.keepRequestedKeys(self)
+        for metadata in self.__groups.itervalues():
+            metadata.keepRequestedKeys()
+
+    def exportDictionary(self, priority=None):
+        """
+        Export the raw values of the common metadata and of the groups:
+        {"metadata": {...}, "groups": {key: {"metadata": {...}}, ...}}.
+        Empty groups are skipped.
+        """
+        result = Metadata.exportDictionary(self, priority)
+        groups = {}
+        for key, metadata in self.__groups.iteritems():
+            value = metadata.exportDictionary(priority)
+            if value["metadata"] or value.get("groups"):
+                groups[key] = value
+        if groups:
+            result["groups"] = groups
+        return result
+
+    def exportState(self):
+        header, items, groups = Metadata.exportState(self)
+        groups = [ (key, metadata.exportState())
+            for key, metadata in self.__groups.iteritems() ]
+        return (header, items, groups)
+
+def restoreMetadata(state, quality=QUALITY_NORMAL):
+    """
+    Create metadata from the result of Metadata.exportState(): a
+    RootMetadata, or a MultipleMetadata if the metadata had groups. Values
+    are not converted nor filtered again.
+
+    >>> meta = MultipleMetadata()
+    >>> meta.title = u"Hachoir"
+    >>> video = RootMetadata()
+    >>> video.width = 320
+    >>> meta.addGroup("video[]", video, u"Video stream")
+    True
+    >>> print unicode(restoreMetadata(meta.exportState()))
+    Common:
+    - Title: Hachoir
+    Video stream:
+    - Image width: 320 pixels
+    """
+    header, items, groups = state
+    if groups is None:
+        metadata = RootMetadata(quality)
+    else:
+        metadata = MultipleMetadata(quality)
+    metadata.setHeader(header)
+    for key, values in items:
+        metadata.getItems(key).values = [ DataValue(value, text)
+            for value, text in values ]
+    if groups:
+        for key, group in groups:
+            metadata.addGroup(key, restoreMetadata(group, quality))
+    return metadata
+
 def registerExtractor(parser, extractor):
     assert parser not in extractors
     assert issubclass(extractor, RootMetadata)
     extractors[parser] = extractor
 
-def extractMetadata(parser, quality=QUALITY_NORMAL):
+def extractMetadata(parser, quality=QUALITY_NORMAL, keys=None):
     """
     Create a Metadata class from a parser. Returns None if no metadata
     extractor does exist for the parser class.
+
+    If keys is set (list of metadata keys, eg. ["width", "height"]), only
+    these metadata are extracted: the extractor skips the steps (and the
+    fields they parse) which don't produce any of them.
     """
     try:
         extractor = extractors[parser.__class__]
     except KeyError:
         return None
     metadata = extractor(quality)
+    metadata.requestKeys(keys)
     try:
         metadata.extract(parser)
     except HACHOIR_ERRORS, err:
         error("Error during metadata extraction: %s" % unicode(err))
-    if metadata:
-        metadata.mime_type = parser.mime_type
-        metadata.endian = endian_name[parser.endian]
+    metadata.keepRequestedKeys()
+    if metadata or keys is not None:
+        if metadata.wants("mime_type"):
+            metadata.mime_type = parser.mime_type
+        if metadata.wants("endian"):
+            metadata.endian = endian_name[parser.endian]
     return metadata
 
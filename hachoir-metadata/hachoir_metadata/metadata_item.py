@@ -1,7 +1,9 @@
 from hachoir_core.tools import makeUnicode, normalizeNewline
 from hachoir_core.error import HACHOIR_ERRORS
+from hachoir_core.language import Language
 from hachoir_metadata import config
 from hachoir_metadata.setter import normalizeString
+from datetime import date, timedelta
 
 MIN_PRIORITY = 100
 MAX_PRIORITY = 999
@@ -17,6 +19,23 @@ class DataValue:
         self.value = value
         self.text = text
 
+def exportValue(value):
+    """
+    Convert a raw value to a JSON type: numbers and Unicode strings are
+    kept, a duration (timedelta) is converted to seconds, a date to an
+    ISO 8601 string, a language to its ISO 639-2 code and other values to
+    Unicode strings.
+    """
+    if isinstance(value, (bool, int, long, float, unicode)):
+        return value
+    if isinstance(value, timedelta):
+        return value.days * 86400 + value.seconds + value.microseconds / 1e6
+    if isinstance(value, date):
+        return unicode(value.isoformat())
+    if isinstance(value, Language):
+        return unicode(value.code)
+    return makeUnicode(value)
+
 class Data:
     def __init__(self, key, priority, description,
     text_handler=None, type=None, filter=None, conversion=None):
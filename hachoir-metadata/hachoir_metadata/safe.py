@@ -9,6 +9,22 @@ def fault_tolerant(func, *args):
                 func.__name__, err))
     return safe_func
 
+def produces(*keys):
+    """
+    Decorator of an extractor step (method of a Metadata class) producing
+    the metadata 'keys': the step is skipped if none of them is requested
+    (see Metadata.requestKeys()).
+    """
+    def decorator(func):
+        def step(self, *args, **kw):
+            if self.wants(*keys):
+                return func(self, *args, **kw)
+        step.__name__ = func.__name__
+        step.__doc__ = func.__doc__
+        step.keys = keys
+        return step
+    return decorator
+
 def getFieldAttribute(fieldset, key, attrname):
     try:
         field = fieldset[key]
@@ -2,7 +2,7 @@ from hachoir_core.field import MissingField
 from hachoir_metadata.metadata import (registerExtractor,
     Metadata, RootMetadata, MultipleMetadata)
 from hachoir_metadata.metadata_item import QUALITY_GOOD
-from hachoir_metadata.safe import fault_tolerant
+from hachoir_metadata.safe import fault_tolerant, produces
 from hachoir_parser.video import MovFile, AsfFile, FlvFile
 from hachoir_parser.video.asf import Descriptor as ASF_Descriptor
 from hachoir_parser.container import MkvFile
@@ -34,14 +34,17 @@ class MkvMetadata(MultipleMetadata):
             if field.name.startswith("Info["):
                 self.processInfo(field)
             elif field.name.startswith("Tags["):
-                for tag in field.array("Tag"):
-                    self.processTag(tag)
+                self.processTags(field)
             elif field.name.startswith("Tracks["):
                 self.processTracks(field)
             elif field.name.startswith("Cluster["):
-                if self.quality < QUALITY_GOOD:
+                # Tags may be stored after the clusters
+                if self.quality < QUALITY_GOOD \
+                or not self.wants(*self.tag_key.values()):
                     return
 
+    @produces("title", "language", "compression", "width", "height",
+        "sample_rate", "nb_channel", "bits_per_sample")
     def processTracks(self, tracks):
         for entry in tracks.array("TrackEntry"):
             self.processTrack(entry)
@@ -108,6 +111,11 @@ class MkvMetadata(MultipleMetadata):
             pass
         self.addGroup("subtitle[]", sub, "Subtitle")
 
+    @produces(*tag_key.values())
+    def processTags(self, tags):
+        for tag in tags.array("Tag"):
+            self.processTag(tag)
+
     def processTag(self, tag):
         for field in tag.array("SimpleTag"):
             self.processSimpleTag(field)
@@ -123,6 +131,7 @@ class MkvMetadata(MultipleMetadata):
         value = tag["TagString/unicode"].value
         setattr(self, key, value)
 
+    @produces("duration", "creation_date", "producer", "title")
     def processInfo(self, info):
         if "TimecodeScale/unsigned" in info:
             duration = self.getDouble(info, "Duration")
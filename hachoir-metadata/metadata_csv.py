@@ -2,14 +2,13 @@
 from hachoir_core.error import HachoirError
 from hachoir_core.cmd_line import unicodeFilename
 from hachoir_parser import createParser
-from hachoir_core.tools import makePrintable
 from hachoir_metadata import extractMetadata
+from hachoir_metadata.export import CSVExporter
 from hachoir_core.i18n import initLocale
 from sys import argv, stderr, exit
 from os import walk
 from os.path import join as path_join
 from fnmatch import fnmatch
-import codecs
 
 OUTPUT_FILENAME = "metadata.csv"
 
@@ -17,17 +16,17 @@ class Extractor:
     def __init__(self, directory, fields):
         self.directory = directory
         self.fields = fields
-        self.charset = "UTF-8"
         self.total = 0
         self.invalid = 0
 
     def main(self):
-        output = codecs.open(OUTPUT_FILENAME, "w", self.charset)
+        output = open(OUTPUT_FILENAME, "wb")
+        exporter = CSVExporter(output, keys=self.fields)
         for filename in self.findFiles(self.directory, '*.doc'):
             self.total += 1
-            line = self.processFile(filename)
-            if line:
-                print >>output, line
+            metadata = self.processFile(filename)
+            if metadata:
+                exporter.write(unicodeFilename(filename), metadata)
             else:
                 self.invalid += 1
         output.close()
@@ -63,14 +62,7 @@ class Extractor:
         if not metadata:
             print >>stderr, "Unable to extract metadata"
             return None
-
-        filename = makePrintable(filename, self.charset, to_unicode=True)
-        line = [filename]
-        for field in self.fields:
-            value = metadata.getText(field, u'')
-            value = makePrintable(value, self.charset, to_unicode=True)
-            line.append(value)
-        return '; '.join(line)
+        return metadata
 
 def main():
     initLocale()
@@ -24,7 +24,11 @@ def main():
 
     # Test documentation of some functions/classes
     testModule("hachoir_metadata.metadata")
+    testModule("hachoir_metadata.batch")
+    testModule("hachoir_metadata.cache")
     testModule("hachoir_metadata.setter")
+    testModule("hachoir_metadata.audio")
+    testModule("hachoir_metadata.export")
 
 if __name__ == "__main__":
     main()
@@ -196,6 +196,12 @@ class Bzip2Parser(Parser):
             return "Wrong blocksize"
         return True
 
+    @classmethod
+    def quickCheck(cls, data, pos):
+        if len(data) < pos + 4:
+            return True
+        return "1" <= data[pos+3] <= "9"
+
     def createFields(self):
         yield String(self, "id", 3, "Identifier (BZh)", charset="ASCII")
         yield Character(self, "blocksize", "Block size (KB of memory needed to uncompress)")
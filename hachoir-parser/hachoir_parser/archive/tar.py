@@ -11,6 +11,14 @@ from hachoir_core.tools import humanFilesize, paddingSize, timestampUNIX
 from hachoir_core.endian import BIG_ENDIAN
 import re
 
+# Skip the content of the members of non-seekable streams by steps of
+# SKIP_SIZE bytes, to keep a bounded number of blocks in memory (see InputPipe)
+SKIP_SIZE = 1024*1024
+
+# Types of the members without content: hard link, symbolic link, character
+# and block devices, directory and FIFO (their size field is ignored)
+NO_CONTENT_TYPES = "123456"
+
 class FileEntry(FieldSet):
     type_name = {
         # 48 is "0", 49 is "1", ...
@@ -122,3 +130,144 @@ class TarFile(Parser):
     def createContentSize(self):
         return self["terminator"].address + self["terminator"].size
 
+
+def parseTarNumber(text):
+    """
+    Parse a numeric field of a TAR header: octal string, or big-endian
+    binary number if the highest bit of the first byte is set (GNU
+    extension for sizes of 8 GB and more). Returns 0 on error.
+    """
+    if text and ord(text[0]) & 0x80:
+        value = ord(text[0]) & 0x7F
+        for char in text[1:]:
+            value = (value << 8) + ord(char)
+        return value
+    try:
+        return int(text.strip(" \0"), 8)
+    except ValueError:
+        return 0
+
+def parsePaxHeader(data):
+    """
+    Parse the records "length key=value\\n" of a PAX extended header:
+    returns a dictionary.
+    """
+    values = {}
+    pos = 0
+    while pos < len(data):
+        space = data.find(" ", pos)
+        if space < 0:
+            break
+        try:
+            length = int(data[pos:space])
+        except ValueError:
+            break
+        if length <= 0:
+            break
+        record = data[space+1:pos+length-1]
+        if "=" in record:
+            key, value = record.split("=", 1)
+            values[key] = value
+        pos += length
+    return values
+
+class TarIndexEntry(object):
+    """
+    Member of a TAR archive: name, offset of its header and size of its
+    content in bytes (the content starts at offset+512, or after the
+    extension headers of GNU sparse files), modification time (UNIX
+    timestamp) and type (see FileEntry.type_name).
+    """
+    __slots__ = ("name", "offset", "size", "mtime", "type")
+
+    def __init__(self, name, offset, size, mtime, type):
+        self.name = name
+        self.offset = offset
+        self.size = size
+        self.mtime = mtime
+        self.type = type
+
+    def __repr__(self):
+        return "<TarIndexEntry name=%r, offset=%s, size=%s>" % (
+            self.name, self.offset, self.size)
+
+def iterTarIndex(stream, offset=0):
+    """
+    Generator listing the members (TarIndexEntry objects) of the TAR
+    archive of stream, starting at offset (in bytes). Only the 512 bytes
+    headers are read: the content of the members is skipped using the size
+    field, and no field is created. Entries are yielded as soon as their
+    header is read, so the stream can be a pipe (InputPipe) read forward.
+
+    GNU long names ("L" headers), GNU sparse files, PAX extended headers
+    ("x" and Solaris "X" headers: path, size and mtime) and the ustar name
+    prefix are supported.
+    """
+    long_name = None
+    pax = {}
+    position = offset
+    while True:
+        if stream.size is None:
+            # Non-seekable stream: skip the content by steps
+            position += SKIP_SIZE
+            while position < offset and stream.sizeGe(position * 8):
+                position += SKIP_SIZE
+        if not stream.sizeGe((offset + 512) * 8):
+            break
+        header = stream.readBytes(offset * 8, 512)
+        position = offset + 512
+        if header[0] == "\0":
+            # Terminator (empty header)
+            break
+        size = parseTarNumber(header[124:136])
+        type = header[156]
+        content = offset + 512
+        next_offset = content + (size + 511) // 512 * 512
+        if type in "LxXgK":
+            if type != "g" and not stream.sizeGe((content + size) * 8):
+                break
+            if type == "L":
+                long_name = stream.readBytes(content * 8, size).split("\0", 1)[0]
+                position = content + size
+            elif type in "xX":
+                pax = parsePaxHeader(stream.readBytes(content * 8, size))
+                position = content + size
+            offset = next_offset
+            continue
+
+        name = header[:100].split("\0", 1)[0]
+        if header[257:263] == "ustar\0" and header[345] != "\0":
+            # POSIX ustar format: name prefix
+            name = header[345:500].split("\0", 1)[0] + "/" + name
+        if long_name is not None:
+            name = long_name
+        mtime = parseTarNumber(header[136:148])
+        if pax:
+            if "path" in pax:
+                name = unicode(pax["path"], "UTF-8", "replace")
+            try:
+                if "size" in pax:
+                    size = int(pax["size"])
+                    next_offset = content + (size + 511) // 512 * 512
+                if "mtime" in pax:
+                    mtime = int(float(pax["mtime"]))
+            except ValueError:
+                pass
+        if not isinstance(name, unicode):
+            name = unicode(name, "ISO-8859-1")
+        if type in NO_CONTENT_TYPES:
+            size = 0
+            next_offset = content
+        elif type == "S" and header[482] != "\0":
+            # GNU sparse file: skip the extension headers
+            while stream.sizeGe((content + 512) * 8):
+                extension = stream.readBytes(content * 8, 512)
+                content += 512
+                position = content
+                if extension[504] == "\0":
+                    break
+            next_offset = content + (size + 511) // 512 * 512
+        yield TarIndexEntry(name, offset, size, mtime, ord(type))
+        long_name = None
+        pax = {}
+        offset = next_offset
@@ -5,8 +5,9 @@ Status: can read most important headers
 Authors: Christophe Gisquet and Victor Stinner
 """
 
-from hachoir_parser import Parser
-from hachoir_core.field import (FieldSet, ParserError,
+from hachoir_parser import HachoirParser
+from hachoir_core.field import (FieldSet, RootSeekableFieldSet, ParserError,
+    MissingField,
     Bit, Bits, Enum,
     TimeDateMSDOS32, SubFile,
     UInt8, UInt16, UInt32, UInt64,
@@ -17,6 +18,7 @@ from hachoir_core.error import HACHOIR_ERRORS
 from hachoir_core.tools import makeUnicode
 from hachoir_core.endian import LITTLE_ENDIAN
 from hachoir_parser.common.deflate import Deflate
+from struct import unpack
 
 MAX_FILESIZE = 1000 * 1024 * 1024
 
@@ -110,6 +112,7 @@ class ZipGeneralFlags(FieldSet):
 
 class ExtraField(FieldSet):
     EXTRA_FIELD_ID = {
+        0x0001: "ZIP64 extended information",
         0x0007: "AV Info",
         0x0009: "OS/2 extended attributes (also Info-ZIP)",
         0x000a: "PKWARE Win95/WinNT FileTimes", # undocumented!
@@ -135,13 +138,47 @@ class ExtraField(FieldSet):
         0x7855: "Info-ZIP Unix (new)",
         0xfb4a: "SMS/QDOS",
     }
+    # Values of the ZIP64 extended information: (name, field class,
+    # value of the header field if the value is in the extra field)
+    ZIP64_FIELDS = (
+        ("uncompressed_size", UInt64, 0xFFFFFFFF, "Uncompressed size"),
+        ("compressed_size", UInt64, 0xFFFFFFFF, "Compressed size"),
+        ("offset_header", UInt64, 0xFFFFFFFF, "Relative offset of local header"),
+        ("disk_number_start", UInt32, 0xFFFF, "Disk number start"),
+    )
+
     def createFields(self):
         yield Enum(UInt16(self, "field_id", "Extra field ID"),
                    self.EXTRA_FIELD_ID)
         size = UInt16(self, "field_data_size", "Extra field data size")
         yield size
-        if size.value > 0:
-            yield RawBytes(self, "field_data", size.value, "Unknown field data")
+        end = 4 + size.value
+        if self["field_id"].value == 0x0001:
+            for field in self.createZip64Fields(end):
+                yield field
+        size = end - self.current_size // 8
+        if size > 0:
+            yield RawBytes(self, "field_data", size, "Unknown field data")
+
+    def createZip64Fields(self, end):
+        """
+        Fields of the ZIP64 extended information: 64-bit values of the
+        header fields set to 0xFFFFFFFF (0xFFFF for the disk number), in this
+        order. The local header always stores both sizes.
+        """
+        header = self.parent.parent
+        for name, field_cls, maximum, description in self.ZIP64_FIELDS:
+            if isinstance(header, FileEntry):
+                if name not in ("uncompressed_size", "compressed_size"):
+                    break
+            elif header[name].value != maximum:
+                continue
+            if end < self.current_size // 8 + field_cls.static_size // 8:
+                break
+            field = field_cls(self, name, description)
+            if name.endswith("_size"):
+                field = filesizeHandler(field)
+            yield field
 
 class ExtraFields(FieldSet):
     def createFields(self):
@@ -160,6 +197,37 @@ def ZipStartCommonFields(self):
     yield UInt16(self, "filename_length", "Filename length")
     yield UInt16(self, "extra_length", "Extra fields length")
 
+def getZip64Value(extra, offset):
+    """
+    Read the 64-bit value at offset (in bytes) of the ZIP64 extended
+    information extra field (0x0001) in the extra fields 'extra' (string).
+    Returns None if there is no such value.
+    """
+    pos = 0
+    while pos + 4 <= len(extra):
+        field_id, size = unpack("<HH", extra[pos:pos+4])
+        pos += 4
+        if field_id == 0x0001:
+            if offset + 8 <= size and pos + offset + 8 <= len(extra):
+                return unpack("<Q", extra[pos+offset:pos+offset+8])[0]
+            return None
+        pos += size
+    return None
+
+def getZip64Field(header, name):
+    """
+    Get the field 'name' of the header 'header' (file entry or central
+    directory): if the header value is 0xFFFFFFFF (0xFFFF for the disk
+    number), get the field of the ZIP64 extended information extra field
+    instead.
+    """
+    field = header[name]
+    if field.value == (1 << field.size) - 1 and "extra" in header:
+        for extra in header["extra"]:
+            if name in extra:
+                return extra[name]
+    return field
+
 def zipGetCharset(self):
     if self["flags/uses_unicode"].value:
         return "UTF-8"
@@ -209,8 +277,10 @@ class Zip64EndCentralDirectory(FieldSet):
                      "Total number of entries in the central directory")
         yield UInt64(self, "size", "Size of the central directory")
         yield UInt64(self, "offset", "Offset of start of central directory")
-        if 0 < self["zip64_end_size"].value:
-            yield RawBytes(self, "data_sector", self["zip64_end_size"].value,
+        # zip64_end_size doesn't include the first 12 bytes of the record
+        size = self["zip64_end_size"].value - (self.current_size // 8 - 8)
+        if 0 < size:
+            yield RawBytes(self, "data_sector", size,
                            "zip64 extensible data sector")
 
 class ZipEndCentralDirectory(FieldSet):
@@ -271,6 +341,28 @@ class FileEntry(FieldSet):
             raise ParserError("Bad resync: position=>%i but data_desc=>%i" %
                               (size, data_desc["file_compressed_size"].value))
 
+    def createSize(self):
+        # Read the local header directly: version_needed (16 bits), flags (16),
+        # compression (16), last_mod (32), crc32 (32), compressed_size (32),
+        # uncompressed_size (32), filename_length (16), extra_length (16)
+        address = self.absolute_address
+        flags = self.stream.readBits(address + 16, 16, LITTLE_ENDIAN)
+        crc32 = self.stream.readBits(address + 80, 32, LITTLE_ENDIAN)
+        size = self.stream.readBits(address + 112, 32, LITTLE_ENDIAN)
+        if not size and flags & 0x1000:
+            # Incomplete entry: search the data descriptor
+            return None
+        filename_length = self.stream.readBits(address + 176, 16, LITTLE_ENDIAN)
+        extra_length = self.stream.readBits(address + 192, 16, LITTLE_ENDIAN)
+        if size == 0xFFFFFFFF:
+            size = self.zip64Size(address + (26 + filename_length)*8, extra_length)
+            if size is None:
+                return None
+        size += 26 + filename_length + extra_length
+        if flags & 0x0008 and not crc32:
+            size += ZipDataDescriptor.static_size // 8
+        return size * 8
+
     def createFields(self):
         for field in ZipStartCommonFields(self):
             yield field
@@ -285,7 +377,7 @@ class FileEntry(FieldSet):
         if self["extra_length"].value:
             yield ExtraFields(self, "extra", size=self["extra_length"].value*8,
                            description="Extra fields")
-        size = self["compressed_size"].value
+        size = getZip64Field(self, "compressed_size").value
         if size > 0:
             yield self.data(size)
         elif self["flags/incomplete"].value:
@@ -294,9 +386,18 @@ class FileEntry(FieldSet):
         if self["flags/has_descriptor"].value and self['crc32'].value == 0:
             yield ZipDataDescriptor(self, "data_desc", "Data descriptor")
 
+    def zip64Size(self, address, size):
+        """
+        Read the compressed size in the ZIP64 extra field of the local
+        header (without creating fields): extra fields are size bytes at
+        address (in bits).
+        """
+        # The local header stores the uncompressed and then the compressed size
+        return getZip64Value(self.stream.readBytes(address, size), 8)
+
     def createDescription(self):
         return "File entry: %s (%s)" % \
-            (self["filename"].value, self["compressed_size"].display)
+            (self["filename"].value, getZip64Field(self, "compressed_size").display)
 
     def validate(self):
         if self["compression"].value not in COMPRESSION_METHOD:
@@ -318,7 +419,7 @@ class Zip64EndCentralDirectoryLocator(FieldSet):
         yield UInt32(self, "disk_total_number", "Total number of disks")
 
 
-class ZipFile(Parser):
+class ZipFile(HachoirParser, RootSeekableFieldSet):
     endian = LITTLE_ENDIAN
     MIME_TYPES = {
         # Default ZIP archive
@@ -370,9 +471,17 @@ class ZipFile(Parser):
         "min_size": (4 + 26)*8, # header + file entry
         "description": "ZIP archive"
     }
+    _directory = None
+    # Fields after the central directory
+    TRAILER_FIELDS = ("signature", "end64_central_directory", "end_locator",
+        "end_central_directory")
+
+    def __init__(self, stream, **args):
+        RootSeekableFieldSet.__init__(self, None, "root", stream, None, stream.askSize(self))
+        HachoirParser.__init__(self, stream, **args)
 
     def validate(self):
-        if self["header[0]"].value != FileEntry.HEADER:
+        if self.stream.readBits(0, 32, LITTLE_ENDIAN) != FileEntry.HEADER:
             return "Invalid magic"
         try:
             file0 = self["file[0]"]
@@ -383,10 +492,211 @@ class ZipFile(Parser):
             return "File #0: %s" % err
         return True
 
+    def findCentralDirectory(self):
+        """
+        Search the end of central directory from the end of the archive.
+        Returns (end, end64, offset, size): addresses (in bits) of the end
+        of central directory and of the ZIP64 end of central directory
+        (None if it's not a ZIP64 archive), offset and size (in bytes) of
+        the central directory. Returns None if the archive has no valid
+        central directory (eg. truncated or multi-disk archive).
+        """
+        # Don't read the whole stream to get its size (eg. pipe)
+        if self._size is None and self.stream.size is None:
+            return None
+        # The end of central directory is 22 bytes long, plus a comment
+        # of 65535 bytes at most
+        end = self.searchTrailer("PK\5\6", 22 + 65535)
+        if end is None:
+            return None
+        def read(address, size):
+            return self.stream.readBits(address, size, LITTLE_ENDIAN)
+        if read(end + 4*8, 16) or read(end + 6*8, 16):
+            return None
+        size = read(end + 12*8, 32)
+        offset = read(end + 16*8, 32)
+        end64 = None
+        if 20*8 <= end \
+        and read(end - 20*8, 32) == Zip64EndCentralDirectoryLocator.HEADER:
+            # ZIP64: read the ZIP64 end of central directory
+            end64 = read(end - 12*8, 64) * 8
+            if end - 20*8 < end64 + 56*8 \
+            or read(end64, 32) != Zip64EndCentralDirectory.HEADER \
+            or read(end64 + 16*8, 32) or read(end64 + 20*8, 32):
+                return None
+            size = read(end64 + 40*8, 64)
+            offset = read(end64 + 48*8, 64)
+            directory_end = end64 // 8
+        else:
+            directory_end = end // 8
+        if offset + size != directory_end:
+            return None
+        if size and read(offset*8, 32) != ZipCentralDirectory.HEADER:
+            return None
+        return end, end64, offset, size
+
+    def readCentralDirectory(self):
+        """
+        Read the central directory (without creating fields) to index the
+        file entries by offset and by filename, and create a checkpoint
+        for each file entry: file[] fields are created directly at their
+        offset. Returns False if the archive has no valid central
+        directory, True otherwise.
+        """
+        if self._directory is not None:
+            return bool(self._directory)
+        self._directory = False
+        directory = self.findCentralDirectory()
+        if directory is None:
+            return False
+        end, end64, offset, size = directory
+        data = self.stream.readBytes(offset*8, size)
+        offsets = {}
+        filenames = []
+        signature = False
+        count = 0
+        pos = 0
+        while pos < size:
+            magic = data[pos:pos+4]
+            if magic == "PK\1\2" and pos + 46 <= size:
+                values = unpack("<IHHHHHHIIIHHHHHII", data[pos:pos+46])
+                flags, compressed_size, uncompressed_size = values[3], values[8], values[9]
+                filename_length, extra_length, comment_length = values[10:13]
+                header = values[16]
+                start = pos + 46
+                pos = start + filename_length + extra_length + comment_length
+                if size < pos:
+                    return False
+                if header == 0xFFFFFFFF:
+                    extra = data[start+filename_length:start+filename_length+extra_length]
+                    skip = 0
+                    if uncompressed_size == 0xFFFFFFFF:
+                        skip += 8
+                    if compressed_size == 0xFFFFFFFF:
+                        skip += 8
+                    header = getZip64Value(extra, skip)
+                count += 1
+                if header is None or offset < header + 30:
+                    self.warning("Invalid file entry offset: %s" % header)
+                    continue
+                if flags & 0x0800:
+                    charset = "UTF-8"
+                else:
+                    charset = "ISO-8859-15"
+                filename = unicode(data[start:start+filename_length], charset, "replace")
+                offsets[header] = True
+                filenames.append((filename, header))
+            elif magic == "PK\5\5" and pos + 6 <= size and not signature:
+                signature = True
+                pos += 6 + unpack("<H", data[pos+4:pos+6])[0]
+            else:
+                return False
+        if pos != size:
+            return False
+
+        # Index of the file entries (file[] fields are sorted by offset)
+        offsets = offsets.keys()
+        offsets.sort()
+        index = dict((header, item) for item, header in enumerate(offsets))
+        self._filenames = {}
+        for filename, header in filenames:
+            self._filenames.setdefault(filename, index[header])
+        self._offsets = offsets
+        self._directory = (end, end64, offset, count, signature)
+
+        # Checkpoint of the file entry N: fields "header[]" and "file[]"
+        # of the previous entries are skipped. The last checkpoint skips
+        # all file entries to read the central directory.
+        counts = {}
+        checkpoints = []
+        for item, header in enumerate(offsets):
+            checkpoints.append((2 * item, header * 8, dict(counts), (item,)))
+            counts["header"] = 2 * item + 1
+            counts["file"] = item
+        if offsets:
+            checkpoints.append((2 * len(offsets), offset * 8, counts, (len(offsets),)))
+        self.setCheckpoints(checkpoints)
+        return True
+
+    def _getField(self, name, const):
+        # Create the checkpoints before searching a field
+        if not const and self.readCentralDirectory() \
+        and name in self.TRAILER_FIELDS and self._offsets:
+            # Fields after the central directory: skip the file entries
+            self._jumpToCheckpoint(self._checkpoints[-1])
+            field = RootSeekableFieldSet._getField(self, name, True)
+            if field is None and self._field_generator is not None:
+                field = self._feedUntil(name)
+            if field is not None:
+                return field
+        return RootSeekableFieldSet._getField(self, name, const)
+
+    def getFileEntry(self, filename):
+        """
+        Get the file entry (file[] field) of the file called filename. If
+        the archive has a central directory, only this file entry is
+        parsed. Raise MissingField if there is no such file.
+        """
+        if self.readCentralDirectory():
+            try:
+                return self["file[%u]" % self._filenames[filename]]
+            except KeyError:
+                raise MissingField(self, filename)
+        for entry in self.array("file"):
+            if "filename" in entry and entry["filename"].value == filename:
+                return entry
+        raise MissingField(self, filename)
+
     def createFields(self):
-        # File data
+        # Use the central directory (read from the end of the archive) if
+        # possible
         self.signature = None
         self.central_directory = []
+        if self.readCentralDirectory():
+            fields = self.resumeFields(0)
+        else:
+            fields = self.createForwardFields()
+        for field in fields:
+            yield field
+
+    def resumeFields(self, index):
+        """
+        Create the file entries (sorted by offset) from the file entry
+        number index, and then the central directory. Fields are in the
+        order of the archive, but file entries are created at the offsets
+        read from the central directory: checkpoints skip the previous file
+        entries.
+        """
+        offsets = self._offsets
+        for index in xrange(index, len(offsets)):
+            offset = offsets[index]
+            self.seekByte(offset)
+            header = textHandler(UInt32(self, "header[]", "Header"), hexadecimal)
+            if header.value != FileEntry.HEADER:
+                self.warning("Invalid file entry header at %s" % offset)
+            yield header
+            yield FileEntry(self, "file[]")
+
+        end, end64, offset, count, signature = self._directory
+        self.seekByte(offset)
+        for index in xrange(count):
+            yield textHandler(UInt32(self, "header[]", "Header"), hexadecimal)
+            yield ZipCentralDirectory(self, "central_directory[]")
+        if signature:
+            yield textHandler(UInt32(self, "header[]", "Header"), hexadecimal)
+            yield ZipSignature(self, "signature", "Signature")
+        if end64 is not None:
+            self.seekBit(end64)
+            yield textHandler(UInt32(self, "header[]", "Header"), hexadecimal)
+            yield Zip64EndCentralDirectory(self, "end64_central_directory", "ZIP64 end of central directory")
+            yield textHandler(UInt32(self, "header[]", "Header"), hexadecimal)
+            yield Zip64EndCentralDirectoryLocator(self, "end_locator", "ZIP64 Enf of central directory locator")
+        self.seekBit(end)
+        yield textHandler(UInt32(self, "header[]", "Header"), hexadecimal)
+        yield ZipEndCentralDirectory(self, "end_central_directory", "End of central directory")
+
+    def createForwardFields(self):
+        # File data
         while not self.eof:
             header = textHandler(UInt32(self, "header[]", "Header"), hexadecimal)
             yield header
@@ -401,6 +711,10 @@ class ZipFile(Parser):
                 yield ZipCentralDirectory(self, "central_directory[]")
             elif header == ZipEndCentralDirectory.HEADER:
                 yield ZipEndCentralDirectory(self, "end_central_directory", "End of central directory")
+                if self._size is None:
+                    # End of the archive in a stream of unknown size (eg.
+                    # pipe): don't read the data after it
+                    break
             elif header == Zip64EndCentralDirectory.HEADER:
                 yield Zip64EndCentralDirectory(self, "end64_central_directory", "ZIP64 end of central directory")
             elif header == ZipSignature.HEADER:
@@ -424,6 +738,11 @@ class ZipFile(Parser):
         return ".zip"
 
     def createContentSize(self):
+        directory = self.findCentralDirectory()
+        if directory is not None:
+            end = directory[0]
+            comment_length = self.stream.readBits(end + 20*8, 16, LITTLE_ENDIAN)
+            return end + (22 + comment_length)*8
         start = 0
         end = MAX_FILESIZE * 8
         end = self.stream.searchBytes("PK\5\6", start, end)
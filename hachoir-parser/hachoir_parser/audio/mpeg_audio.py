@@ -17,10 +17,14 @@ from hachoir_core.tools import humanFrequency, humanBitSize
 from hachoir_core.bits import long2raw
 from hachoir_core.error import HACHOIR_ERRORS
 from hachoir_core.stream import InputStreamError
+from struct import unpack
 
 # Max MP3 filesize: 200 MB
 MAX_FILESIZE = 200*1024*1024*8
 
+# Size of the chunks read by Frames.iterFrameHeaders() (64 KB)
+HEADER_CHUNK_SIZE = 64*1024
+
 class Frame(FieldSet):
     VERSION_NAME = { 0: "2.5", 2: "2", 3: "1" }
     MPEG_I = 3
@@ -172,6 +176,65 @@ class Frame(FieldSet):
             info.append(humanFrequency(sampling_rate))
         return "MPEG-%s %s" % (self["version"].display, ", ".join(info))
 
+# Number of samples per frame: SAMPLES_PER_FRAME[version][layer]
+SAMPLES_PER_FRAME = {
+    3: {Frame.LAYER_I: 384, Frame.LAYER_II: 1152, Frame.LAYER_III: 1152}, # MPEG1
+    2: {Frame.LAYER_I: 384, Frame.LAYER_II: 1152, Frame.LAYER_III: 576},  # MPEG2
+    0: {Frame.LAYER_I: 384, Frame.LAYER_II: 1152, Frame.LAYER_III: 576},  # MPEG2.5
+}
+
+# Cache of decodeFrameHeader(): header >> 9 => decoded header
+_decoded_headers = {}
+
+def decodeFrameHeader(header):
+    """
+    Decode the 32 bits header (big endian integer) of an MPEG audio frame
+    without creating fields. Returns (version, layer, bit_rate, sample_rate,
+    frame_size, nb_samples), with the bit rate in bit/sec and the frame size
+    in bytes, or None if the header is invalid (see Frame.isValid()).
+
+    >>> decodeFrameHeader(0xFFFB9064)
+    (3, 1, 128000, 44100, 417, 1152)
+    >>> decodeFrameHeader(0xFFFBF064) is None
+    True
+    """
+    if (header & 3) == 2:
+        # Invalid emphasis
+        return None
+    key = header >> 9
+    try:
+        return _decoded_headers[key]
+    except KeyError:
+        pass
+    version = (key >> 10) & 3
+    layer = (key >> 8) & 3
+    bit_rate = (key >> 3) & 15
+    rate = (key >> 1) & 3
+    padding = key & 1
+    if (key >> 12) != 2047 or version == 1 or layer == 0 \
+    or bit_rate in (0, 15) or rate == 3:
+        decoded = None
+    else:
+        if version == Frame.MPEG_I:
+            dataset = Frame.BIT_RATES[1]
+        else:
+            dataset = Frame.BIT_RATES[2]
+        bit_rate = dataset[3 - layer][bit_rate] * 1000
+        sample_rate = Frame.SAMPLING_RATES[version][rate]
+        if layer == Frame.LAYER_III:
+            if version == Frame.MPEG_I:
+                frame_size = (bit_rate * 144) // sample_rate + padding
+            else:
+                frame_size = (bit_rate * 72) // sample_rate + padding
+        elif layer == Frame.LAYER_II:
+            frame_size = (bit_rate * 144) // sample_rate + padding
+        else:
+            frame_size = ((bit_rate * 12) // sample_rate + padding) * 4
+        decoded = (version, layer, bit_rate, sample_rate, frame_size,
+            SAMPLES_PER_FRAME[version][layer])
+    _decoded_headers[key] = decoded
+    return decoded
+
 def findSynchronizeBits(parser, start, max_size):
     """
     Find synchronisation bits (11 bits set to 1)
@@ -207,6 +270,7 @@ def findSynchronizeBits(parser, start, max_size):
 class Frames(FieldSet):
     # Padding bytes allowed before a frame
     MAX_PADDING = 256
+    checkpoint_interval = 1000
 
     def synchronize(self):
         addr = self.absolute_address
@@ -238,12 +302,134 @@ class Frames(FieldSet):
                 break
         return True
 
+    def iterFrameHeaders(self, address=None, chunk_size=HEADER_CHUNK_SIZE):
+        """
+        Generator of the decoded headers (see decodeFrameHeader()) of the
+        consecutive frames starting at 'address' (absolute address in bits,
+        default: first frame). Only the frame headers are read, by chunks of
+        chunk_size bytes, no field is created. Stop at the first invalid
+        header.
+        """
+        if address is None:
+            address = self["frame[0]"].absolute_address
+        stream = self.stream
+        offset = address // 8
+        end = (self.absolute_address + self.size) // 8
+        chunk = ""
+        chunk_start = offset
+        while offset + 4 <= end:
+            pos = offset - chunk_start
+            if len(chunk) < pos + 4:
+                chunk_start = offset
+                chunk = stream.readBytes(offset * 8,
+                    min(chunk_size, end - offset))
+                pos = 0
+            decoded = decodeFrameHeader(unpack(">I", chunk[pos:pos+4])[0])
+            if not decoded:
+                break
+            yield decoded
+            offset += decoded[4]
+
+    def findFrameHeader(self, address, max_size=None):
+        """
+        Find the first frame at 'address' or after (absolute address in
+        bits) whose next frame header is valid and similar. Search in
+        max_size bytes (default: MAX_PADDING plus the maximum frame size).
+        Returns (address, decoded header) or None.
+        """
+        if max_size is None:
+            max_size = self.MAX_PADDING + 2881
+        stream = self.stream
+        end = min(address + max_size * 8, self.absolute_address + self.size)
+        while address + 32 <= end:
+            length = stream.searchBytesLength("\xff", False, address, end)
+            if length is None:
+                return None
+            address += length * 8
+            if end < address + 32:
+                return None
+            decoded = decodeFrameHeader(stream.readBits(address, 32, BIG_ENDIAN))
+            if decoded:
+                next = address + decoded[4] * 8
+                if self.absolute_address + self.size < next + 32:
+                    return (address, decoded)
+                next = decodeFrameHeader(stream.readBits(next, 32, BIG_ENDIAN))
+                if next and next[:2] == decoded[:2] and next[3] == decoded[3]:
+                    return (address, decoded)
+            address += 8
+        return None
+
+    def readVbrHeader(self):
+        """
+        Read the VBR header stored in the first frame: Xing (or "Info" for
+        constant bit rate), VBRI (Fraunhofer) and the LAME extension.
+        Returns None if there is no VBR header, or a dictionary with the
+        keys "tag" (str), "frames" (number of audio frames, excluding the
+        first frame), "bytes" (size of the audio frames, or None),
+        "delay" and "padding" (encoder delay and padding in samples).
+        """
+        address = self["frame[0]"].absolute_address
+        decoded = decodeFrameHeader(self.stream.readBits(address, 32, BIG_ENDIAN))
+        if not decoded:
+            return None
+        version, layer, bit_rate, sample_rate, frame_size, nb_samples = decoded
+        data = self.stream.readBytes(address,
+            min(frame_size, 192, (self.absolute_address + self.size - address) // 8))
+        header = unpack(">I", data[:4])[0]
+
+        # VBRI header is always stored after 32 bytes of side information
+        if data[36:40] == "VBRI" and 54 <= len(data):
+            size, frames = unpack(">II", data[46:54])
+            return {"tag": "VBRI", "frames": frames, "bytes": size,
+                "delay": unpack(">H", data[42:44])[0], "padding": 0}
+
+        # Xing header is stored after the side information
+        mono = ((header >> 6) & 3) == 3
+        if version == Frame.MPEG_I:
+            if mono:
+                offset = 4 + 17
+            else:
+                offset = 4 + 32
+        else:
+            if mono:
+                offset = 4 + 9
+            else:
+                offset = 4 + 17
+        if not (header & 0x10000):
+            # CRC16
+            offset += 2
+        tag = data[offset:offset+4]
+        if tag not in ("Xing", "Info") or len(data) < offset + 8:
+            return None
+        flags = unpack(">I", data[offset+4:offset+8])[0]
+        info = {"tag": tag, "frames": None, "bytes": None,
+            "delay": 0, "padding": 0}
+        offset += 8
+        for flag, key, size in ((1, "frames", 4), (2, "bytes", 4),
+                                (4, None, 100), (8, None, 4)):
+            if not (flags & flag):
+                continue
+            if key and offset + size <= len(data):
+                info[key] = unpack(">I", data[offset:offset+size])[0]
+            offset += size
+        if data[offset:offset+4] == "LAME" and offset + 24 <= len(data):
+            delay = unpack(">I", "\0" + data[offset+21:offset+24])[0]
+            info["delay"] = delay >> 12
+            info["padding"] = delay & 0xFFF
+        return info
+
     def createFields(self):
         # Find synchronisation bytes
         padding = self.synchronize()
         if padding:
             yield padding
+        for field in self.resumeFields():
+            yield field
+
+    def createCheckpoint(self):
+        return ()
 
+    def resumeFields(self):
         while self.current_size < self.size:
             yield Frame(self, "frame[]")
 #            padding = self.synchronize()
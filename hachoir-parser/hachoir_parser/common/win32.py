@@ -1,6 +1,5 @@
 from hachoir_core.field import (FieldSet,
     UInt16, UInt32, Enum, String, Bytes, Bits, TimestampUUID60)
-from hachoir_parser.video.fourcc import video_fourcc_name
 from hachoir_core.bits import str2hex
 from hachoir_core.text_handler import textHandler, hexadecimal
 from hachoir_parser.network.common import MAC48_Address
@@ -159,6 +158,8 @@ class BitmapInfoHeader(FieldSet):
         yield UInt16(self, "nb_planes", "Color planes")
         yield UInt16(self, "bpp", "Bits/pixel")
         if self._use_fourcc:
+            # Import here to avoid a circular import (win32 <=> video.asf)
+            from hachoir_parser.video.fourcc import video_fourcc_name
             yield Enum(String(self, "codec", 4, charset="ASCII"), video_fourcc_name)
         else:
             yield Enum(UInt32(self, "codec", "Compression"), self.COMPRESSION_NAME)
@@ -504,8 +504,11 @@ segment = {
 }
 
 class EBML(FieldSet):
-    def __init__(self, parent, ids):
-        FieldSet.__init__(self, parent, "?[]")
+    def __init__(self, parent, name="?[]", ids=None):
+        FieldSet.__init__(self, parent, name)
+        if ids is None:
+            # Created from a field index (see hachoir_parser.field_index)
+            ids = parent.getChildIds()
 
         # Set name
         id = self['id'].value
@@ -519,16 +522,32 @@ class EBML(FieldSet):
                 self.val = 'SignatureSlot[]', signature
             else:
                 self.val = 'Unknown[]', Binary
-        self._name = self.val[0]
-
-        # Compute size
+        if name == "?[]":
+            self._name = self.val[0]
+        self['size']
+        self._size = self.createSize()
+
+    def createSize(self):
+        if "size" not in self._fields:
+            # Called by _checkSize() while the header fields are added
+            return None
         size = self['size']
         if size.value is not None:
-            self._size = size.address + size.size + size.value * 8
+            return size.address + size.size + size.value * 8
         elif self._parent._parent:
             raise ParserError("Unknown length (only allowed for the last Level 0 element)")
         elif self._parent._size is not None:
-            self._size = self._parent._size - self.address
+            return self._parent._size - self.address
+        return None
+
+    def getChildIds(self):
+        """
+        Get the dictionary of the known child element identifiers
+        """
+        for val in self.val[1:]:
+            if not callable(val):
+                return val
+        return {}
 
     def createFields(self):
         yield RawInt(self, 'id')
@@ -538,7 +557,9 @@ class EBML(FieldSet):
                 yield val(self)
             else:
                 while not self.eof:
-                    yield EBML(self, val)
+                    yield EBML(self, ids=val)
+
+LEVEL0_SEGMENT = { 0x18538067: ('Segment[]', segment) }
 
 class MkvFile(Parser):
     EBML_SIGNATURE = 0x1A45DFA3
@@ -573,12 +594,17 @@ class MkvFile(Parser):
             return "Stream isn't a matroska document."
         return True
 
+    def getChildIds(self):
+        ids = dict(ebml)
+        ids.update(LEVEL0_SEGMENT)
+        return ids
+
     def createFields(self):
-        hdr = EBML(self, ebml)
+        hdr = EBML(self, ids=ebml)
         yield hdr
 
         while not self.eof:
-            yield EBML(self, { 0x18538067: ('Segment[]', segment) })
+            yield EBML(self, ids=LEVEL0_SEGMENT)
 
     def createContentSize(self):
         field = self["Segment[0]/size"]
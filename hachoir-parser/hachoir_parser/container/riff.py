@@ -249,7 +249,7 @@ class Chunk(FieldSet):
 
     def __init__(self, *args, **kw):
         FieldSet.__init__(self, *args, **kw)
-        self._size = (8 + alignValue(self["size"].value, 2)) * 8
+        self._size = self.createSize()
         tag = self["tag"].value
         if tag in self.TAG_INFO:
             self.tag_info = self.TAG_INFO[tag]
@@ -263,6 +263,10 @@ class Chunk(FieldSet):
         else:
             self.tag_info = ("field[]", None, None)
 
+    def createSize(self):
+        size = self.stream.readBits(self.absolute_address + 32, 32, self.endian)
+        return (8 + alignValue(size, 2)) * 8
+
     def createFields(self):
         yield String(self, "tag", 4, "Tag", charset="ASCII")
         yield filesizeHandler(UInt32(self, "size", "Size"))
@@ -0,0 +1,429 @@
+"""
+Persistent field index: store the flattened field tree of a file (path,
+type, absolute address, size and cheap values) and the checkpoints of its
+field sets, to get them later without parsing the file again.
+
+- createFieldIndex() creates the index of a parser ;
+- FieldIndex.save() writes the index in an index directory ;
+- loadFieldIndex() reads the index of a parser (if it's still valid) ;
+- FieldIndex.apply() attaches the index to the parser: indexed fields
+  (eg. parser["/segment[3]/cluster[10]"]) are created from the index
+  without parsing the previous fields, other far fields are reached from
+  the nearest checkpoint.
+
+A field is created from the index by calling its class with (parent, name,
+description, size) at the indexed address. createFieldIndex() only marks a
+field as rebuildable if the rebuilt field is the same as the parsed one
+(same size, value, description and first fields).
+
+The index of a file is identified by its absolute filename and is valid
+if the parser identifier, the hachoir-parser version and the file size,
+modification time and inode didn't change. An index can also store the
+content hash of the file: it's then still valid if the file was modified
+without changing its content, and it's also found without filename. The
+hash is only computed if the file metadata changed or if the filename is
+unknown.
+"""
+
+import os
+import sys
+import marshal
+import zlib
+from inspect import getargspec
+from itertools import islice
+from hachoir_core.error import HACHOIR_ERRORS, warning
+from hachoir_core.i18n import _
+from hachoir_parser.version import __version__
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import new as md5
+
+# Index file format
+MAGIC = "HACHOIR-INDEX\2"
+FILE_EXT = ".idx"
+
+# Only store values of fields smaller than MAX_VALUE_SIZE bits
+MAX_VALUE_SIZE = 256
+VALUE_TYPES = (bool, int, long, float, str, unicode)
+
+# Number of first fields of a field set compared to check that a field set
+# is rebuilt correctly
+CHECK_NB_FIELD = 3
+
+# Errors raised by field constructors called with unexpected arguments
+REBUILD_ERRORS = HACHOIR_ERRORS + (AssertionError,)
+
+# Size in bytes of a block read to compute the content hash
+HASH_BLOCK_SIZE = 1 << 20
+
+def streamHash(stream):
+    """
+    Compute MD5 hash (as hexadecimal string) of the stream content
+    """
+    hash = md5()
+    size = stream.size // 8
+    address = 0
+    while address < size:
+        length = min(HASH_BLOCK_SIZE, size - address)
+        hash.update(stream.readBytes(address * 8, length))
+        address += length
+    return hash.hexdigest()
+
+def streamFilename(stream):
+    """
+    Get the name of the file read by a stream (see FileInputStream()), or
+    None if it's unknown.
+    """
+    source = getattr(stream, "source", None)
+    if isinstance(source, basestring) and source.startswith("file:"):
+        return source[5:]
+    return None
+
+def getFileKey(filename):
+    """
+    Get (size, modification time, inode) of a file, or None on error.
+    """
+    try:
+        stat = os.stat(filename)
+    except (OSError, UnicodeError):
+        return None
+    return (stat.st_size, stat.st_mtime, stat.st_ino)
+
+def getIndexKey(parser, content_hash=False):
+    """
+    Create the key identifying the parsed content: (parser identifier,
+    parser version, file size, content hash). The hash is None if
+    content_hash is False.
+    """
+    if content_hash:
+        hash = streamHash(parser.stream)
+    else:
+        hash = None
+    return (parser.getParserTags()["id"], __version__,
+        parser.stream.size // 8, hash)
+
+def _indexFilename(directory, parser_id, filename=None, hash=None):
+    if filename:
+        filename = os.path.abspath(filename)
+        if isinstance(filename, unicode):
+            filename = filename.encode(sys.getfilesystemencoding() or "utf-8")
+        ident = (parser_id, filename)
+    else:
+        ident = (parser_id, hash)
+    return os.path.join(directory, md5(repr(ident)).hexdigest() + FILE_EXT)
+
+def _childPath(fieldset, name):
+    path = fieldset.path
+    if path == "/":
+        return "/" + name
+    return path + "/" + name
+
+def _rebuildField(fieldset, cls, name, address, size, description):
+    """
+    Create a field of class cls in fieldset at address (relative, in bits)
+    calling cls(fieldset, name, description=..., size=...). Returns None if
+    the constructor requires other arguments.
+    """
+    try:
+        args, varargs, varkw, defaults = getargspec(cls.__init__)
+    except TypeError:
+        return None
+    if 3 < len(args) - len(defaults or ()):
+        # Required arguments other than (self, parent, name)
+        return None
+    kw = {}
+    if "description" in args or varkw:
+        kw["description"] = description
+    if "size" in args or varkw:
+        kw["size"] = size
+    current_size = fieldset._current_size
+    fieldset._current_size = address
+    try:
+        return cls(fieldset, name, **kw)
+    finally:
+        fieldset._current_size = current_size
+
+def _sameField(field, copy):
+    """
+    Check that a rebuilt field is the same as the parsed field
+    """
+    if (copy.__class__, copy.name, copy.address, copy.size, copy.description) \
+    != (field.__class__, field.name, field.address, field.size, field.description):
+        return False
+    if not field.is_field_set:
+        return field.size > MAX_VALUE_SIZE or copy.value == field.value
+    fields = [ (item.name, item.__class__, item.address, item.size)
+        for item in islice(field, CHECK_NB_FIELD) ]
+    copy_fields = [ (item.name, item.__class__, item.address, item.size)
+        for item in islice(copy, CHECK_NB_FIELD) ]
+    return fields == copy_fields
+
+def _getRebuildInfo(fieldset, field):
+    """
+    Get (module, class name, description) to rebuild the field from the
+    index, or None if the field can't be rebuilt.
+    """
+    cls = field.__class__
+    module = sys.modules.get(cls.__module__)
+    if getattr(module, cls.__name__, None) is not cls:
+        return None
+    description = field._description
+    if not isinstance(description, (str, unicode)):
+        description = None
+    try:
+        copy = _rebuildField(fieldset, cls, field._name, field._address,
+            field.size, description)
+        if copy is None or not _sameField(field, copy):
+            return None
+    except REBUILD_ERRORS:
+        return None
+    return (cls.__module__, cls.__name__, description)
+
+class IndexEntry(object):
+    """
+    Field stored in a field index: path, type (class name), absolute
+    address and size in bits, and value (None if it's not stored).
+    """
+    __slots__ = ("path", "type", "address", "size", "value")
+
+    def __init__(self, path, type, address, size, value):
+        self.path = path
+        self.type = type
+        self.address = address
+        self.size = size
+        self.value = value
+
+    def __repr__(self):
+        return "<IndexEntry path=%r, type=%s, address=%s, size=%s>" % (
+            self.path, self.type, self.address, self.size)
+
+class FieldIndex(object):
+    """
+    Index of a parsed file. Use index[path] to get an IndexEntry.
+
+    key is the result of getIndexKey(), file_key the result of
+    getFileKey() (or None), and rebuild a dictionary: path => (module,
+    class name, description) of the fields which can be created from the
+    index.
+    """
+    def __init__(self, key, entries, checkpoints, filename=None,
+    file_key=None, rebuild=None):
+        self.key = key
+        self.entries = entries
+        self.checkpoints = checkpoints
+        self.filename = filename
+        self.file_key = file_key
+        if rebuild is None:
+            rebuild = {}
+        self.rebuild = rebuild
+        self._paths = None
+        self._classes = {}
+
+    def _getPaths(self):
+        if self._paths is None:
+            self._paths = dict( (entry[0], index)
+                for index, entry in enumerate(self.entries) )
+        return self._paths
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return path in self._getPaths()
+
+    def __getitem__(self, path):
+        return IndexEntry(*self.entries[self._getPaths()[path]])
+
+    def __iter__(self):
+        for entry in self.entries:
+            yield IndexEntry(*entry)
+
+    def _getClass(self, module, name):
+        key = (module, name)
+        if key not in self._classes:
+            try:
+                __import__(module)
+                cls = getattr(sys.modules[module], name)
+            except (ImportError, KeyError, AttributeError), err:
+                warning(_("Unable to use index of %s.%s: %s") % (module, name, err))
+                cls = None
+            self._classes[key] = cls
+        return self._classes[key]
+
+    def createField(self, fieldset, name):
+        """
+        Create the field 'name' of fieldset from the index, without
+        parsing fieldset. Returns None if the field is not indexed or
+        can't be rebuilt.
+        """
+        path = _childPath(fieldset, name)
+        try:
+            module, class_name, description = self.rebuild[path]
+        except KeyError:
+            return None
+        cls = self._getClass(module, class_name)
+        if cls is None:
+            return None
+        entry = self.entries[self._getPaths()[path]]
+        try:
+            return _rebuildField(fieldset, cls, name,
+                entry[2] - fieldset.absolute_address, entry[3], description)
+        except REBUILD_ERRORS, err:
+            warning(_("Unable to create %s from the index: %s") % (path, err))
+            return None
+
+    def apply(self, parser):
+        """
+        Attach the index to the parser: set the field_index attribute of
+        the parser (see createField()) and the checkpoints of the parser
+        field sets.
+        """
+        parser.field_index = self
+        paths = self.checkpoints.keys()
+        paths.sort(key=lambda path: path.count("/"))
+        for path in paths:
+            try:
+                fieldset = parser[path]
+            except HACHOIR_ERRORS, err:
+                warning(_("Unable to use index of %s: %s") % (path, err))
+                continue
+            fieldset.setCheckpoints(self.checkpoints[path])
+
+    def save(self, directory):
+        """
+        Write the index in directory. Returns the index filename.
+
+        An index with a content hash and a filename is written twice: with
+        the filename and with the hash as identifier.
+        """
+        data = marshal.dumps((self.key, self.file_key, self.entries,
+            self.checkpoints, self.rebuild))
+        data = MAGIC + zlib.compress(data)
+        parser_id, version, size, hash = self.key
+        filenames = []
+        if self.filename:
+            filenames.append(_indexFilename(directory, parser_id, filename=self.filename))
+        if hash:
+            filenames.append(_indexFilename(directory, parser_id, hash=hash))
+        for filename in filenames:
+            output = open(filename, "wb")
+            try:
+                output.write(data)
+            finally:
+                output.close()
+        return filenames[0]
+
+def _indexFields(fieldset, depth, entries, checkpoints, rebuild):
+    try:
+        for field in fieldset.iterStream():
+            value = None
+            if not field.is_field_set and field.size <= MAX_VALUE_SIZE:
+                value = field.value
+                if not isinstance(value, VALUE_TYPES):
+                    value = None
+            entries.append((field.path, field.__class__.__name__,
+                field.absolute_address, field.size, value))
+            info = _getRebuildInfo(fieldset, field)
+            if info:
+                rebuild[field.path] = info
+            if field.is_field_set and 1 < depth:
+                _indexFields(field, depth - 1, entries, checkpoints, rebuild)
+    except HACHOIR_ERRORS, err:
+        warning(_("Unable to index %s: %s") % (fieldset.path, err))
+    if fieldset.checkpoints:
+        checkpoints[fieldset.path] = fieldset.checkpoints
+
+def createFieldIndex(parser, filename=None, depth=2, content_hash=None):
+    """
+    Create the index of the depth first levels of the parser field tree.
+    The file size, modification time and inode of filename are used to
+    check that the index is still valid. If content_hash is True (default:
+    if filename is not set), the hash of the content is also stored.
+
+    The parser is parsed using GenericFieldSet.iterStream(): it's parsed
+    again if it's iterated later.
+    """
+    if content_hash is None:
+        content_hash = not filename
+    entries = []
+    checkpoints = {}
+    rebuild = {}
+    _indexFields(parser, depth, entries, checkpoints, rebuild)
+    key = getIndexKey(parser, content_hash)
+    if filename:
+        file_key = getFileKey(filename)
+    else:
+        file_key = None
+    for path, values in checkpoints.items():
+        try:
+            marshal.dumps(values)
+        except ValueError:
+            # resumeFields() arguments can't be stored
+            del checkpoints[path]
+    return FieldIndex(key, entries, checkpoints, filename, file_key, rebuild)
+
+def _readIndex(filename):
+    try:
+        input = open(filename, "rb")
+    except IOError:
+        return None
+    try:
+        data = input.read()
+    finally:
+        input.close()
+    if not data.startswith(MAGIC):
+        warning(_("Invalid field index: %s") % filename)
+        return None
+    try:
+        return marshal.loads(zlib.decompress(data[len(MAGIC):]))
+    except (zlib.error, ValueError, EOFError, TypeError), err:
+        warning(_("Invalid field index %s: %s") % (filename, err))
+        return None
+
+def loadFieldIndex(parser, directory, filename=None):
+    """
+    Load the index of a parser from directory. Returns None if there is no
+    index or if it's outdated. filename is the name of the parsed file
+    (default: name of the file read by the parser stream, see
+    streamFilename()).
+
+    The index is valid if the file size, modification time and inode
+    didn't change. Otherwise, or if the filename is unknown, the content
+    hash is computed and compared to the hash stored in the index (if
+    any).
+    """
+    if filename is None:
+        filename = streamFilename(parser.stream)
+    parser_id, version, size, hash = getIndexKey(parser)
+    if filename:
+        file_key = getFileKey(filename)
+    else:
+        file_key = None
+    if file_key is not None:
+        index_filename = _indexFilename(directory, parser_id, filename=filename)
+        data = _readIndex(index_filename)
+        if data is None:
+            return None
+    else:
+        hash = streamHash(parser.stream)
+        data = _readIndex(_indexFilename(directory, parser_id, hash=hash))
+        if data is None:
+            return None
+    try:
+        index_key, index_file_key, entries, checkpoints, rebuild = data
+    except (TypeError, ValueError), err:
+        warning(_("Invalid field index: %s") % err)
+        return None
+    if index_key[:3] != (parser_id, version, size):
+        return None
+    if file_key is None or file_key != index_file_key:
+        # File metadata changed (or unknown): compare the content hash
+        if not index_key[3]:
+            return None
+        if hash is None:
+            hash = streamHash(parser.stream)
+        if hash != index_key[3]:
+            return None
+    return FieldIndex(index_key, entries, checkpoints, filename,
+        index_file_key, rebuild)
@@ -2,7 +2,7 @@ from hachoir_core.compatibility import sorted
 from hachoir_parser import Parser
 from hachoir_core.field import (FieldSet, StaticFieldSet,
     RawBytes, PaddingBytes, createPaddingField, Link, Fragment,
-    Bit, Bits, UInt8, UInt16, UInt32,
+    Bit, Bits, UInt8, UInt16, UInt32, UInt16Array, UInt32Array,
     String, Bytes, NullBytes)
 from hachoir_core.field.integer import GenericInteger
 from hachoir_core.endian import LITTLE_ENDIAN
@@ -70,6 +70,18 @@ class FAT(FieldSet):
             text_handler = parent.text_handler
             while self.current_size < self._size:
                 yield textHandler(GenericInteger(self, 'entry[]', False, version), text_handler)
+
+        def getValues(self):
+            return [ entry.value for entry in self ]
+
+    class FAT16(UInt16Array):
+        def createItem(self, name):
+            return textHandler(UInt16(self, name), self.parent.text_handler)
+
+    class FAT32(UInt32Array):
+        def createItem(self, name):
+            return textHandler(UInt32(self, name), self.parent.text_handler)
+
     def createFields(self):
         version = self.parent.version
         max_entry = 1 << min(28, version)
@@ -90,7 +102,13 @@ class FAT(FieldSet):
                 return str(i)
         self.text_handler = FatEntry
         while self.current_size < self._size:
-            yield FAT.FAT(self, 'group[]', size=min(1000*version,self._size-self.current_size))
+            size = min(1000*version, self._size-self.current_size)
+            if version == 16:
+                yield FAT.FAT16(self, 'group[]', size // 16, 'entry')
+            elif version == 32:
+                yield FAT.FAT32(self, 'group[]', size // 32, 'entry')
+            else:
+                yield FAT.FAT(self, 'group[]', size=size)
 
 
 class Date(FieldSet):
@@ -335,7 +353,7 @@ class FAT_FS(Parser):
             clus_nb = 1
             next = cluster
             while True:
-                next = self.fat[next/1000][next%1000].value
+                next = self.fat[next/1000].getValues()[next%1000]
                 if not 1 < next < max_entry:
                     break
                 if cluster + clus_nb == next:
@@ -6,6 +6,7 @@ Parser list managment:
 import os
 from hachoir_core.error import warning, info, HACHOIR_ERRORS
 from hachoir_parser import ValidateError, HachoirParserList
+from hachoir_parser.field_index import loadFieldIndex
 from hachoir_core.stream import FileInputStream
 from hachoir_core.i18n import _
 import weakref
@@ -86,8 +87,11 @@ class QueryParser(object):
         else:
             parser = None
         if parser is not None:
-            if parser.__class__ in self.parsers:
-                return parser
+            # Compare identifiers: the parser list may contain LazyParser
+            parser_id = parser.getParserTags()["id"]
+            for item in self.parsers:
+                if item.getParserTags()["id"] == parser_id:
+                    return parser
             if self.use_fallback and parser.__class__ == fb:
                 return parser
         parser = self.doparse(stream, fallback)
@@ -95,9 +99,40 @@ class QueryParser(object):
             stream._cached_parser = weakref.ref(parser)
         return parser
 
+    def sortByMagic(self, stream):
+        """
+        Sort parsers which are not selected by a tag using the magic index:
+        parsers with a magic matching the stream first, then parsers
+        without magic, and finally parsers with a different magic (a magic
+        is a hint, a parser may accept a stream not starting with it).
+        """
+        size = self.db.magic_size
+        try:
+            if not stream.sizeGe(size * 8):
+                size = stream.size // 8
+            data = stream.readBytes(0, size)
+        except HACHOIR_ERRORS:
+            return
+        matched = self.db.matchMagic(data)
+        magic_parsers = self.db.magic_parsers
+        def rank(parser):
+            if parser in matched:
+                return 0
+            elif parser not in magic_parsers:
+                return 1
+            else:
+                return 2
+        index = self.parsers.index(self.other)
+        parsers = self.parsers[index:]
+        parsers.sort(key=rank)
+        self.parsers[index:] = parsers
+        self.other = parsers[0]
+
     def doparse(self, stream, fallback=True):
         fb = None
         warn = warning
+        if self.validate and self.other is not None:
+            self.sortByMagic(stream)
         for parser in self.parsers:
             try:
                 parser_obj = parser(stream, validate=self.validate)
@@ -125,15 +160,23 @@ def guessParser(stream):
     return QueryParser(stream.tags).parse(stream)
 
 
-def createParser(filename, real_filename=None, tags=None):
+def createParser(filename, real_filename=None, tags=None, index_dir=None):
     """
     Create a parser from a file or returns None on error.
 
     Options:
     - filename (unicode): Input file name ;
-    - real_filename (str|unicode): Real file name.
+    - real_filename (str|unicode): Real file name ;
+    - index_dir (str): Directory of field indexes (see
+      hachoir_parser.field_index), the index of the file is used if it
+      exists.
     """
     if not tags:
         tags = []
     stream = FileInputStream(filename, real_filename, tags=tags)
-    return guessParser(stream)
+    parser = guessParser(stream)
+    if parser is not None and index_dir:
+        index = loadFieldIndex(parser, index_dir, real_filename or filename)
+        if index is not None:
+            index.apply(parser)
+    return parser
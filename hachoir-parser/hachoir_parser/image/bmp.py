@@ -156,6 +156,14 @@ class BmpFile(Parser):
             return "Invalid number of planes"
         return True
 
+    @classmethod
+    def quickCheck(cls, data, pos):
+        # Check header/nb_plan (UInt16 at byte 26): the magic regex
+        # already checks header/header_size
+        if len(data) < pos + 28:
+            return True
+        return data[pos+26] == "\1" and data[pos+27] == "\0"
+
     def createFields(self):
         yield String(self, "signature", 2, "Header (\"BM\")", charset="ASCII")
         yield UInt32(self, "file_size", "File size (bytes)")
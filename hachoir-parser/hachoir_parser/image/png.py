@@ -185,7 +185,7 @@ class Chunk(FieldSet):
 
     def __init__(self, parent, name, description=None):
         FieldSet.__init__(self, parent, name, description)
-        self._size = (self["size"].value + 3*4) * 8
+        self._size = self.createSize()
         if MAX_CHUNK_SIZE < (self._size//8):
             raise ParserError("PNG: Chunk is too big (%s)"
                 % humanFilesize(self._size//8))
@@ -206,6 +206,10 @@ class Chunk(FieldSet):
             self._description = ""
             self.parse_func = None
 
+    def createSize(self):
+        size = self.stream.readBits(self.absolute_address, 32, self.endian)
+        return (size + 3*4) * 8
+
     def createFields(self):
         yield UInt32(self, "size", "Size")
         yield String(self, "tag", 4, "Tag", charset="ASCII")
@@ -16,8 +16,9 @@ Created: 2008-09-21
 """
 
 from hachoir_parser import HachoirParser
-from hachoir_core.field import (RootSeekableFieldSet, FieldSet, Enum,
-Bits, GenericInteger, Float32, Float64, UInt8, UInt64, Bytes, NullBytes, RawBytes, String)
+from hachoir_core.field import (RootSeekableFieldSet, FieldSet, Enum, ParserError,
+Bits, GenericInteger, Float32, Float64, UInt8, UInt16, UInt24, UInt32, UInt64,
+GenericIntegerArray, Bytes, NullBytes, RawBytes, String)
 from hachoir_core.endian import BIG_ENDIAN
 from hachoir_core.text_handler import displayHandler
 from hachoir_core.tools import humanDatetime
@@ -35,11 +36,15 @@ class BPListTrailer(FieldSet):
     def createDescription(self):
         return "Binary PList trailer"
 
-class BPListOffsetTable(FieldSet):
-    def createFields(self):
-        size = self["../trailer/offsetIntSize"].value*8
-        for i in range(self["../trailer/numObjects"].value):
-            yield Bits(self, "offset[]", size)
+class BPListOffsetTable(GenericIntegerArray):
+    OFFSET_CLASS = {1: UInt8, 2: UInt16, 3: UInt24, 4: UInt32, 8: UInt64}
+
+    def __init__(self, parent, name):
+        size = parent["trailer/offsetIntSize"].value
+        if size not in self.OFFSET_CLASS:
+            raise ParserError("Invalid offset size (%s bytes)" % size)
+        GenericIntegerArray.__init__(self, parent, name,
+            parent["trailer/numObjects"].value, self.OFFSET_CLASS[size], "offset")
 
 class BPListSize(FieldSet):
     def createFields(self):
@@ -282,12 +287,12 @@ class BPList(HachoirParser, RootSeekableFieldSet):
         yield BPListTrailer(self, "trailer")
         self.seekByte(self['trailer/offsetTableOffset'].value)
         yield BPListOffsetTable(self, "offset_table")
-        for i in self.array("offset_table/offset"):
-            if self.current_size > i.value*8:
-                self.seekByte(i.value)
-            elif self.current_size < i.value*8:
+        for offset in self["offset_table"].getValues():
+            if self.current_size > offset*8:
+                self.seekByte(offset)
+            elif self.current_size < offset*8:
                 # try to detect files with gaps or unparsed content
-                yield RawBytes(self, "padding[]", i.value-self.current_size//8)
+                yield RawBytes(self, "padding[]", offset-self.current_size//8)
             yield BPListObject(self, "object[]")
 
     def createXML(self, prefix=''):
@@ -23,7 +23,7 @@ Creation: 2006-04-23
 from hachoir_parser import HachoirParser
 from hachoir_core.field import (
     FieldSet, ParserError, SeekableFieldSet, RootSeekableFieldSet,
-    UInt8, UInt16, UInt32, UInt64, TimestampWin64, Enum,
+    UInt8, UInt16, UInt32, UInt64, UInt32Array, TimestampWin64, Enum,
     Bytes, NullBytes, String)
 from hachoir_core.text_handler import filesizeHandler
 from hachoir_core.endian import LITTLE_ENDIAN, BIG_ENDIAN
@@ -147,15 +147,15 @@ class Header(FieldSet):
 # Header (ole_id, header, difat) size in bytes
 HEADER_SIZE = 64 + Header.static_size + NB_DIFAT * SECT.static_size
 
-class SectFat(FieldSet):
+class SectFat(UInt32Array):
     def __init__(self, parent, name, start, count, description=None):
-        FieldSet.__init__(self, parent, name, description, size=count*32)
+        UInt32Array.__init__(self, parent, name, count, "index", description)
         self.count = count
         self.start = start
+        self.first_index = start
 
-    def createFields(self):
-        for i in xrange(self.start, self.start + self.count):
-            yield SECT(self, "index[%u]" % i)
+    def createItem(self, name):
+        return SECT(self, name)
 
 class OLE2_File(HachoirParser, RootSeekableFieldSet):
     PARSER_TAGS = {
@@ -309,9 +309,9 @@ class OLE2_File(HachoirParser, RootSeekableFieldSet):
             block_set.add(block)
             yield block
             previous = block
-            index = block // items_per_fat
+            index, entry = divmod(block, items_per_fat)
             try:
-                block = fat[index]["index[%u]" % block].value
+                block = fat[index].getValues()[entry]
             except LookupError, err:
                 break
 
@@ -352,8 +352,7 @@ class OLE2_File(HachoirParser, RootSeekableFieldSet):
     def createContentSize(self):
         max_block = 0
         for fat in self.array("bbfat"):
-            for entry in fat:
-                block = entry.value
+            for block in fat.getValues():
                 if block not in SECT.SPECIALS:
                     max_block = max(block, max_block)
         if max_block in SECT.SPECIALS:
@@ -21,11 +21,7 @@ ENDMAGIC = "%%EOF"
 def getLineEnd(s, pos=None):
     if pos == None:
         pos = (s.absolute_address+s.current_size)//8
-    end = s.stream.searchBytesLength("\x0D", False, 8*pos)
-    other_end = s.stream.searchBytesLength("\x0A", False, 8*pos)
-    if end == None or (other_end != None and other_end < end):
-        return other_end
-    return end
+    return s.stream.searchBytesLength(("\x0D", "\x0A"), False, 8*pos)
 
 # TODO: rewrite to account for all possible terminations: ' ', '/', '\0XD'
 #       But this probably requires changing *ALL* of the places they are used,
@@ -251,8 +247,10 @@ class Header(FieldSet):
         return "PDF version %s" % self["version"].display
 
 class Body(FieldSet):
-    def __init__(self, parent, name, desc=None):
-        FieldSet.__init__(self, parent, name, desc)
+    def __init__(self, parent, name, desc=None, size=None):
+        FieldSet.__init__(self, parent, name, desc, size)
+        if size is not None:
+            return
         pos = self.stream.searchBytesLength(CrossReferenceTable.MAGIC, False)
         if pos == None:
             raise ParserError("Can't find xref starting at %u" %
@@ -334,11 +332,13 @@ class SubSection(FieldSet):
 class CrossReferenceTable(FieldSet):
     MAGIC = "xref"
 
-    def __init__(self, parent, name, desc=None):
-        FieldSet.__init__(self, parent, name, description=desc)
+    def __init__(self, parent, name, desc=None, size=None):
+        FieldSet.__init__(self, parent, name, description=desc, size=size)
+        if size is not None:
+            return
         pos = self.stream.searchBytesLength(Trailer.MAGIC, False)
         if pos == None:
-            raise ParserError("Can't find '%s' starting at %u" \
+            raise ParserError("Can't find '%s' starting at %u" %
                               (Trailer.MAGIC, self.absolute_address//8))
         self._size = 8*pos-self.absolute_address
 
@@ -429,14 +429,48 @@ class PDFDocument(Parser):
             return "Invalid magic string"
         return True
 
-    # Size is not always determined by position of "%%EOF":
-    # - updated documents have several of those
-    # - PDF files should be parsed from *end*
-    # => TODO: find when a document has been updated
+    def findCrossReferenceTable(self):
+        """
+        Read "startxref" at the end of the document: return the addresses
+        (in bits) of the last cross-reference table and of its trailer, or
+        None if they can not be found.
+
+        Updated documents have several "%%EOF": the last cross-reference
+        table is the one of the last update.
+        """
+        # Don't read the whole stream to get its size (eg. pipe)
+        end = self.stream.size
+        if end is None:
+            return None
+        # "%%EOF" should be in the last 1024 bytes
+        address = self.stream.rsearchBytes("startxref", max(end - 1024*8, 0), end)
+        if address is None:
+            return None
+        start = address + len("startxref") * 8
+        data = self.stream.readBytes(start, min(32, (end - start) // 8))
+        try:
+            xref = int(data.split()[0]) * 8
+        except (IndexError, ValueError):
+            return None
+        if not (self.current_size <= xref < address) \
+        or self.stream.readBytes(xref, len(CrossReferenceTable.MAGIC)) != CrossReferenceTable.MAGIC:
+            return None
+        trailer = self.stream.rsearchBytes(Trailer.MAGIC, xref, address)
+        if trailer is None:
+            return None
+        return xref, trailer
 
     def createFields(self):
         yield Header(self, "header")
-        yield Body(self, "body")
-        yield CrossReferenceTable(self, "cross_ref_table")
+        # Parse the document from its end if possible: the sizes of the body
+        # and of the cross-reference table are known without reading them
+        found = self.findCrossReferenceTable()
+        if found:
+            xref, trailer = found
+            yield Body(self, "body", size=xref - self.current_size)
+            yield CrossReferenceTable(self, "cross_ref_table", size=trailer - xref)
+        else:
+            yield Body(self, "body")
+            yield CrossReferenceTable(self, "cross_ref_table")
         yield Trailer(self, "trailer")
 
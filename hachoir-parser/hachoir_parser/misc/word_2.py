@@ -141,6 +141,13 @@ class Word2DocumentParser(OLE2FragmentParser):
             return "Unknown FIB version."
         return True
 
+    @classmethod
+    def quickCheck(cls, data, pos):
+        # Check FIB/nFib without parsing the whole FIB
+        if len(data) < pos + 4:
+            return True
+        return data[pos+2] == '\x2d' and data[pos+3] == '\0'
+
     def createFields(self):
         yield FIB(self, "FIB", "File Information Block")
         
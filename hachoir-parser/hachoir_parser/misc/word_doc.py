@@ -267,6 +267,13 @@ class WordDocumentParser(OLE2FragmentParser):
             return "Unknown FIB version."
         return True
 
+    @classmethod
+    def quickCheck(cls, data, pos):
+        # Check FIB/nFib without parsing the whole FIB
+        if len(data) < pos + 4:
+            return True
+        return data[pos+3] == '\0' and data[pos+2] in '\xc0\xc1'
+
     def createFields(self):
         yield FIB(self, "FIB", "File Information Block")
         table = getOLE2Parser(self.ole2, "table"+str(self["FIB/fWhichTblStm"].value))
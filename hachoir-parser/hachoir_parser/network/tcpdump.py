@@ -480,6 +480,7 @@ class TcpdumpFile(Parser):
         113: ("unicast", Unicast),
     }
     LINK_TYPE_DESC = createDict(LINK_TYPE, 0)
+    checkpoint_interval = 1000
 
     def validate(self):
         if self["id"].value != "\xd4\xc3\xb2\xa1":
@@ -499,6 +500,15 @@ class TcpdumpFile(Parser):
         link = self["link_type"].value
         if link not in self.LINK_TYPE:
             raise ParserError("Unknown link type: %s" % link)
+        for field in self.resumeFields(link):
+            yield field
+
+    def createCheckpoint(self):
+        if self.current_size < 24*8:
+            return None
+        return (self["link_type"].value,)
+
+    def resumeFields(self, link):
         name, parser = self.LINK_TYPE[link]
         while self.current_size < self.size:
             yield Packet(self, "packet[]", parser, name)
@@ -69,6 +69,17 @@ class HachoirParser(object):
         """
         raise NotImplementedError()
 
+    @classmethod
+    def quickCheck(cls, data, pos):
+        """
+        Cheap check done before creating the parser (eg. by hachoir-subfile
+        on each magic hit): data[pos:] are the first bytes of the file, it
+        may be truncated. It must not create any object. Results:
+        - False: data is invalid (validate() would fail) ;
+        - True: data may be valid, or data is too short to decide.
+        """
+        return True
+
     #--- Getter methods -----------------------------------------------------
     def _getDescription(self):
         if self._description is None:
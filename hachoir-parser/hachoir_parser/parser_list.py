@@ -1,5 +1,4 @@
 import re
-import types
 from hachoir_core.error import error
 from hachoir_core.i18n import _
 from hachoir_parser import Parser, HachoirParser
@@ -15,6 +14,12 @@ class ParserList(object):
     def __init__(self):
         self.parser_list = []
         self.bytag = { "id": {}, "category": {} }
+        # Magic index: byte offset => trie (dict: byte => node, the
+        # parsers of a magic are stored in the None key of its last node)
+        self.magic_index = {}
+        self.magic_regex = []
+        self.magic_parsers = set()
+        self.magic_size = 0
 
     def translate(self, name, value):
         if name in ("magic",):
@@ -82,6 +87,57 @@ class ParserList(object):
             for value in values:
                 byname.setdefault(value,[]).append(parser)
 
+        for magic, offset in tags.get("magic", ()):
+            self.addMagic(parser, magic, offset)
+        for regex, offset in tags.get("magic_regex", ()):
+            self.addMagicRegex(parser, regex, offset)
+
+    def addMagic(self, parser, magic, offset):
+        """
+        Add a magic string at 'offset' (in bits) to the magic index.
+        Magics which are not aligned on a byte are ignored.
+        """
+        if offset % 8 or not magic:
+            return
+        offset //= 8
+        node = self.magic_index.setdefault(offset, {})
+        for byte in magic:
+            node = node.setdefault(byte, {})
+        node.setdefault(None, []).append(parser)
+        self.magic_parsers.add(parser)
+        self.magic_size = max(self.magic_size, offset + len(magic))
+
+    def addMagicRegex(self, parser, regex, offset):
+        """
+        Add a magic regular expression at 'offset' (in bits).
+        """
+        if offset % 8:
+            return
+        self.magic_regex.append((re.compile(regex, re.DOTALL), offset // 8, parser))
+        self.magic_parsers.add(parser)
+
+    def matchMagic(self, data):
+        """
+        Get the set of parsers having a magic matching data (the beginning
+        of a stream, see magic_size attribute).
+        """
+        parsers = set()
+        size = len(data)
+        for offset, node in self.magic_index.iteritems():
+            while True:
+                if None in node:
+                    parsers.update(node[None])
+                if size <= offset:
+                    break
+                node = node.get(data[offset])
+                if node is None:
+                    break
+                offset += 1
+        for regex, offset, parser in self.magic_regex:
+            if parser not in parsers and regex.match(data, offset):
+                parsers.add(parser)
+        return parsers
+
     def __iter__(self):
         return iter(self.parser_list)
 
@@ -174,22 +230,60 @@ class ParserList(object):
             print >>out, "Total: %s parsers" % len(self.parser_list)
 
 
+class LazyParser(object):
+    """
+    Parser of the static registry (see hachoir_parser.parser_registry): the
+    module of the parser is only imported when the parser is used.
+    Calling the object creates a parser object.
+    """
+    def __init__(self, module, name, tags):
+        self.module = module
+        self.__name__ = name
+        self.PARSER_TAGS = tags
+        self._parser = None
+
+    def getParserClass(self):
+        if self._parser is None:
+            module = __import__(self.module, {}, {}, [self.__name__])
+            self._parser = getattr(module, self.__name__)
+        return self._parser
+
+    def getParserTags(self):
+        return dict(self.PARSER_TAGS)
+
+    def quickCheck(self, data, pos):
+        return self.getParserClass().quickCheck(data, pos)
+
+    def print_(self, out, verbose):
+        HachoirParser.print_.im_func(self, out, verbose)
+
+    def __call__(self, stream, **args):
+        return self.getParserClass()(stream, **args)
+
+    def __repr__(self):
+        return "<LazyParser %s.%s>" % (self.module, self.__name__)
+
 class HachoirParserList(ParserList):
     _instance = None
 
+    # Packages of the parser modules
+    PACKAGES = ("archive", "audio", "container", "file_system", "game",
+        "image", "misc", "network", "program", "video")
+
     @classmethod
     def getInstance(cls):
         if cls._instance is None:
             cls._instance = cls()
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, use_registry=True):
         ParserList.__init__(self)
-        self._load()
+        self._load(use_registry)
 
-    def _load(self):
+    def _load(self, use_registry=True):
         """
-        Load all parsers from "hachoir.parser" module.
+        Load all parsers from the static registry, or from "hachoir_parser"
+        modules if use_registry is False or if the registry doesn't exist.
 
         Return the list of loaded parsers.
         """
@@ -197,12 +291,24 @@ class HachoirParserList(ParserList):
         if self.parser_list:
             return self.parser_list
 
+        if use_registry:
+            try:
+                from hachoir_parser.parser_registry import PARSERS
+            except ImportError:
+                PARSERS = None
+            if PARSERS:
+                for module, name, tags in PARSERS:
+                    self.add(LazyParser(module, name, tags))
+
+        if not self.parser_list:
+            self._loadModules()
+        assert 1 <= len(self.parser_list)
+        return self.parser_list
+
+    def _loadModules(self):
         todo = []
-        module = __import__("hachoir_parser")
-        for attrname in dir(module):
-            attr = getattr(module, attrname)
-            if isinstance(attr, types.ModuleType):
-                todo.append(attr)
+        for name in self.PACKAGES:
+            todo.append(__import__("hachoir_parser." + name, {}, {}, [name]))
 
         for module in todo:
             for name in dir(module):
@@ -211,6 +317,23 @@ class HachoirParserList(ParserList):
                 and issubclass(attr, HachoirParser) \
                 and attr not in (Parser, HachoirParser):
                     self.add(attr)
-        assert 1 <= len(self.parser_list)
-        return self.parser_list
+
+    def writeRegistry(self, out):
+        """
+        Write the static registry (hachoir_parser/parser_registry.py)
+        of the parsers into the file 'out'.
+        """
+        print >>out, "# Generated by update_registry.py: don't edit this file"
+        print >>out, "PARSERS = ("
+        for parser in self.parser_list:
+            if isinstance(parser, LazyParser):
+                module = parser.module
+            else:
+                module = parser.__module__
+            tags = parser.getParserTags()
+            print >>out, "    (%r, %r, {" % (module, parser.__name__)
+            for key in sorted(tags):
+                print >>out, "        %r: %r," % (key, tags[key])
+            print >>out, "    }),"
+        print >>out, ")"
 
@@ -0,0 +1,704 @@
+# Generated by update_registry.py: don't edit this file
+PARSERS = (
+    ('hachoir_parser.archive.ace', 'AceFile', {
+        'category': 'archive',
+        'description': 'ACE archive',
+        'file_ext': ('ace',),
+        'id': 'ace',
+        'mime': (u'application/x-ace-compressed',),
+        'min_size': 400,
+    }),
+    ('hachoir_parser.archive.ar', 'ArchiveFile', {
+        'category': 'archive',
+        'description': 'Unix archive',
+        'file_ext': ('a', 'deb'),
+        'id': 'unix_archive',
+        'magic': (('!<arch>\n', 0),),
+        'mime': (u'application/x-debian-package', u'application/x-archive', u'application/x-dpkg'),
+        'min_size': 168,
+    }),
+    ('hachoir_parser.archive.bzip2_parser', 'Bzip2Parser', {
+        'category': 'archive',
+        'description': 'bzip2 archive',
+        'file_ext': ('bz2',),
+        'id': 'bzip2',
+        'magic': (('BZh', 0),),
+        'mime': (u'application/x-bzip2',),
+        'min_size': 80,
+    }),
+    ('hachoir_parser.archive.cab', 'CabFile', {
+        'category': 'archive',
+        'description': 'Microsoft Cabinet archive',
+        'file_ext': ('cab',),
+        'id': 'cab',
+        'magic': (('MSCF', 0),),
+        'mime': (u'application/vnd.ms-cab-compressed',),
+        'min_size': 8,
+    }),
+    ('hachoir_parser.archive.gzip_parser', 'GzipParser', {
+        'category': 'archive',
+        'description': u'gzip archive',
+        'file_ext': ('gz',),
+        'id': 'gzip',
+        'magic_regex': (('\x1f\x8b\x08.{5}[\x00\x02\x04\x06][\x00-\r]', 0),),
+        'mime': (u'application/x-gzip',),
+        'min_size': 144,
+    }),
+    ('hachoir_parser.archive.mar', 'MarFile', {
+        'category': 'archive',
+        'description': 'Microsoft Archive',
+        'file_ext': ('mar',),
+        'id': 'mar',
+        'magic': (('MARC', 0),),
+        'min_size': 640,
+    }),
+    ('hachoir_parser.archive.mozilla_ar', 'MozillaArchive', {
+        'category': 'archive',
+        'description': 'Mozilla Archive',
+        'file_ext': ('mar',),
+        'id': 'mozilla_ar',
+        'magic': (('MAR1', 0),),
+        'min_size': 200,
+    }),
+    ('hachoir_parser.archive.rar', 'RarFile', {
+        'category': 'archive',
+        'description': 'Roshal archive (RAR)',
+        'file_ext': ('rar',),
+        'id': 'rar',
+        'magic': (('Rar!\x1a\x07\x00', 0),),
+        'mime': (u'application/x-rar-compressed',),
+        'min_size': 56,
+    }),
+    ('hachoir_parser.archive.rpm', 'RpmFile', {
+        'category': 'archive',
+        'description': 'RPM package',
+        'file_ext': ('rpm',),
+        'id': 'rpm',
+        'magic': (('\xed\xab\xee\xdb', 0),),
+        'mime': (u'application/x-rpm',),
+        'min_size': 1024,
+    }),
+    ('hachoir_parser.archive.sevenzip', 'SevenZipParser', {
+        'category': 'archive',
+        'description': 'Compressed archive in 7z format',
+        'file_ext': ('7z',),
+        'id': '7zip',
+        'magic': (("7z\xbc\xaf'\x1c", 0),),
+        'mime': (u'application/x-7z-compressed',),
+        'min_size': 256,
+    }),
+    ('hachoir_parser.archive.tar', 'TarFile', {
+        'category': 'archive',
+        'description': 'TAR archive',
+        'file_ext': ('tar',),
+        'id': 'tar',
+        'magic': (('ustar  \x00', 2056),),
+        'mime': (u'application/x-tar', u'application/x-gtar'),
+        'min_size': 4096,
+        'subfile': 'skip',
+    }),
+    ('hachoir_parser.archive.zip', 'ZipFile', {
+        'category': 'archive',
+        'description': 'ZIP archive',
+        'file_ext': ('ods', 'sxw', 'odm', 'odf', 'sti', 'ott', 'sxc', 'sxi', 'ots', 'otg', 'odc', 'otp', 'stc', 'sxd', 'stw', 'sxg', 'sxm', 'odg', 'zip', 'std', 'odt', 'odp', 'odb', 'jar', 'jar', 'zip', 'odi'),
+        'id': 'zip',
+        'magic': (('PK\x03\x04', 0),),
+        'mime': (u'application/vnd.oasis.opendocument.spreadsheet', u'application/vnd.sun.xml.writer', u'application/vnd.oasis.opendocument.text-master', u'application/vnd.oasis.opendocument.formula', u'application/vnd.sun.xml.impress.template', u'application/vnd.oasis.opendocument.text-template', u'application/vnd.sun.xml.calc', u'application/vnd.sun.xml.impress', u'application/vnd.oasis.opendocument.spreadsheet-template', u'application/vnd.oasis.opendocument.graphics-template', u'application/vnd.oasis.opendocument.chart', u'application/vnd.oasis.opendocument.presentation-template', u'application/vnd.sun.xml.calc.template', u'application/vnd.sun.xml.draw', u'application/vnd.sun.xml.writer.template', u'application/vnd.sun.xml.writer.global', u'application/vnd.sun.xml.math', u'application/vnd.oasis.opendocument.graphics', u'application/x-zip', u'application/vnd.sun.xml.draw.template', u'application/vnd.oasis.opendocument.text', u'application/vnd.oasis.opendocument.presentation', u'application/vnd.oasis.opendocument.database', u'application/java-archive', u'application/x-jar', u'application/zip', u'application/vnd.oasis.opendocument.image'),
+        'min_size': 240,
+        'subfile': 'skip',
+    }),
+    ('hachoir_parser.archive.zlib', 'ZlibData', {
+        'category': 'archive',
+        'description': 'ZLIB Data',
+        'file_ext': ('zlib',),
+        'id': 'zlib',
+        'min_size': 64,
+    }),
+    ('hachoir_parser.audio.aiff', 'AiffFile', {
+        'category': 'audio',
+        'description': 'Audio Interchange File Format (AIFF)',
+        'file_ext': ('aif', 'aiff', 'aifc'),
+        'id': 'aiff',
+        'magic_regex': (('FORM.{4}AIF[CF]', 0),),
+        'mime': (u'audio/x-aiff',),
+        'min_size': 96,
+    }),
+    ('hachoir_parser.audio.mod', 'AmigaModule', {
+        'category': 'audio',
+        'description': 'Uncompressed amiga module',
+        'file_ext': ('mod', 'nst', 'wow', 'oct', 'sd0'),
+        'id': 'mod',
+        'mime': (u'audio/mod', u'audio/x-mod', u'audio/mod', u'audio/x-mod'),
+        'min_size': 8672,
+    }),
+    ('hachoir_parser.audio.au', 'AuFile', {
+        'category': 'audio',
+        'description': 'Sun/NeXT audio',
+        'file_ext': ('au', 'snd'),
+        'id': 'sun_next_snd',
+        'magic': (('.snd', 0),),
+        'mime': (u'audio/basic',),
+        'min_size': 192,
+    }),
+    ('hachoir_parser.audio.flac', 'FlacParser', {
+        'category': 'audio',
+        'description': 'FLAC audio',
+        'file_ext': ('flac',),
+        'id': 'flac',
+        'magic': (('fLaC\x00', 0),),
+        'mime': (u'audio/x-flac',),
+        'min_size': 32,
+    }),
+    ('hachoir_parser.audio.itunesdb', 'ITunesDBFile', {
+        'category': 'audio',
+        'description': 'iPod iTunesDB file',
+        'id': 'itunesdb',
+        'magic': (('mhbd', 0),),
+        'min_size': 352,
+    }),
+    ('hachoir_parser.audio.midi', 'MidiFile', {
+        'category': 'audio',
+        'description': 'MIDI audio',
+        'file_ext': ['mid', 'midi'],
+        'id': 'midi',
+        'magic': (('MThd', 0),),
+        'mime': (u'audio/mime',),
+        'min_size': 64,
+    }),
+    ('hachoir_parser.audio.mpeg_audio', 'MpegAudioFile', {
+        'category': 'audio',
+        'description': 'MPEG audio version 1, 2, 2.5',
+        'file_ext': ('mpa', 'mp1', 'mp2', 'mp3'),
+        'id': 'mpeg_audio',
+        'mime': (u'audio/mpeg',),
+        'min_size': 32,
+        'subfile': 'skip',
+    }),
+    ('hachoir_parser.audio.s3m', 'PTMModule', {
+        'category': 'audio',
+        'description': 'PolyTracker module (v1.17)',
+        'file_ext': ('ptm',),
+        'id': 'ptm',
+        'min_size': 512,
+    }),
+    ('hachoir_parser.audio.real_audio', 'RealAudioFile', {
+        'category': 'audio',
+        'description': u'Real audio (.ra)',
+        'file_ext': ['ra'],
+        'id': 'real_audio',
+        'magic': (('.ra\xfd', 0),),
+        'mime': (u'audio/x-realaudio', u'audio/x-pn-realaudio'),
+        'min_size': 48,
+    }),
+    ('hachoir_parser.audio.s3m', 'S3MModule', {
+        'category': 'audio',
+        'description': 'ScreamTracker3 module',
+        'file_ext': ('s3m',),
+        'id': 's3m',
+        'mime': (u'audio/s3m', u'audio/x-s3m'),
+        'min_size': 512,
+    }),
+    ('hachoir_parser.audio.xm', 'XMModule', {
+        'category': 'audio',
+        'description': 'FastTracker2 module',
+        'file_ext': ('xm',),
+        'id': 'fasttracker2',
+        'magic': (('Extended Module: ', 0),),
+        'mime': (u'audio/xm', u'audio/x-xm', u'audio/module-xm', u'audio/mod', u'audio/x-mod'),
+        'min_size': 2920,
+    }),
+    ('hachoir_parser.container.asn1', 'ASN1File', {
+        'category': 'container',
+        'description': 'Abstract Syntax Notation One (ASN.1)',
+        'file_ext': ('der',),
+        'id': 'asn1',
+        'min_size': 16,
+    }),
+    ('hachoir_parser.container.mkv', 'MkvFile', {
+        'category': 'container',
+        'description': 'Matroska multimedia container',
+        'file_ext': ('mka', 'mkv', 'webm'),
+        'id': 'matroska',
+        'magic': (('\x1aE\xdf\xa3', 0),),
+        'mime': (u'video/x-matroska', u'audio/x-matroska', u'video/webm', u'audio/webm'),
+        'min_size': 40,
+    }),
+    ('hachoir_parser.container.ogg', 'OggFile', {
+        'category': 'container',
+        'description': 'Ogg multimedia container',
+        'file_ext': ('ogg', 'ogm'),
+        'id': 'ogg',
+        'magic': (('OggS', 0),),
+        'mime': (u'application/ogg', u'application/x-ogg', u'audio/ogg', u'audio/x-ogg', u'video/ogg', u'video/x-ogg', u'video/theora', u'video/x-theora'),
+        'min_size': 224,
+        'subfile': 'skip',
+    }),
+    ('hachoir_parser.container.ogg', 'OggStream', {
+        'category': 'container',
+        'description': 'Ogg logical stream',
+        'id': 'ogg_stream',
+        'min_size': 56,
+        'subfile': 'skip',
+    }),
+    ('hachoir_parser.container.realmedia', 'RealMediaFile', {
+        'category': 'container',
+        'description': u'RealMedia (rm) Container File',
+        'file_ext': ('rm',),
+        'id': 'real_media',
+        'magic': (('.RMF\x00\x00\x00\x12\x00\x01', 0),),
+        'mime': (u'video/x-pn-realvideo', u'audio/x-pn-realaudio', u'audio/x-pn-realaudio-plugin', u'audio/x-real-audio', u'application/vnd.rn-realmedia'),
+        'min_size': 80,
+    }),
+    ('hachoir_parser.container.riff', 'RiffFile', {
+        'category': 'container',
+        'description': 'Microsoft RIFF container',
+        'file_ext': ('avi', 'cda', 'wav', 'ani'),
+        'id': 'riff',
+        'magic': (('AVI LIST', 64), ('WAVEfmt ', 64), ('CDDAfmt ', 64), ('ACONanih', 64)),
+        'mime': (u'video/x-msvideo', u'audio/x-wav', u'audio/x-cda'),
+        'min_size': 128,
+    }),
+    ('hachoir_parser.container.swf', 'SwfFile', {
+        'category': 'container',
+        'description': u'Macromedia Flash data',
+        'file_ext': ['swf'],
+        'id': 'swf',
+        'magic': [('FWS\x01', 0), ('CWS\x01', 0), ('FWS\x02', 0), ('CWS\x02', 0), ('FWS\x03', 0), ('CWS\x03', 0), ('FWS\x04', 0), ('CWS\x04', 0), ('FWS\x05', 0), ('CWS\x05', 0), ('FWS\x06', 0), ('CWS\x06', 0), ('FWS\x07', 0), ('CWS\x07', 0), ('FWS\x08', 0), ('CWS\x08', 0), ('FWS\t', 0), ('CWS\t', 0), ('FWS\n', 0), ('CWS\n', 0)],
+        'mime': (u'application/x-shockwave-flash',),
+        'min_size': 64,
+    }),
+    ('hachoir_parser.file_system.ext2', 'EXT2_FS', {
+        'category': 'file_system',
+        'description': 'EXT2/EXT3 file system',
+        'id': 'ext2',
+        'magic': (('S\xef\x01\x00', 8640), ('S\xef\x02\x00', 8640), ('S\xef\x04\x00', 8640)),
+        'min_size': 16384,
+    }),
+    ('hachoir_parser.file_system.fat', 'FAT12', {
+        'category': 'file_system',
+        'description': 'FAT12 filesystem',
+        'file_ext': ('',),
+        'id': 'fat12',
+        'magic': (('FAT12   ', 432),),
+        'min_size': 4096,
+    }),
+    ('hachoir_parser.file_system.fat', 'FAT16', {
+        'category': 'file_system',
+        'description': 'FAT16 filesystem',
+        'file_ext': ('',),
+        'id': 'fat16',
+        'magic': (('FAT16   ', 432),),
+        'min_size': 4096,
+    }),
+    ('hachoir_parser.file_system.fat', 'FAT32', {
+        'category': 'file_system',
+        'description': 'FAT32 filesystem',
+        'file_ext': ('',),
+        'id': 'fat32',
+        'magic': (('FAT32   ', 656),),
+        'min_size': 4096,
+    }),
+    ('hachoir_parser.file_system.iso9660', 'ISO9660', {
+        'category': 'file_system',
+        'description': 'ISO 9660 file system',
+        'id': 'iso9660',
+        'magic': (('\x01CD001', 262144),),
+        'min_size': 262192,
+    }),
+    ('hachoir_parser.file_system.linux_swap', 'LinuxSwapFile', {
+        'category': 'file_system',
+        'description': 'Linux swap file',
+        'file_ext': ('',),
+        'id': 'linux_swap',
+        'magic': (('SWAP-SPACE', 32688), ('SWAPSPACE2', 32688), ('S1SUSPEND\x00', 32688)),
+        'min_size': 32768,
+    }),
+    ('hachoir_parser.file_system.mbr', 'MSDos_HardDrive', {
+        'category': 'file_system',
+        'description': 'MS-DOS hard drive with Master Boot Record (MBR)',
+        'file_ext': ('',),
+        'id': 'msdos_harddrive',
+        'min_size': 4096,
+    }),
+    ('hachoir_parser.file_system.ntfs', 'NTFS', {
+        'category': 'file_system',
+        'description': 'NTFS file system',
+        'id': 'ntfs',
+        'magic': (('\xebR\x90NTFS    ', 0),),
+        'min_size': 8192,
+    }),
+    ('hachoir_parser.file_system.reiser_fs', 'REISER_FS', {
+        'category': 'file_system',
+        'description': 'ReiserFS file system',
+        'id': 'reiserfs',
+        'min_size': 2637824,
+    }),
+    ('hachoir_parser.game.blp', 'BLP1File', {
+        'category': 'game',
+        'description': 'Blizzard Image Format, version 1',
+        'file_ext': ('blp',),
+        'id': 'blp1',
+        'magic': (('BLP1', 0),),
+        'mime': (u'application/x-blp',),
+        'min_size': 224,
+    }),
+    ('hachoir_parser.game.blp', 'BLP2File', {
+        'category': 'game',
+        'description': 'Blizzard Image Format, version 2',
+        'file_ext': ('blp',),
+        'id': 'blp2',
+        'magic': (('BLP2', 0),),
+        'mime': (u'application/x-blp',),
+        'min_size': 160,
+    }),
+    ('hachoir_parser.game.laf', 'LafFile', {
+        'category': 'game',
+        'description': 'LucasArts Font',
+        'file_ext': ('laf',),
+        'id': 'lucasarts_font',
+        'min_size': 256,
+    }),
+    ('hachoir_parser.game.spider_man_video', 'SpiderManVideoFile', {
+        'category': 'game',
+        'description': 'The Amazing Spider-Man vs. The Kingpin (Sega CD) FMV video',
+        'file_ext': ('bin',),
+        'id': 'spiderman_video',
+        'min_size': 64,
+    }),
+    ('hachoir_parser.game.zsnes', 'ZSNESFile', {
+        'category': 'game',
+        'description': 'ZSNES Save State File (only version 143)',
+        'file_ext': ('zst', 'zs1', 'zs2', 'zs3', 'zs4', 'zs5', 'zs6', 'zs7', 'zs8', 'zs9'),
+        'id': 'zsnes',
+        'min_size': 24728,
+    }),
+    ('hachoir_parser.image.bmp', 'BmpFile', {
+        'category': 'image',
+        'description': 'Microsoft bitmap (BMP) picture',
+        'file_ext': ('bmp',),
+        'id': 'bmp',
+        'magic_regex': (('BM.{4}.{8}[\x0c(l]\x00{3}', 0),),
+        'mime': (u'image/x-ms-bmp', u'image/x-bmp'),
+        'min_size': 240,
+    }),
+    ('hachoir_parser.image.gif', 'GifFile', {
+        'category': 'image',
+        'description': 'GIF picture',
+        'file_ext': ('gif',),
+        'id': 'gif',
+        'magic': (('GIF87a', 0), ('GIF89a', 0)),
+        'mime': (u'image/gif',),
+        'min_size': 184,
+    }),
+    ('hachoir_parser.image.ico', 'IcoFile', {
+        'category': 'image',
+        'description': 'Microsoft Windows icon or cursor',
+        'file_ext': ('ico', 'cur'),
+        'id': 'ico',
+        'magic_regex': (('\x00\x00[\x01\x02]\x00[\x01-\x14].(\x10\x10|  |00|@@)[\x00\x10]\x00[\x00\x01\x04][\x00\x08\x18 ]\x00', 0),),
+        'mime': (u'image/x-ico',),
+        'min_size': 496,
+    }),
+    ('hachoir_parser.image.jpeg', 'JpegFile', {
+        'category': 'image',
+        'description': 'JPEG picture',
+        'file_ext': ('jpg', 'jpeg'),
+        'id': 'jpeg',
+        'magic': (('\xff\xd8\xff\xe0', 0), ('\xff\xd8\xff\xe1', 0), ('\xff\xd8\xff\xee', 0)),
+        'mime': (u'image/jpeg',),
+        'min_size': 176,
+        'subfile': 'skip',
+    }),
+    ('hachoir_parser.image.pcx', 'PcxFile', {
+        'category': 'image',
+        'description': 'PC Paintbrush (PCX) picture',
+        'file_ext': ('pcx',),
+        'id': 'pcx',
+        'mime': (u'image/x-pcx',),
+        'min_size': 1024,
+    }),
+    ('hachoir_parser.image.png', 'PngFile', {
+        'category': 'image',
+        'description': 'Portable Network Graphics (PNG) picture',
+        'file_ext': ('png',),
+        'id': 'png',
+        'magic': [('\x89PNG\r\n\x1a\n', 0)],
+        'mime': (u'image/png', u'image/x-png'),
+        'min_size': 64,
+    }),
+    ('hachoir_parser.image.psd', 'PsdFile', {
+        'category': 'image',
+        'description': 'Photoshop (PSD) picture',
+        'file_ext': ('psd',),
+        'id': 'psd',
+        'magic': (('8BPS\x00\x01', 0),),
+        'mime': (u'image/psd', u'image/photoshop', u'image/x-photoshop'),
+        'min_size': 32,
+    }),
+    ('hachoir_parser.image.tga', 'TargaFile', {
+        'category': 'image',
+        'description': u'Truevision Targa Graphic (TGA)',
+        'file_ext': ('tga',),
+        'id': 'targa',
+        'mime': (u'image/targa', u'image/tga', u'image/x-tga'),
+        'min_size': 144,
+    }),
+    ('hachoir_parser.image.tiff', 'TiffFile', {
+        'category': 'image',
+        'description': 'TIFF picture',
+        'file_ext': ('tif', 'tiff'),
+        'id': 'tiff',
+        'magic': (('II*\x00', 0), ('MM\x00*', 0)),
+        'mime': (u'image/tiff',),
+        'min_size': 64,
+    }),
+    ('hachoir_parser.image.wmf', 'WMF_File', {
+        'category': 'image',
+        'description': u'Microsoft Windows Metafile (WMF)',
+        'file_ext': ('wmf', 'apm', 'emf'),
+        'id': 'wmf',
+        'magic': (('\xd7\xcd\xc6\x9a\x00\x00', 0), (' EMF\x00\x00', 320), ('\x00\x00\t\x00\x00\x03', 0), ('\x01\x00\t\x00\x00\x03', 0)),
+        'mime': (u'image/wmf', u'image/x-wmf', u'image/x-win-metafile', u'application/x-msmetafile', u'application/wmf', u'application/x-wmf', u'image/x-emf'),
+        'min_size': 320,
+    }),
+    ('hachoir_parser.image.xcf', 'XcfFile', {
+        'category': 'image',
+        'description': 'Gimp (XCF) picture',
+        'file_ext': ('xcf',),
+        'id': 'xcf',
+        'magic': (('gimp xcf file\x00', 0), ('gimp xcf v002\x00', 0)),
+        'mime': (u'image/x-xcf', u'application/x-gimp-image'),
+        'min_size': 336,
+    }),
+    ('hachoir_parser.misc.bplist', 'BPList', {
+        'category': 'misc',
+        'description': 'Apple/NeXT Binary Property List',
+        'file_ext': ('plist',),
+        'id': 'bplist',
+        'magic': (('bplist00', 0),),
+        'min_size': 40,
+    }),
+    ('hachoir_parser.misc.chm', 'ChmFile', {
+        'category': 'misc',
+        'description': "Microsoft's HTML Help (.chm)",
+        'file_ext': ('chm',),
+        'id': 'chm',
+        'magic': (('ITSF\x03\x00\x00\x00', 0),),
+        'min_size': 32,
+    }),
+    ('hachoir_parser.misc.dsstore', 'DSStore', {
+        'category': 'misc',
+        'description': 'Mac OS X DS_Store',
+        'file_ext': ('DS_Store',),
+        'id': 'dsstore',
+        'magic': (('\x00\x00\x00\x01Bud1', 0),),
+        'min_size': 36,
+    }),
+    ('hachoir_parser.misc.file_3do', 'File3do', {
+        'category': 'misc',
+        'description': 'renderdroid 3d model.',
+        'file_ext': ('3do',),
+        'id': '3do',
+        'mime': (u'image/x-3do',),
+        'min_size': 32,
+    }),
+    ('hachoir_parser.misc.file_3ds', 'File3ds', {
+        'category': 'misc',
+        'description': '3D Studio Max model',
+        'file_ext': ('3ds',),
+        'id': '3ds',
+        'mime': (u'image/x-3ds',),
+        'min_size': 128,
+    }),
+    ('hachoir_parser.misc.gnome_keyring', 'GnomeKeyring', {
+        'category': 'misc',
+        'description': u'Gnome keyring',
+        'id': 'gnomekeyring',
+        'magic': (('GnomeKeyring\n\r\x00\n', 0),),
+        'min_size': 376,
+    }),
+    ('hachoir_parser.misc.hlp', 'HlpFile', {
+        'category': 'misc',
+        'description': 'Microsoft Windows Help (HLP)',
+        'file_ext': ('hlp',),
+        'id': 'hlp',
+        'min_size': 32,
+    }),
+    ('hachoir_parser.misc.lnk', 'LnkFile', {
+        'category': 'misc',
+        'description': 'Windows Shortcut (.lnk)',
+        'file_ext': ('lnk',),
+        'id': 'lnk',
+        'magic': (('L\x00\x00\x00\x01\x14\x02\x00\x00\x00\x00\x00\xc0\x00\x00\x00\x00\x00\x00F', 0),),
+        'mime': (u'application/x-ms-shortcut',),
+        'min_size': 160,
+    }),
+    ('hachoir_parser.misc.mstask', 'MSTaskFile', {
+        'category': 'misc',
+        'description': ".job 'at' file parser from ms windows",
+        'file_ext': ('job',),
+        'id': 'mstask',
+        'min_size': 100,
+    }),
+    ('hachoir_parser.misc.ole2', 'OLE2_File', {
+        'category': 'misc',
+        'description': 'Microsoft Office document',
+        'file_ext': ('db', 'doc', 'dot', 'ppt', 'ppz', 'pps', 'pot', 'xls', 'xla', 'msi'),
+        'id': 'ole2',
+        'magic': (('\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 0),),
+        'mime': (u'application/msword', u'application/msexcel', u'application/mspowerpoint'),
+        'min_size': 4096,
+    }),
+    ('hachoir_parser.misc.pdf', 'PDFDocument', {
+        'category': 'misc',
+        'description': 'Portable Document Format (PDF) document',
+        'file_ext': ('pdf',),
+        'id': 'pdf',
+        'magic': (('%PDF-', 5),),
+        'mime': (u'application/pdf',),
+        'min_size': 72,
+    }),
+    ('hachoir_parser.misc.pifv', 'PIFVFile', {
+        'category': 'program',
+        'description': 'EFI Platform Initialization Firmware Volume',
+        'file_ext': ('bin', ''),
+        'id': 'pifv',
+        'magic_regex': (('\x00{16}.{24}_FVH', 0),),
+        'min_size': 512,
+    }),
+    ('hachoir_parser.misc.pcf', 'PcfFile', {
+        'category': 'misc',
+        'description': 'X11 Portable Compiled Font (pcf)',
+        'file_ext': ('pcf',),
+        'id': 'pcf',
+        'magic': (('\x01fcp', 0),),
+        'min_size': 32,
+    }),
+    ('hachoir_parser.misc.torrent', 'TorrentFile', {
+        'category': 'misc',
+        'description': 'Torrent metainfo file',
+        'file_ext': ('torrent',),
+        'id': 'torrent',
+        'magic': (('d8:announce', 0),),
+        'mime': (u'application/x-bittorrent',),
+        'min_size': 400,
+    }),
+    ('hachoir_parser.misc.ttf', 'TrueTypeFontFile', {
+        'category': 'misc',
+        'description': 'TrueType font',
+        'file_ext': ('ttf',),
+        'id': 'ttf',
+        'min_size': 80,
+    }),
+    ('hachoir_parser.misc.word_2', 'Word2DocumentParser', {
+        'description': 'Microsoft Office Word Version 2.0 document',
+        'file_ext': ('doc',),
+        'id': 'word_v2_document',
+        'magic': (('\xdb\xa5', 0),),
+        'min_size': 8,
+    }),
+    ('hachoir_parser.misc.word_doc', 'WordDocumentParser', {
+        'description': 'Microsoft Office Word document',
+        'id': 'word_document',
+        'magic': (('\xec\xa5', 0),),
+        'min_size': 8,
+    }),
+    ('hachoir_parser.network.tcpdump', 'TcpdumpFile', {
+        'category': 'misc',
+        'description': 'Tcpdump file (network)',
+        'id': 'tcpdump',
+        'magic': (('\xd4\xc3\xb2\xa1', 0),),
+        'min_size': 192,
+    }),
+    ('hachoir_parser.program.elf', 'ElfFile', {
+        'category': 'program',
+        'description': 'ELF Unix/BSD program/library',
+        'file_ext': ('so', ''),
+        'id': 'elf',
+        'magic': (('\x7fELF', 0),),
+        'mime': (u'application/x-executable', u'application/x-object', u'application/x-sharedlib', u'application/x-executable-file', u'application/x-coredump'),
+        'min_size': 416,
+    }),
+    ('hachoir_parser.program.exe', 'ExeFile', {
+        'category': 'program',
+        'description': 'Microsoft Windows Portable Executable',
+        'file_ext': ('exe', 'dll', 'ocx'),
+        'id': 'exe',
+        'magic_regex': (('MZ.[\x00\x01].{4}[^\x00\x01\x02\x03]', 0),),
+        'mime': (u'application/x-dosexec',),
+        'min_size': 512,
+    }),
+    ('hachoir_parser.program.java', 'JavaCompiledClassFile', {
+        'category': 'program',
+        'description': 'Compiled Java class',
+        'file_ext': ('class',),
+        'id': 'java_class',
+        'mime': (u'application/java-vm',),
+        'min_size': 80,
+    }),
+    ('hachoir_parser.program.nds', 'NdsFile', {
+        'category': 'program',
+        'description': 'Nintendo DS game file',
+        'file_ext': ('nds',),
+        'id': 'nds_file',
+        'mime': (u'application/octet-stream',),
+        'min_size': 2816,
+    }),
+    ('hachoir_parser.program.prc', 'PRCFile', {
+        'category': 'program',
+        'description': 'Palm Resource File',
+        'file_ext': ('prc', ''),
+        'id': 'prc',
+        'mime': (u'application/x-pilot-prc', u'application/x-palmpilot'),
+        'min_size': 80,
+    }),
+    ('hachoir_parser.program.python', 'PythonCompiledFile', {
+        'category': 'program',
+        'description': 'Compiled Python script (.pyc/.pyo files)',
+        'file_ext': ('pyc', 'pyo'),
+        'id': 'python',
+        'min_size': 72,
+    }),
+    ('hachoir_parser.video.asf', 'AsfFile', {
+        'category': 'video',
+        'description': 'Advanced Streaming Format (ASF), used for WMV (video) and WMA (audio)',
+        'file_ext': ('wmv', 'wma', 'asf'),
+        'id': 'asf',
+        'magic': (('0&\xb2u\x8ef\xcf\x11\xa6\xd9\x00\xaa\x00b\xcel', 0),),
+        'mime': (u'video/x-ms-asf', u'video/x-ms-wmv', u'audio/x-ms-wma'),
+        'min_size': 192,
+    }),
+    ('hachoir_parser.video.flv', 'FlvFile', {
+        'category': 'video',
+        'description': u'Macromedia Flash video',
+        'file_ext': ('flv',),
+        'id': 'flv',
+        'magic': (('FLV\x01\x05\x00\x00\x00\t', 0), ('FLV\x01\x01\x00\x00\x00\t', 0)),
+        'mime': (u'video/x-flv',),
+        'min_size': 36,
+    }),
+    ('hachoir_parser.video.mpeg_video', 'MPEGVideoFile', {
+        'category': 'video',
+        'description': 'MPEG video, version 1 or 2',
+        'file_ext': ('mpeg', 'mpg', 'mpe', 'vob'),
+        'id': 'mpeg_video',
+        'mime': (u'video/mpeg', u'video/mp2p'),
+        'min_size': 96,
+    }),
+    ('hachoir_parser.video.mpeg_ts', 'MPEG_TS', {
+        'category': 'video',
+        'description': u'MPEG-2 Transport Stream',
+        'file_ext': ('ts',),
+        'id': 'mpeg_ts',
+        'min_size': 1504,
+    }),
+    ('hachoir_parser.video.mov', 'MovFile', {
+        'category': 'video',
+        'description': 'Apple QuickTime movie',
+        'file_ext': ('mov', 'qt', 'mp4', 'm4v', 'm4a', 'm4p', 'm4b'),
+        'id': 'mov',
+        'magic': (('moov', 32),),
+        'mime': (u'video/quicktime', u'video/mp4'),
+        'min_size': 64,
+    }),
+)
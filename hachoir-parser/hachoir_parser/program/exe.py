@@ -85,6 +85,22 @@ class ExeFile(HachoirParser, RootSeekableFieldSet):
                     % self["pe_header/nb_section"].value
         return True
 
+    @classmethod
+    def quickCheck(cls, data, pos):
+        # Check MSDosHeader.isValid() for PE-looking headers, the magic
+        # regex already checks size_mod_512 and code_offset
+        if len(data) < pos + 64:
+            return True
+        if data[pos+5] != "\0" or "\4" <= data[pos+4]:
+            # size_div_512 >= 4: doesn't look like a PE
+            return True
+        if data[pos+18] != "\0" or data[pos+19] != "\0":
+            # checksum != 0
+            return False
+        next_offset = ord(data[pos+60]) + (ord(data[pos+61]) << 8)
+        return (data[pos+62] == "\0" and data[pos+63] == "\0"
+            and 80 <= next_offset <= 1024)
+
     def createFields(self):
         yield MSDosHeader(self, "msdos", "MS-DOS program header")
 
@@ -790,6 +790,21 @@ class Atom(FieldSet):
     tag_handler = [ item[0] for item in tag_info ]
     tag_desc = [ item[1] for item in tag_info ]
 
+    def createSize(self):
+        # Read the header directly: the atom content is only parsed on demand
+        address = self.absolute_address
+        size = self.stream.readBits(address, 32, self.endian)
+        header = 8
+        if size == 1:
+            size = self.stream.readBits(address + 64, 64, self.endian)
+            header = 16
+        if self.stream.readBytes(address + 32, 4) == "uuid":
+            header += 16
+        if size < header:
+            # Unbounded (size=0) or invalid atom
+            return None
+        return size * 8
+
     def createFields(self):
         yield UInt32(self, "size")
         yield RawBytes(self, "tag", 4)
@@ -73,6 +73,7 @@ class MPEG_TS(Parser):
         "description": u"MPEG-2 Transport Stream"
     }
     endian = BIG_ENDIAN
+    checkpoint_interval = 1000
 
     def validate(self):
         sync = self.stream.searchBytes("\x47", 0, 204*8)
@@ -92,6 +93,12 @@ class MPEG_TS(Parser):
         return True
 
     def createFields(self):
+        return self.resumeFields()
+
+    def createCheckpoint(self):
+        return ()
+
+    def resumeFields(self):
         while not self.eof:
             sync = self.stream.searchBytes("\x47", self.current_size, self.current_size+204*8)
             if sync is None:
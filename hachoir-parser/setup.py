@@ -7,6 +7,7 @@ from sys import argv
 #  - edit hachoir_parser/version.py: __version__ = "XXX"
 #  - edit setup.py: install_options["install_requires"] = "hachoir-core>=XXX"
 #  - edit INSTALL: update Dependencies
+#  - run: ./update_registry.py and check that the registry is up to date
 #  - run: ./tests/run_testcase.py ~/testcase
 #  - edit ChangeLog (set release date)
 #  - run: hg commit
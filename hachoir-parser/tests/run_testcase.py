@@ -14,12 +14,21 @@ config.quiet = True      # Don't display warnings
 from hachoir_core.field import FieldError
 from hachoir_core.i18n import getTerminalCharset
 from hachoir_core.error import HACHOIR_ERRORS, error
-from hachoir_core.stream import InputStreamError, StringInputStream
+from hachoir_core.stream import (InputStreamError, StringInputStream,
+    InputIOStream)
 from hachoir_parser import createParser, HachoirParserList, ValidateError
+from hachoir_parser.archive.tar import iterTarIndex
+from hachoir_parser.archive.zip import ZipFile
+from hachoir_parser.misc.pdf import PDFDocument
 from hachoir_core.compatibility import all
 from locale import setlocale, LC_ALL
 from array import array
 from datetime import datetime
+from StringIO import StringIO
+from struct import pack
+import tarfile
+import zipfile
+import zlib
 import random
 import os
 import sys
@@ -539,6 +548,188 @@ def testRandom(seed=0, tests=(1,8)):
     return ok
 
 
+class ReadStream(StringInputStream):
+    """
+    String stream storing the lowest address read (in bytes)
+    """
+    lowest = None
+
+    def read(self, address, size):
+        if self.lowest is None or address // 8 < self.lowest:
+            self.lowest = address // 8
+        return StringInputStream.read(self, address, size)
+
+def checkTrailer(title, ok):
+    if ok:
+        sys.stdout.write("  - %s: ok\n" % title)
+    else:
+        sys.stdout.write("  - %s: error!\n" % title)
+    return ok
+
+def createZip64(data, end64):
+    """
+    Create a ZIP archive of one stored file: the local header stores the
+    sizes in the ZIP64 extra field (as zipfile with force_zip64=True). If
+    end64 is True, the central directory also stores the sizes and the
+    offset in the ZIP64 extra field, and the archive has a ZIP64 end of
+    central directory.
+    """
+    name = "a.txt"
+    crc32 = zlib.crc32(data) & 0xFFFFFFFF
+    archive = pack("<IHHHHHIIIHH", 0x04034B50, 45, 0, 0, 0, 0x21, crc32,
+        0xFFFFFFFF, 0xFFFFFFFF, len(name), 20) + name \
+        + pack("<HHQQ", 1, 16, len(data), len(data)) + data
+    offset = len(archive)
+    if end64:
+        archive += pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 45, 45, 0, 0, 0, 0x21,
+            crc32, 0xFFFFFFFF, 0xFFFFFFFF, len(name), 28, 0, 0, 0, 0,
+            0xFFFFFFFF) + name + pack("<HHQQQ", 1, 24, len(data), len(data), 0)
+    else:
+        archive += pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 45, 45, 0, 0, 0, 0x21,
+            crc32, len(data), len(data), len(name), 0, 0, 0, 0, 0, 0) + name
+    size = len(archive) - offset
+    if end64:
+        end = len(archive)
+        archive += pack("<IQHHIIQQQQ", 0x06064B50, 44, 45, 45, 0, 0, 1, 1,
+            size, offset)
+        archive += pack("<IIQI", 0x07064B50, 0, end, 1)
+        archive += pack("<IHHHHIIH", 0x06054B50, 0, 0, 0xFFFF, 0xFFFF,
+            0xFFFFFFFF, 0xFFFFFFFF, 0)
+    else:
+        archive += pack("<IHHHHIIH", 0x06054B50, 0, 0, 1, 1, size, offset, 0)
+    return archive
+
+def testZipTrailer():
+    print "[+] Test ZIP archive:"
+    output = StringIO()
+    archive = zipfile.ZipFile(output, "w", zipfile.ZIP_STORED)
+    for name in ("a.txt", "b.txt", "c.txt"):
+        archive.writestr(name, name * 2000)
+    archive.close()
+    data = output.getvalue()
+    last_entry = data.rindex("PK\3\4")
+
+    ok = True
+    parser = ZipFile(ReadStream(data))
+    ok &= checkTrailer("Fields in the order of the archive",
+        [field.name for field in parser] == ["header[0]", "file[0]",
+        "header[1]", "file[1]", "header[2]", "file[2]",
+        "header[3]", "central_directory[0]", "header[4]", "central_directory[1]",
+        "header[5]", "central_directory[2]", "header[6]", "end_central_directory"])
+
+    # Read the end of central directory and the central directory without
+    # reading the first file entries
+    stream = ReadStream(data)
+    parser = ZipFile(stream)
+    ok &= checkTrailer("Read the end of central directory first",
+        parser["end_central_directory/total_number_disk2"].value == 3
+        and parser["central_directory[2]/filename"].value == u"c.txt"
+        and last_entry <= stream.lowest)
+
+    # Only parse the requested file entry
+    stream = ReadStream(data)
+    parser = ZipFile(stream)
+    entry = parser.getFileEntry(u"c.txt")
+    ok &= checkTrailer("Create a file entry at its offset",
+        entry.name == "file[2]" and entry["data"].value == "c.txt" * 2000
+        and last_entry <= stream.lowest)
+
+    # ZIP64 sizes in the local header
+    data = "a.txt" * 2000
+    parser = ZipFile(StringInputStream(createZip64(data, False)))
+    entry = parser["file[0]"]
+    ok &= checkTrailer("Read the ZIP64 sizes of the local header",
+        entry["extra/extra[0]/compressed_size"].value == len(data)
+        and entry["data"].value == data
+        and entry.description == "File entry: a.txt (9.8 KB)")
+
+    # ZIP64 end of central directory and central directory
+    parser = ZipFile(StringInputStream(createZip64(data, True)))
+    entry = parser.getFileEntry(u"a.txt")
+    ok &= checkTrailer("Read the ZIP64 end of central directory",
+        parser["end64_central_directory/offset"].value == len(data) + 55
+        and parser["central_directory[0]/extra/extra[0]/offset_header"].value == 0
+        and parser["central_directory[0]/extra/extra[0]/uncompressed_size"].value == len(data)
+        and entry["data"].value == data
+        and [field.name for field in parser] == ["header[0]", "file[0]",
+        "header[1]", "central_directory[0]", "header[2]",
+        "end64_central_directory", "header[3]", "end_locator",
+        "header[4]", "end_central_directory"])
+    return ok
+
+def testPDFTrailer():
+    print "[+] Test updated PDF document:"
+    data = "%PDF-1.4\n1 0 obj\n<< >>\nendobj\n"
+    xref = len(data)
+    data += "xref\n0 2\n0000000000 65535 f \n0000000009 00000 n \n" \
+        "trailer\n<< /Size 2 >>\nstartxref\n%s\n%%%%EOF\n" % xref
+    data += "2 0 obj\n<< >>\nendobj\n"
+    update = len(data)
+    data += "xref\n0 1\n0000000000 65535 f \n" \
+        "trailer\n<< /Size 3 /Prev %s >>\nstartxref\n%s\n%%%%EOF\n" % (xref, update)
+
+    # The last cross-reference table is read from "startxref"
+    pdf = PDFDocument(StringInputStream(data))
+    return checkTrailer("Read the last cross-reference table",
+        pdf["body"].size == (update - 9) * 8
+        and pdf["cross_ref_table"].absolute_address == update * 8)
+
+def testTrailer():
+    return testZipTrailer() & testPDFTrailer()
+
+class PipeFile(object):
+    """
+    File object without seek() method: InputIOStream reads it with an
+    InputPipe
+    """
+    def __init__(self, data):
+        self.read = StringIO(data).read
+
+def createTar(format):
+    output = StringIO()
+    archive = tarfile.open(mode="w", fileobj=output, format=format)
+    info = tarfile.TarInfo("directory")
+    info.type = tarfile.DIRTYPE
+    info.mtime = 1000000000
+    archive.addfile(info)
+    # Long name: GNU "L" header, PAX "x" header or ustar name prefix
+    for index, name in enumerate(("directory/" * 12 + "long_name.txt", "a.txt")):
+        content = name * (index + 100)
+        info = tarfile.TarInfo(name)
+        info.size = len(content)
+        info.mtime = 1000000000 + index
+        archive.addfile(info, StringIO(content))
+    archive.close()
+    return output.getvalue()
+
+def testTarIndex():
+    print "[+] Test TAR index:"
+    ok = True
+    for title, format in (
+        ("GNU", tarfile.GNU_FORMAT),
+        ("PAX", tarfile.PAX_FORMAT),
+        ("ustar", tarfile.USTAR_FORMAT),
+    ):
+        data = createTar(format)
+        # tarfile removes the "/" suffix of directory names, and its offset
+        # is the offset of the first header (eg. GNU long name)
+        members = []
+        for member in tarfile.open(fileobj=StringIO(data)):
+            name = unicode(member.name, "UTF-8")
+            if member.isdir():
+                name += u"/"
+            members.append((name, member.offset_data - 512, member.size,
+                member.mtime, ord(member.type)))
+        for source, stream in (
+            ("string", StringInputStream(data)),
+            ("pipe", InputIOStream(PipeFile(data))),
+        ):
+            index = [(entry.name, entry.offset, entry.size, entry.mtime,
+                entry.type) for entry in iterTarIndex(stream)]
+            ok &= checkTrailer("Index a %s archive (%s)" % (title, source),
+                index == members)
+    return ok
+
 def main():
     setlocale(LC_ALL, "C")
     if len(sys.argv) != 2:
@@ -556,6 +747,17 @@ def main():
         sys.exit(1)
     print "Result: ok"
 
+    print
+    print "Test hachoir-parser using indexed archives."
+    print
+    if not (testTrailer() & testTarIndex()):
+        print
+        for index in xrange(3):
+            print "!!! ERROR !!!"
+        print
+        sys.exit(1)
+    print "Result: ok"
+
     print
     print "Test hachoir-parser using testcase."
     print
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+"""
+Create hachoir_parser/parser_registry.py: the static registry of the
+parsers, used by HachoirParserList to only import the module of a parser
+when it's used. Run this script after adding a parser or changing its tags.
+"""
+from os import path
+from sys import path as sys_path
+
+def main():
+    root = path.dirname(path.abspath(__file__))
+    sys_path.insert(0, root)
+    from hachoir_parser.parser_list import HachoirParserList
+    parsers = HachoirParserList(use_registry=False)
+    filename = path.join(root, "hachoir_parser", "parser_registry.py")
+    out = open(filename, "w")
+    try:
+        parsers.writeRegistry(out)
+    finally:
+        out.close()
+    print "%s parsers written into %s" % (len(parsers.parser_list), filename)
+
+if __name__ == "__main__":
+    main()
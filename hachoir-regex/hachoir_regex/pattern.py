@@ -1,5 +1,60 @@
-from hachoir_regex import RegexEmpty, RegexOr, parse, createString
+from hachoir_regex import (RegexEmpty, RegexOr, RegexAnd, RegexString,
+    RegexRepeat, parse, createString)
 from hachoir_regex.tools import makePrintable
+from hachoir_regex.version import __version__
+import marshal
+import os
+import re
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import new as md5
+
+# Cache file format
+CACHE_MAGIC = "HACHOIR-REGEX\1"
+CACHE_FILE_EXT = ".regex"
+
+def findLiteral(regex):
+    """
+    Find a string which is always matched by regex at a fixed offset.
+    Prefer the string with most distinct characters (the rarest), then
+    the longest. Return (offset, text) or None.
+
+    >>> findLiteral(parse("abc"))
+    (0, 'abc')
+    >>> findLiteral(parse("MZ.[a-z]{4}PE"))
+    (0, 'MZ')
+    >>> findLiteral(parse("x{16}.{24}_FVH"))
+    (40, '_FVH')
+    >>> findLiteral(parse("a+b")) is None
+    True
+    """
+    if regex.__class__ == RegexAnd:
+        items = regex.content
+    else:
+        items = (regex,)
+    best = None
+    offset = 0
+    for item in items:
+        text = None
+        if item.__class__ == RegexString:
+            text = item.text
+        elif item.__class__ == RegexRepeat \
+        and item.regex.__class__ == RegexString \
+        and item.min == item.max:
+            text = item.regex.text * item.min
+        if text:
+            key = (len(set(text)), len(text))
+            if best is None or best[0] < key:
+                best = (key, offset, text)
+        length = item.minLength()
+        if length is None or length != item.maxLength():
+            # Next items are not at a fixed offset
+            break
+        offset += length
+    if best is None:
+        return None
+    return best[1:]
 
 class Pattern:
     """
@@ -37,8 +92,8 @@ class RegexPattern(Pattern):
     def __repr__(self):
         return "<RegexPattern '%s'>" % self
 
-    def match(self, data):
-        return self.compiled_regex.match(data)
+    def match(self, data, pos=0):
+        return self.compiled_regex.match(data, pos)
 
     def _getCompiledRegex(self):
         if self._compiled_regex is None:
@@ -65,44 +120,209 @@ class PatternMatching:
     (0, 1, <StringPattern 'a'>)
     (2, 3, <StringPattern 'b'>)
     (4, 6, <RegexPattern '[cd]e'>)
+
+    find() searches the strings with one regex merging their common
+    prefixes (a keyword tree run by the re module, not an Aho-Corasick
+    automaton) and the regex with a literal prefilter. It returns
+    (start, pattern) and matches of different patterns may overlap:
+
+    >>> p.addString("ab ")
+    >>> for item in p.find("ab ce"):
+    ...    print item
+    ...
+    (0, <StringPattern 'a'>)
+    (0, <StringPattern 'ab '>)
+    (1, <StringPattern 'b'>)
+    (3, <RegexPattern '[cd]e'>)
+
+    If cache_directory is set, the search tables of find() are stored in
+    this directory and reused by the next PatternMatching objects having the same patterns.
     """
-    def __init__(self):
+    def __init__(self, cache_directory=None):
         self.string_patterns = []
         self.string_dict = {}
         self.regex_patterns = []
+        self.cache_directory = cache_directory
         self._need_commit = True
 
         # Following attributes are generated by _commit() method
         self._regex = None
         self._compiled_regex = None
         self._max_length = None
+        self._string_regex = None
+        self._string_anchors = None
+        self._regex_filters = None
 
     def commit(self):
         """
-        Generate whole regex merging all (string and regex) patterns
+        Compute the maximum pattern length and create the search tables
+        used by find(). The whole regex merging all (string and regex) patterns
+        is only generated on demand (regex and compiled_regex attributes).
         """
         if not self._need_commit:
             return
         self._need_commit = False
+        self._regex = None
+        self._compiled_regex = None
         length = 0
+        for item in self.string_patterns:
+            length = max(length, len(item.text))
+        for item in self.regex_patterns:
+            length = max(length, item.regex.maxLength())
+        self._max_length = length
+        if self.cache_directory and self._loadCache():
+            return
+        self._commitSearchTables()
+        if self.cache_directory:
+            self._saveCache()
+
+    def _commitRegex(self):
         regex = None
         for item in self.string_patterns:
             if regex:
                 regex |= createString(item.text)
             else:
                 regex = createString(item.text)
-            length = max(length, len(item.text))
         for item in self.regex_patterns:
             if regex:
                 regex |= item.regex
             else:
                 regex = item.regex
-            length = max(length, item.regex.maxLength())
         if not regex:
             regex = RegexEmpty()
         self._regex = regex
-        self._compiled_regex = regex.compile(python=True)
-        self._max_length = length
+
+    def _commitSearchTables(self):
+        # Keyword tree of the strings: RegexOr merges common prefixes,
+        # so each byte is only tested once against the tree at a given
+        # offset (re tries the tree at each offset: there is no failure
+        # link as in an Aho-Corasick automaton). Leading nul bytes are
+        # not part of the tree keys (anchors), else the tree is tried at
+        # each byte of zero filled data.
+        anchors = []
+        for item in self.string_patterns:
+            anchor = item.text.lstrip("\0")
+            if not anchor:
+                anchor = item.text
+            anchors.append((anchor, len(item.text) - len(anchor), item))
+        regex = None
+        for anchor, offset, item in anchors:
+            if regex:
+                regex |= createString(anchor)
+            else:
+                regex = createString(anchor)
+        if regex:
+            self._string_regex = regex.compile(python=True)
+        else:
+            self._string_regex = None
+
+        # The tree only gives one anchor per offset: list the strings
+        # which may match when an anchor is found, with their anchor
+        # offset (the anchors are equal or one is a prefix of the other)
+        self._string_anchors = {}
+        for anchor, offset, item in anchors:
+            if anchor in self._string_anchors:
+                continue
+            self._string_anchors[anchor] = [
+                (other_offset, other)
+                for other_anchor, other_offset, other in anchors
+                if other_anchor.startswith(anchor)
+                or anchor.startswith(other_anchor)]
+
+        # Regex filters: (offset, literal, pattern), the pattern is only
+        # tried where the literal is found (offset=0: let re search
+        # the literal prefix)
+        self._regex_filters = []
+        for item in self.regex_patterns:
+            literal = findLiteral(item.regex)
+            if literal:
+                offset, text = literal
+            else:
+                offset, text = 0, None
+            self._regex_filters.append((offset, text, item))
+
+    def cacheKey(self):
+        """
+        Key of the search table cache: hash of the hachoir-regex version
+        and of the patterns (the order of the patterns doesn't matter).
+        """
+        key = (__version__,
+            sorted(item.text for item in self.string_patterns),
+            sorted(str(item.regex) for item in self.regex_patterns))
+        return md5(repr(key)).hexdigest()
+
+    def _cacheFilename(self, key):
+        return os.path.join(self.cache_directory, key + CACHE_FILE_EXT)
+
+    def _loadCache(self):
+        """
+        Load the search tables from the cache directory.
+        Return False if it's not in the cache.
+        """
+        key = self.cacheKey()
+        try:
+            input = open(self._cacheFilename(key), "rb")
+            try:
+                data = input.read()
+            finally:
+                input.close()
+        except IOError:
+            return False
+        if not data.startswith(CACHE_MAGIC):
+            return False
+        try:
+            cache_key, string_regex, anchors, filters = \
+                marshal.loads(data[len(CACHE_MAGIC):])
+        except (ValueError, EOFError, TypeError):
+            return False
+        if cache_key != key:
+            return False
+        if string_regex is not None:
+            self._string_regex = re.compile(string_regex)
+        else:
+            self._string_regex = None
+        self._string_anchors = {}
+        for anchor, items in anchors:
+            self._string_anchors[anchor] = [
+                (offset, self.string_dict[text]) for offset, text in items]
+        self._regex_filters = [
+            filters[str(item.regex)] + (item,) for item in self.regex_patterns]
+        return True
+
+    def _saveCache(self):
+        """
+        Write the search tables in the cache directory. Errors are ignored:
+        the cache is optional.
+        """
+        key = self.cacheKey()
+        if self._string_regex is not None:
+            string_regex = self._string_regex.pattern
+        else:
+            string_regex = None
+        # Patterns are identified by their text
+        anchors = [
+            (anchor, [(offset, item.text) for offset, item in items])
+            for anchor, items in self._string_anchors.iteritems()]
+        filters = dict((str(item.regex), (offset, text))
+            for offset, text, item in self._regex_filters)
+        data = marshal.dumps((key, string_regex, anchors, filters))
+
+        # Write a temporary file and rename it, so concurrent processes
+        # never read a partial file
+        filename = self._cacheFilename(key)
+        temp_filename = "%s.%s" % (filename, os.getpid())
+        try:
+            if not os.path.isdir(self.cache_directory):
+                os.makedirs(self.cache_directory)
+            output = open(temp_filename, "wb")
+            try:
+                output.write(CACHE_MAGIC)
+                output.write(data)
+            finally:
+                output.close()
+            os.rename(temp_filename, filename)
+        except (IOError, OSError):
+            pass
 
     def addString(self, magic, user=None):
         item = StringPattern(magic, user)
@@ -149,23 +369,63 @@ class PatternMatching:
             item = self.getPattern(match.group(0))
             yield (match.start(0), match.end(0), item)
 
+    def find(self, data):
+        """
+        Search patterns in data using the search tables (see commit()).
+        Return a generator of tuples (start, item) sorted by start.
+        """
+        self.commit()
+        matches = []
+        if self._string_regex is not None:
+            search = self._string_regex.search
+            startswith = data.startswith
+            match = search(data)
+            while match:
+                pos = match.start()
+                for offset, item in self._string_anchors[match.group()]:
+                    start = pos - offset
+                    if 0 <= start and startswith(item.text, start):
+                        matches.append((start, item))
+                match = search(data, pos + 1)
+        for offset, text, item in self._regex_filters:
+            if offset:
+                find = data.find
+                pos = find(text, offset)
+                while pos != -1:
+                    start = pos - offset
+                    if item.match(data, start):
+                        matches.append((start, item))
+                    pos = find(text, pos + 1)
+            else:
+                search = item.compiled_regex.search
+                match = search(data)
+                while match:
+                    start = match.start()
+                    matches.append((start, item))
+                    match = search(data, start + 1)
+        matches.sort(key=lambda match: match[0])
+        return iter(matches)
+
     def __str__(self):
         return makePrintable(str(self.regex), 'ASCII', to_unicode=True)
 
-    def _getAttribute(self, name):
-        self.commit()
-        return getattr(self, name)
-
     def _getRegex(self):
-        return self._getAttribute("_regex")
+        self.commit()
+        if self._regex is None:
+            self._commitRegex()
+        return self._regex
     regex = property(_getRegex)
 
     def _getCompiledRegex(self):
-        return self._getAttribute("_compiled_regex")
+        self.commit()
+        if self._compiled_regex is None:
+            self._compiled_regex = self.regex.compile(python=True)
+        return self._compiled_regex
     compiled_regex = property(_getCompiledRegex)
 
     def _getMaxLength(self):
-        return self._getAttribute("_max_length")
+        self.commit()
+        return self._max_length
     max_length = property(_getMaxLength)
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Benchmark the magic search of hachoir-subfile: compare the rate of the
+single regex (PatternMatching.search) and of the keyword tree with
+literal prefilters (PatternMatching.find) on random data, zero filled data and files.
+
+Usage: bench_magic.py [--parser=id1,id2,...] [file ...]
+"""
+
+from hachoir_regex import PatternMatching
+from hachoir_subfile.pattern import HachoirPatternMatching
+from optparse import OptionParser
+from time import time
+import os
+
+SIZE = 8*1024*1024   # Size of random and zero data (8 MB)
+LOOPS = 3
+
+def bench(func, data):
+    best = None
+    for loop in xrange(LOOPS):
+        start = time()
+        count = 0
+        for item in func(data):
+            count += 1
+        duration = time() - start
+        if best is None or duration < best:
+            best = duration
+    return count, best
+
+def benchData(patterns, name, data):
+    print "%s (%.1f MB):" % (name, len(data) / (1024.0*1024))
+    rates = []
+    for method in (PatternMatching.search, PatternMatching.find):
+        count, duration = bench(lambda data: method(patterns, data), data)
+        rate = len(data) / duration / (1024*1024)
+        rates.append(rate)
+        print "   %s(): %s matches, %.1f MB/sec" % (method.__name__, count, rate)
+    print "   speedup: %.1fx" % (rates[1] / rates[0])
+
+def main():
+    parser = OptionParser(usage="%prog [--parser=id1,id2,...] [file ...]")
+    parser.add_option("--parser", help="List of parser identifiers",
+        type="str", action="store", default=None)
+    values, filenames = parser.parse_args()
+    if values.parser:
+        parser_ids = values.parser.split(",")
+    else:
+        parser_ids = None
+
+    patterns = HachoirPatternMatching(parser_ids=parser_ids)
+    print "Patterns: %s strings, %s regex" % (
+        len(patterns.string_patterns), len(patterns.regex_patterns))
+    benchData(patterns, "random", os.urandom(SIZE))
+    benchData(patterns, "zeros", "\0" * SIZE)
+    for filename in filenames:
+        data = open(filename, "rb").read(SIZE)
+        benchData(patterns, filename, data)
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,83 @@
 from hachoir_core.cmd_line import unicodeFilename
-from hachoir_core.stream import FileOutputStream, StreamError
+from hachoir_core.stream import (FileOutputStream, StreamError,
+    InputIOStream, MmapInputStream, InputSubStream)
+from hachoir_core.stream.input import ReadStreamError
 from hachoir_core.error import error
+from hachoir_core.tools import makeUnicode
 from errno import EEXIST
 from os import mkdir, path
+import csv
+
+COPY_SIZE = 1024*1024   # Size in bytes of a copy chunk (1 MB)
+HOLE_SIZE = 64*1024     # Size in bytes of a sparse file block (64 KB)
+
+def readChunks(stream, offset, size, chunk_size=COPY_SIZE):
+    """
+    Generator reading 'size' bytes of 'stream' at 'offset' (in bits) by
+    chunks of chunk_size bytes. If the offset is aligned on a byte, data of
+    a regular file are read directly from the memory map or the file,
+    instead of using stream.readBytes().
+    """
+    read = _fileReader(stream, offset, size)
+    if read:
+        read, address = read
+    else:
+        def read(address, size):
+            return stream.readBytes(address * 8, size)
+        address = offset // 8
+    end = address + size
+    while address < end:
+        size = min(chunk_size, end - address)
+        data = read(address, size)
+        if len(data) != size:
+            if data:
+                yield data
+            raise ReadStreamError(8 * size, 8 * address, 8 * len(data))
+        yield data
+        address += size
+
+def _fileReader(stream, offset, size):
+    """
+    Get (read, address) where read(address, size) reads data of the memory
+    map or of the file of the stream, or None if it's not possible.
+    """
+    end = offset + size * 8
+    while isinstance(stream, InputSubStream):
+        if stream._size is not None and stream._size < end:
+            return None
+        offset += stream._offset
+        end += stream._offset
+        stream = stream.stream
+    if offset % 8:
+        return None
+    if isinstance(stream, MmapInputStream):
+        data = stream.data
+        def read(address, size):
+            return data[address:address+size]
+    elif isinstance(stream, InputIOStream) \
+    and hasattr(stream._input, "fileno"):
+        input = stream.file()
+        def read(address, size):
+            input.seek(address)
+            return input.read(size)
+    else:
+        return None
+    return read, offset // 8
 
 class Output:
     """
     Store files found by search tool.
+
+    Files are copied directly from the memory map or the file of the input
+    stream if possible. With sparse=True, blocks of nul bytes are not
+    written: they are holes of the output files.
     """
-    def __init__(self, directory):
+    def __init__(self, directory, sparse=False):
         self.directory_raw = directory
         self.directory_unicode = unicodeFilename(directory)
         self.mkdir = False
         self.file_id = 1
+        self.sparse = sparse
 
     def createDirectory(self):
         try:
@@ -30,21 +95,97 @@ class Output:
             filename += file_ext
         return filename
 
-    def writeFile(self, filename, stream, offset, size):
+    def createFile(self, filename):
+        """
+        Create an output file: return (filename, output stream).
+        """
         # Create directory (only on first call)
         if not self.mkdir:
             self.createDirectory()
             self.mkdir = True
 
-        # Create output file
         filename, real_filename = path.join(self.directory_unicode, filename), \
                                   path.join(self.directory_raw, filename)
-        output = FileOutputStream(filename, real_filename=real_filename)
+        return filename, FileOutputStream(filename, real_filename=real_filename)
+
+    def writeFile(self, filename, stream, offset, size):
+        filename, output = self.createFile(filename)
 
         # Write output
         try:
-            output.copyBytesFrom(stream, offset, size//8)
+            self.copyFile(output, stream, offset, size)
         except StreamError, err:
-            error(u"copyBytesFrom() error: %s" % err)
+            error(u"copyFile() error: %s" % err)
+        output.close()
         return filename
 
+    def copyFile(self, output, stream, offset, size):
+        """
+        Copy 'size' bits of 'stream' at 'offset' (in bits) to the output
+        stream 'output'.
+        """
+        if not self.sparse:
+            for data in readChunks(stream, offset, size//8):
+                output.writeBytes(data)
+            return
+        hole = "\0" * HOLE_SIZE
+        for data in readChunks(stream, offset, size//8, HOLE_SIZE):
+            if len(data) == HOLE_SIZE and data == hole:
+                output.writeHole(HOLE_SIZE)
+            else:
+                output.writeBytes(data)
+
+class Index:
+    """
+    Write the index of the found files (offset and size in bytes, parser
+    identifier and description) in CSV or JSON format. Sizes are None
+    (empty in CSV) if they are unknown.
+    """
+    FORMATS = ("csv", "json")
+
+    def __init__(self, filename, format=None):
+        if format is None:
+            if filename.lower().endswith(".json"):
+                format = "json"
+            else:
+                format = "csv"
+        if format not in self.FORMATS:
+            raise ValueError("Invalid index format: %r" % format)
+        if format == "json":
+            # Python 2.6+
+            from json import dumps
+            self.dumps = dumps
+        self.format = format
+        self.file = open(filename, "wb")
+        self.count = 0
+        if format == "csv":
+            self.csv = csv.writer(self.file)
+            self.csv.writerow(("offset", "size", "parser", "description"))
+        else:
+            self.file.write("[")
+
+    def addFile(self, offset, parser, description):
+        """
+        Add the file 'parser' found at 'offset' (in bits).
+        """
+        size = parser.content_size
+        if size is not None:
+            size //= 8
+        parser_id = parser.getParserTags()["id"]
+        if self.format == "csv":
+            if size is None:
+                size = ""
+            self.csv.writerow((offset // 8, size, parser_id,
+                makeUnicode(description).encode("utf-8")))
+        else:
+            if self.count:
+                self.file.write(",")
+            self.file.write("\n" + self.dumps({"offset": offset // 8,
+                "size": size, "parser": parser_id,
+                "description": makeUnicode(description)}, sort_keys=True))
+        self.count += 1
+
+    def close(self):
+        if self.format == "json":
+            self.file.write("\n]\n")
+        self.file.close()
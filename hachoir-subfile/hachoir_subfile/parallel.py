@@ -0,0 +1,199 @@
+"""
+Parallel search: the stream is split in shards searched by worker
+processes, results are merged in offset order by the main process.
+"""
+
+from hachoir_core.cmd_line import unicodeFilename
+from hachoir_core.stream import FileInputStream
+from hachoir_core.memory import limitedMemory
+from hachoir_subfile.search import SearchSubfile, PROGRESS_UPDATE
+from time import time
+try:
+    from multiprocessing import Pool, Queue, TimeoutError
+    from Queue import Empty
+except ImportError:
+    # Python < 2.6
+    Pool = None
+
+SHARD_SIZE = 64*1024*1024   # Maximum shard size in bytes (64 MB)
+
+# Search object of a worker process (see initWorker())
+_worker = None
+
+def initWorker(filename, categories, parser_ids, cache_directory,
+    memory_limit, progress):
+    global _worker
+    stream = FileInputStream(unicodeFilename(filename), real_filename=filename)
+    _worker = ShardSearch(stream, progress)
+    _worker.cache_directory = cache_directory
+    _worker.memory_limit = memory_limit
+    _worker.loadParsers(categories, parser_ids)
+    _worker.slice_size = max(_worker.slice_size, _worker.patterns.max_length * 8)
+    # Start the feeder thread of the queue before limiting the memory
+    progress.put(0)
+
+def searchShard(shard):
+    if _worker.memory_limit is None:
+        return _worker.searchShard(*shard)
+    return limitedMemory(_worker.memory_limit, _worker.searchShard, *shard)
+
+class ShardSearch(SearchSubfile):
+    """
+    Search subfiles in a shard (in a worker process), report progress
+    to the main process using the 'progress' queue.
+    """
+    def __init__(self, stream, progress):
+        SearchSubfile.__init__(self, stream)
+        self.verbose = False
+        self.progress = progress
+
+    def searchShard(self, start, end):
+        """
+        Search subfiles in [start; end) (in bits). Return (start, end, hits,
+        next_offset, attempts) where hits is a list of (offset, parser
+        identifier, skip_end) and attempts a list of (offset, parser
+        identifier, valid, rejected). skip_end is the end of the subfile if it sets
+        next_offset (see skipSize()), None otherwise.
+        """
+        self.attempts = []
+        self.current_offset = self.start_offset = self.reported = start
+        self.next_offset = None
+        self.next_progress = time() + PROGRESS_UPDATE / 2
+        hits = []
+        for offset, parser in self.searchRange(end):
+            skip_end = self.skipSize(offset, parser)
+            if skip_end is not None:
+                skip_end += offset
+            hits.append((offset, parser.getParserTags()["id"], skip_end))
+        self.current_offset = end
+        self.updateProgress(True)
+        return (start, end, hits, self.next_offset, self.attempts)
+
+    def addStat(self, offset, parser_cls, valid, rejected=False):
+        self.attempts.append((offset, parser_cls.getParserTags()["id"],
+            valid, rejected))
+
+    def updateProgress(self, force=False):
+        if not force and time() < self.next_progress:
+            return
+        self.next_progress = time() + PROGRESS_UPDATE / 2
+        self.progress.put(self.current_offset - self.reported)
+        self.reported = self.current_offset
+
+class ParallelSearchSubfile(SearchSubfile):
+    """
+    Search subfiles using 'jobs' worker processes. Shards overlap by the
+    maximum magic length, so magics crossing a shard boundary are found.
+
+    The memory limit is applied to each shard in the worker processes:
+    the main process runs the pool threads which can't be created under
+    the limit.
+    """
+    def __init__(self, filename, stream, offset=0, size=None, jobs=2):
+        if Pool is None:
+            raise ImportError("Parallel search requires the multiprocessing module (Python 2.6+)")
+        SearchSubfile.__init__(self, stream, offset, size)
+        self.filename = filename
+        self.jobs = jobs
+        self.worker_memory_limit = self.memory_limit
+        self.memory_limit = None
+        self.categories = None
+        self.parser_ids = None
+
+    def loadParsers(self, categories=None, parser_ids=None):
+        SearchSubfile.loadParsers(self, categories, parser_ids)
+        self.categories = categories
+        self.parser_ids = parser_ids
+        self.parsers = {}
+        for item in self.patterns.string_patterns + self.patterns.regex_patterns:
+            parser = item.user[1]
+            self.parsers[parser.getParserTags()["id"]] = parser
+
+    def createShards(self):
+        size = self.size - self.start_offset
+        shard_size = min(SHARD_SIZE*8, size // self.jobs)
+        shard_size -= shard_size % self.slice_size
+        shard_size = max(shard_size, self.slice_size)
+        shards = []
+        start = self.start_offset
+        while start < self.size:
+            end = min(start + shard_size, self.size)
+            shards.append((start, end))
+            start = end
+        return shards
+
+    def searchSubfiles(self):
+        """
+        Search all subfiles: process the shard results in offset order
+        and call processParser() for each parser.
+        """
+        self.next_offset = None
+        self.next_progress = time() + PROGRESS_UPDATE
+        progress = Queue()
+        pool = Pool(self.jobs, initWorker,
+            (self.filename, self.categories, self.parser_ids,
+            self.cache_directory, self.worker_memory_limit, progress))
+        try:
+            results = pool.imap(searchShard, self.createShards())
+            while True:
+                try:
+                    result = results.next(PROGRESS_UPDATE)
+                except TimeoutError:
+                    self.readProgress(progress)
+                    continue
+                except StopIteration:
+                    break
+                self.readProgress(progress)
+                self.mergeShard(*result)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+        self.current_offset = self.size
+
+    def readProgress(self, queue):
+        """
+        Read progress of the workers: current_offset is the start offset
+        plus the size of the data searched by all workers.
+        """
+        try:
+            while True:
+                self.current_offset += queue.get_nowait()
+        except Empty:
+            pass
+        self.updateProgress()
+
+    def mergeShard(self, start, end, hits, next_offset, attempts):
+        """
+        Merge the result of a shard: apply skips of the previous shards
+        and process the valid parsers.
+        """
+        skipped = self.next_offset
+        for offset, parser_id, skip_end in hits:
+            if skipped is not None and offset < skipped \
+            and skipped < skip_end:
+                # The worker skipped data using a subfile which is skipped
+                # by a previous shard: search again after the skipped data
+                self.searchAgain(max(skipped, start), end)
+                return
+
+        # Only count parsers tried outside the data skipped by previous shards
+        for offset, parser_id, valid, rejected in attempts:
+            if skipped <= offset:
+                self.addStat(offset, self.parsers[parser_id], valid, rejected)
+
+        for offset, parser_id, skip_end in hits:
+            if offset < self.next_offset:
+                continue
+            parser = self.guess(offset, self.parsers[parser_id])
+            if parser:
+                self.processParser(offset, parser)
+        if next_offset is not None:
+            self.next_offset = max(self.next_offset, next_offset)
+
+    def searchAgain(self, start, end):
+        current_offset = self.current_offset
+        self.current_offset = start
+        for offset, parser in self.searchRange(end):
+            self.processParser(offset, parser)
+        self.current_offset = current_offset
@@ -1,9 +1,24 @@
 from hachoir_parser import QueryParser
 from hachoir_regex import PatternMatching
 
+# HachoirPatternMatching objects of the process, see getPatternMatching()
+_instances = {}
+
+def getPatternMatching(categories=None, parser_ids=None, cache_directory=None):
+    """
+    Get the HachoirPatternMatching object of the parsers: it's only created
+    once per process for the same categories and parser identifiers, so it
+    must not be modified.
+    """
+    key = (tuple(categories or ()), tuple(parser_ids or ()))
+    if key not in _instances:
+        _instances[key] = HachoirPatternMatching(
+            categories, parser_ids, cache_directory)
+    return _instances[key]
+
 class HachoirPatternMatching(PatternMatching):
-    def __init__(self, categories=None, parser_ids=None):
-        PatternMatching.__init__(self)
+    def __init__(self, categories=None, parser_ids=None, cache_directory=None):
+        PatternMatching.__init__(self, cache_directory)
 
         # Load parser list
         tags = []
@@ -23,7 +38,14 @@ class HachoirPatternMatching(PatternMatching):
                 self.addRegex(regex, (offset, parser))
         self.commit()
 
-    def search(self, data):
-        for start, stop, item in PatternMatching.search(self, data):
+    def search(self, data, end=None):
+        """
+        Search magics in data: generator of (parser, offset) where offset
+        is the file offset in bits. If end is set, ignore magics starting
+        at end (in bytes) or after.
+        """
+        for start, item in self.find(data):
+            if end is not None and end <= start:
+                break
             yield (item.user[1], start*8 - item.user[0])
 
@@ -3,8 +3,8 @@ from hachoir_core.stream import InputSubStream
 from hachoir_core.tools import humanFilesize, humanDuration
 from hachoir_core.memory import limitedMemory
 from hachoir_subfile.data_rate import DataRate
-from hachoir_subfile.output import Output
-from hachoir_subfile.pattern import HachoirPatternMatching as PatternMatching
+from hachoir_subfile.output import Output, Index
+from hachoir_subfile.pattern import getPatternMatching
 from sys import stderr
 from time import time
 
@@ -49,6 +49,7 @@ class SearchSubfile:
         self.start_offset = offset*8
         self.current_offset = self.start_offset
         self.slice_size = SLICE_SIZE*8   # 64 KB (in bits)
+        self.memory_limit = MEMORY_LIMIT  # None: no limit
 
         # Statistics
         self.datarate = DataRate(self.start_offset)
@@ -56,17 +57,26 @@ class SearchSubfile:
 
         # Other flags and attributes
         self.patterns = None
+        self.cache_directory = None
         self.verbose = True
         self.debug = False
         self.output = None
+        self.index = None
         self.filter = None
 
-    def setOutput(self, directory):
-        self.output = Output(directory)
+    def setOutput(self, directory, sparse=False):
+        self.output = Output(directory, sparse)
+
+    def setIndex(self, filename, format=None):
+        """
+        Write the index of the found files into 'filename' (see Index).
+        """
+        self.index = Index(filename, format)
 
     def loadParsers(self, categories=None, parser_ids=None):
         before = time()
-        self.patterns = PatternMatching(categories, parser_ids)
+        self.patterns = getPatternMatching(categories, parser_ids,
+            self.cache_directory)
         if self.debug:
             print "Regex compilation: %.1f ms" % ((time() - before)*1000)
             print "Use regex: %s" % self.patterns
@@ -84,7 +94,10 @@ class SearchSubfile:
         main_error = False
         try:
             # Run search
-            limitedMemory(MEMORY_LIMIT, self.searchSubfiles)
+            if self.memory_limit is not None:
+                limitedMemory(self.memory_limit, self.searchSubfiles)
+            else:
+                self.searchSubfiles()
         except KeyboardInterrupt:
             print >>stderr, "[!] Program interrupted (CTRL+C)"
             main_error = True
@@ -95,13 +108,13 @@ class SearchSubfile:
         return not(main_error)
 
     def mainHeader(self):
-        # Fix slice size if needed
-        self.slice_size = max(self.slice_size, self.patterns.max_length * 8)
-
         # Load parsers if none has been choosen
         if not self.patterns:
             self.loadParsers()
 
+        # Fix slice size if needed
+        self.slice_size = max(self.slice_size, self.patterns.max_length * 8)
+
         bytes = (self.size-self.start_offset)//8
         print >>stderr, "[+] Start search on %s bytes (%s)" % (
             bytes, humanFilesize(bytes))
@@ -111,6 +124,8 @@ class SearchSubfile:
         self.main_start = time()
 
     def mainFooter(self):
+        if self.index:
+            self.index.close()
         print >>stderr
         print >>stderr, "[+] End of search -- offset=%s (%s)" % (
             self.current_offset//8, humanFilesize(self.current_offset//8))
@@ -126,16 +141,27 @@ class SearchSubfile:
         """
         self.next_offset = None
         self.next_progress = time() + PROGRESS_UPDATE
-        while self.current_offset < self.size:
-            self.datarate.update(self.current_offset)
-            if self.verbose and self.next_progress <= time():
-                self.displayProgress()
-            for offset, parser in self.findMagic(self.current_offset):
-                self.processParser(offset, parser)
+        for offset, parser in self.searchRange(self.size):
+            self.processParser(offset, parser)
+
+    def searchRange(self, end):
+        """
+        Search subfiles from current offset to 'end' (in bits): generator
+        of (offset, parser).
+        """
+        while self.current_offset < end:
+            self.updateProgress()
+            for item in self.findMagic(self.current_offset, end):
+                yield item
             self.current_offset += self.slice_size
             if self.next_offset:
                 self.current_offset = max(self.current_offset, self.next_offset)
-            self.current_offset = min(self.current_offset, self.size)
+            self.current_offset = min(self.current_offset, end)
+
+    def updateProgress(self):
+        self.datarate.update(self.current_offset)
+        if self.verbose and self.next_progress <= time():
+            self.displayProgress()
 
     def processParser(self, offset, parser):
         """
@@ -145,23 +171,36 @@ class SearchSubfile:
         if parser.content_size is not None:
             text += " size=%s (%s)" % (parser.content_size//8, humanFilesize(parser.content_size//8))
         if not(parser.content_size) or parser.content_size//8 < FILE_MAX_SIZE:
-            text += ": " + parser.description
+            description = parser.description
         else:
-            text += ": " + parser.__class__.__name__
-
-        if self.output and parser.content_size:
-            if (offset == 0 and parser.content_size == self.size):
-                text += " (don't copy whole file)"
-            elif parser.content_size//8 >= FILE_MAX_SIZE:
-                text += " (don't copy file, too big)"
-            elif not self.filter or self.filter(parser):
-                filename = self.output.createFilename(parser.filename_suffix)
-                filename = self.output.writeFile(filename, self.stream, offset, parser.content_size)
-                text += " => %s" % filename
+            description = parser.__class__.__name__
+        text += ": " + description
+
+        if self.index:
+            self.index.addFile(offset, parser, description)
+        if self.output:
+            text += self.extractFile(offset, parser)
         print text
         self.next_progress = time() + PROGRESS_UPDATE
 
-    def findMagic(self, offset):
+    def extractFile(self, offset, parser):
+        """
+        Write the subfile in the output directory.
+        Return a text describing the extraction.
+        """
+        if not parser.content_size:
+            return ""
+        if (offset == 0 and parser.content_size == self.size):
+            return " (don't copy whole file)"
+        elif parser.content_size//8 >= FILE_MAX_SIZE:
+            return " (don't copy file, too big)"
+        elif not self.filter or self.filter(parser):
+            filename = self.output.createFilename(parser.filename_suffix)
+            filename = self.output.writeFile(filename, self.stream, offset, parser.content_size)
+            return " => %s" % filename
+        return ""
+
+    def findMagic(self, offset, end=None):
         """
         Find all 'magic_str' strings in stream in offset interval:
           offset..(offset+self.slice_size).
@@ -169,12 +208,17 @@ class SearchSubfile:
         The function returns a generator with values (offset, parser) where
         offset is beginning of a file (relative to stream begin), and not the
         position of the magic.
+
+        Data after the interval are also read to find magics starting in the
+        interval but ending after it.
         """
+        if end is None:
+            end = self.size
         start = offset
-        end = start + self.slice_size
-        end = min(end, self.size)
-        data = self.stream.readBytes(start, (end-start)//8)
-        for parser_cls, offset in self.patterns.search(data):
+        end = min(start + self.slice_size, end)
+        read_end = end + (self.patterns.max_length - 1) * 8
+        data = self.readData(start, read_end)
+        for parser_cls, offset in self.patterns.search(data, (end-start)//8):
             offset += start
             # Skip invalid offset
             if offset < 0:
@@ -182,38 +226,75 @@ class SearchSubfile:
             if offset < self.next_offset:
                 continue
 
+            # Cheap check on the data already read
+            pos, bits = divmod(offset - start, 8)
+            if not bits and 0 <= pos \
+            and not parser_cls.quickCheck(data, pos):
+                self.addStat(offset, parser_cls, False, True)
+                continue
+
             # Create parser at found offset
             parser = self.guess(offset, parser_cls)
 
             # Update statistics
-            if parser_cls not in self.stats:
-                self.stats[parser_cls] = [0, 0]
-            self.stats[parser_cls][0] += 1
+            self.addStat(offset, parser_cls, bool(parser))
             if not parser:
                 continue
 
             # Parser is valid, yield it with the offset
-            self.stats[parser_cls][1] += 1
-
             if self.debug:
                 print >>stderr, "Found %s at offset %s" % (
                     parser.__class__.__name__, offset//8)
             yield (offset, parser)
 
             # Set next offset
-            if parser.content_size is not None\
-            and skipSubfile(parser):
-                self.next_offset = offset + parser.content_size
+            size = self.skipSize(offset, parser)
+            if size is not None:
+                self.next_offset = offset + size
                 if end <= self.next_offset:
                     break
 
-    def guess(self, offset, parser_cls):
+    def skipSize(self, offset, parser):
+        """
+        Size (in bits) of the data skipped after the beginning of the
+        subfile 'parser' found at 'offset' (see skipSubfile()), or None if
+        the search continues in the subfile.
+        """
+        if not skipSubfile(parser):
+            return None
+        return parser.content_size
+
+    def readData(self, start, end):
+        """
+        Read data from 'start' to 'end' (in bits), or to the end of the
+        stream if it's smaller.
+        """
+        end = min(end, self.stream.size)
+        return self.stream.readBytes(start, (end-start)//8)
+
+    def addStat(self, offset, parser_cls, valid, rejected=False):
+        """
+        Update statistics: parser_cls has been tried at 'offset'. Statistics
+        of a parser are [hit, valid, rejected] where rejected is the number
+        of hits rejected by parser_cls.quickCheck().
+        """
+        if parser_cls not in self.stats:
+            self.stats[parser_cls] = [0, 0, 0]
+        stats = self.stats[parser_cls]
+        stats[0] += 1
+        if valid:
+            stats[1] += 1
+        if rejected:
+            stats[2] += 1
+
+    def guess(self, offset, parser_cls, size=None):
         """
-        Try the specified parser at stream offset 'offset'.
+        Try the specified parser at stream offset 'offset'. If size is set,
+        the parser only sees 'size' bits.
 
         Return the parser object, or None on failure.
         """
-        substream = InputSubStream(self.stream, offset)
+        substream = InputSubStream(self.stream, offset, size)
         try:
             return parser_cls(substream, validate=True)
         except HACHOIR_ERRORS:
@@ -0,0 +1,268 @@
+"""
+Streaming search: search subfiles in a non-seekable input (eg. stdin)
+keeping only a bounded window of data in memory.
+
+Memory usage is bounded by the window: window_size bytes after the
+search offset, plus the maximum magic offset (lookbehind) before it,
+in blocks of 64 KB (see InputPipe). Data outside the window can not be
+read: parsers reading outside the window fail, and content sizes which
+can not be computed within the window are replaced by max_extract.
+Extracted files are written incrementally, before their data leave
+the window.
+"""
+
+from hachoir_core.error import HACHOIR_ERRORS, error
+from hachoir_core.i18n import _
+from hachoir_core.stream import (InputStream, InputSubStream,
+    InputStreamError, StreamError)
+from hachoir_core.stream.input import InputPipe, ReadStreamError
+from hachoir_core.tools import humanFilesize
+from hachoir_subfile.search import (SearchSubfile, skipSubfile,
+    FILE_MAX_SIZE, PROGRESS_UPDATE)
+from sys import stderr
+from time import time
+
+WINDOW_SIZE = 16*1024*1024  # Default window size in bytes (16 MB)
+MAX_EXTRACT = 1024*1024     # Default size of extracted files of unknown size (1 MB)
+
+class WindowError(InputStreamError):
+    def __init__(self, address, size, stream):
+        InputStreamError.__init__(self,
+            _("Unable to read %s bits at address %s: outside the stream window %s..%s")
+            % (size, address, stream.window_start, stream.window_end))
+
+class WindowInputStream(InputStream):
+    """
+    Input stream reading a non-seekable file object, where only data of the
+    window [window_start; window_end[ (in bits) can be read. Data before the
+    window are discarded.
+    """
+    def __init__(self, input, window_size=WINDOW_SIZE*8, lookbehind=0, **args):
+        InputStream.__init__(self, **args)
+        self._input = InputPipe(input, self._setSize)
+        self.window_start = 0
+        self.setWindowSize(window_size, lookbehind)
+
+    def setWindowSize(self, window_size, lookbehind=0):
+        """
+        Set the window size: 'window_size' bits after the search offset and
+        'lookbehind' bits before it (multiple of 8 bits).
+        """
+        self.window_size = window_size
+        self.lookbehind = lookbehind
+        self.window_end = self.window_start + lookbehind + window_size
+        self._input.buffer_nb_min = self._input.buffer_nb_max = \
+            ((lookbehind + window_size) // 8 >> self._input.buffer_size) + 2
+
+    def __current_size(self):
+        if self._size:
+            return self._size
+        if self._input.size:
+            return 8 * self._input.size
+        return 8 * self._input.current_size
+    _current_size = property(__current_size)
+
+    def setWindowStart(self, start):
+        """
+        Move the window: it starts at 'start' (in bits).
+        """
+        self.window_start = start
+        self.window_end = start + self.lookbehind + self.window_size
+
+    def read(self, address, size):
+        assert size > 0
+        if address < self.window_start or self.window_end < address + size:
+            raise WindowError(address, size, self)
+        _size = self._size
+        address, shift = divmod(address, 8)
+        size = (size + shift + 7) >> 3
+        self._input.seek(address)
+        data = self._input.read(size)
+        got = len(data)
+        missing = size != got
+        if missing and _size == self._size:
+            raise ReadStreamError(8 * size, 8 * address, 8 * got)
+        return shift, data, missing
+
+class StreamSearchSubfile(SearchSubfile):
+    """
+    Search subfiles in a WindowInputStream. Files are extracted while the
+    window moves forward: extracted file of unknown size (or size larger
+    than FILE_MAX_SIZE) are truncated to max_extract bytes.
+    """
+    def __init__(self, stream, offset=0, size=None, max_extract=MAX_EXTRACT):
+        SearchSubfile.__init__(self, stream, offset, size)
+        if size is not None:
+            self.size = (offset + size) * 8
+        else:
+            self.size = None
+        self.max_extract = max_extract * 8
+        self.pending = []
+
+    def mainHeader(self):
+        if not self.patterns:
+            self.loadParsers()
+        self.slice_size = max(self.slice_size, self.patterns.max_length * 8)
+
+        # Magics at offset N: the beginning of the file is N bits before
+        # the search offset
+        lookbehind = 0
+        for item in self.patterns.string_patterns + self.patterns.regex_patterns:
+            lookbehind = max(lookbehind, item.user[0])
+        window_size = max(self.stream.window_size,
+            self.slice_size + self.patterns.max_length * 8)
+        self.stream.setWindowSize(window_size, (lookbehind + 7) // 8 * 8)
+
+        print >>stderr, "[+] Start search on a stream (window: %s)" % (
+            humanFilesize(self.stream.window_size // 8))
+        print >>stderr
+        self.stats = {}
+        self.current_offset = self.start_offset
+        self.main_start = time()
+
+    def searchSubfiles(self):
+        """
+        Search all subfiles, call processParser() for each parser, and then
+        write the end of the extracted files.
+        """
+        self.next_offset = None
+        self.next_progress = time() + PROGRESS_UPDATE
+        for offset, parser in self.searchRange(self.size):
+            self.processParser(offset, parser)
+        while self.pending:
+            self.moveWindow(self.stream.window_end)
+
+    def searchRange(self, end):
+        while end is None or self.current_offset < end:
+            self.moveWindow(self.current_offset - self.stream.lookbehind)
+            if not self.stream.sizeGe(self.current_offset + 8):
+                self.current_offset = min(self.current_offset, self.stream.size)
+                break
+            self.updateProgress()
+            slice_end = self.current_offset + self.slice_size
+            if end is not None:
+                slice_end = min(slice_end, end)
+            for item in self.findMagic(self.current_offset, slice_end):
+                yield item
+            self.current_offset += self.slice_size
+            if self.next_offset:
+                self.current_offset = max(self.current_offset, self.next_offset)
+            if end is not None:
+                self.current_offset = min(self.current_offset, end)
+
+    def guess(self, offset, parser_cls):
+        # The parser sees the data until the end of the window (or the end
+        # of the stream): it has a size, and can't read outside the window
+        stream = self.stream
+        if stream.sizeGe(stream.window_end):
+            end = stream.window_end
+        else:
+            end = stream.size
+        parser = SearchSubfile.guess(self, offset, parser_cls, end - offset)
+        if not parser and end == stream.window_end:
+            # Subfile bigger than the window: validate the parser on its
+            # header with a stream of unknown size. Its content size may be
+            # unknown (see extractFile() and skipSize())
+            parser = SearchSubfile.guess(self, offset, parser_cls)
+        return parser
+
+    def skipSize(self, offset, parser):
+        # The content size of a subfile bigger than the window may be
+        # unknown: skip its fields
+        if not skipSubfile(parser):
+            return None
+        size = parser.content_size
+        stream = self.stream
+        if size is None and stream.sizeGe(stream.window_end):
+            parser = parser.__class__(InputSubStream(stream, offset))
+            try:
+                size = parser.createContentSize()
+            except HACHOIR_ERRORS:
+                # The content size can't be computed within the window
+                size = self.parseSkipped(offset, parser)
+        return size
+
+    def parseSkipped(self, offset, parser):
+        """
+        Parse the fields of the subfile 'parser' found at 'offset' (with a
+        stream of unknown size), moving the window forward: the data of the
+        parsed fields are in the subfile. Returns the size of the parsed
+        fields (in bits).
+        """
+        stream = self.stream
+        size = 0
+        try:
+            for field in parser:
+                size = field.address + field.size
+                # Read the header of the next field in the window
+                if stream.window_end - self.slice_size <= offset + size:
+                    self.moveWindow(offset + size - stream.lookbehind)
+        except HACHOIR_ERRORS:
+            pass
+        return size
+
+    def readData(self, start, end):
+        if not self.stream.sizeGe(end):
+            # End of the stream: the size is now known
+            end = self.stream.size
+        return self.stream.readBytes(start, (end - start) // 8)
+
+    def moveWindow(self, start):
+        """
+        Move the window start to 'start' (in bits). Data of the extracted
+        files are written before leaving the window.
+        """
+        stream = self.stream
+        while stream.window_start < start:
+            self.writePending(stream.window_end)
+            stream.setWindowStart(min(start, stream.window_end))
+
+    def writePending(self, limit):
+        """
+        Write data of the extracted files until 'limit' (in bits).
+        """
+        stream = self.stream
+        if self.pending and not stream.sizeGe(limit):
+            limit = stream.size
+        for item in self.pending[:]:
+            output, address, end = item
+            size = min(end, limit) - address
+            try:
+                if 0 < size:
+                    self.output.copyFile(output, stream, address, size)
+                    item[1] = address = address + size
+            except StreamError, err:
+                error(u"copyFile() error: %s" % err)
+                address = end
+            if end <= address or limit == stream.size:
+                output.close()
+                self.pending.remove(item)
+
+    def extractFile(self, offset, parser):
+        size = parser.content_size
+        if size is None:
+            text = " (unknown size, extract %s)" % humanFilesize(self.max_extract // 8)
+            size = self.max_extract
+        elif size // 8 >= FILE_MAX_SIZE:
+            text = " (too big, extract %s)" % humanFilesize(self.max_extract // 8)
+            size = self.max_extract
+        else:
+            text = ""
+        if self.filter and not self.filter(parser):
+            return text
+        filename = self.output.createFilename(parser.filename_suffix)
+        filename, output = self.output.createFile(filename)
+        self.pending.append([output, offset, offset + size])
+        return text + " => %s" % filename
+
+    def displayProgress(self):
+        """
+        Display progress (to stdout): the size of the stream is unknown.
+        """
+        self.next_progress = time() + PROGRESS_UPDATE
+        offset = self.current_offset // 8
+        message = "Search: offset=%u (%s)" % (offset, humanFilesize(offset))
+        average = self.datarate.average
+        if average:
+            message += " -- %s/sec " % humanFilesize(average // 8)
+        print >>stderr, message
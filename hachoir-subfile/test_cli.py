@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Test the hachoir-subfile program: search generated images with one job,
+with --jobs and in streaming mode, and compare the found files.
+"""
+from cStringIO import StringIO
+from os import listdir, path
+from shutil import rmtree
+from subprocess import Popen, PIPE
+from tempfile import mkdtemp
+import sys
+import tarfile
+import zipfile
+
+PROGRAM = path.join(path.dirname(path.abspath(__file__)), "hachoir-subfile")
+IMAGE_SIZE = 1024*1024
+WINDOW_SIZE = 64*1024
+MAX_EXTRACT = 100000
+
+def createZip(size=0):
+    """
+    Create a ZIP archive, starting with a stored file of 'size' bytes if
+    size is not zero.
+    """
+    data = StringIO()
+    archive = zipfile.ZipFile(data, "w")
+    if size:
+        content = "".join("%07u\n" % index for index in xrange(size // 8))
+        archive.writestr(zipfile.ZipInfo("big.txt"), content)
+    archive.writestr("hello.txt", "Hello World!\n" * 10)
+    archive.writestr("data.bin", "".join(chr(index % 256) for index in xrange(3000)))
+    archive.close()
+    return data.getvalue()
+
+def createTar():
+    data = StringIO()
+    archive = tarfile.open(mode="w", fileobj=data)
+    info = tarfile.TarInfo("hello.txt")
+    content = "Hello World!\n" * 10
+    info.size = len(content)
+    archive.addfile(info, StringIO(content))
+    archive.close()
+    return data.getvalue()
+
+def createImage(filename, files):
+    """
+    Create an image of nul bytes containing the files 'files' (list of
+    (offset, content)). Returns the offsets.
+    """
+    image = open(filename, "wb")
+    image.truncate(IMAGE_SIZE)
+    for offset, content in files:
+        image.seek(offset)
+        image.write(content)
+    image.close()
+    return [offset for offset, content in files]
+
+def runSubfile(args, input=None):
+    """
+    Run hachoir-subfile with the arguments 'args' (list). If 'input' is
+    set, the file is written to its standard input.
+    """
+    sys.stdout.write("  - hachoir-subfile %s: " % " ".join(args))
+    if input:
+        input = open(input, "rb")
+    process = Popen([sys.executable, PROGRAM, "--quiet"] + args,
+        stdin=input, stdout=PIPE, stderr=PIPE)
+    stdout, stderr = process.communicate()
+    if process.returncode:
+        sys.stdout.write("error (exit code %s)!\n%s" % (process.returncode, stderr))
+        sys.exit(1)
+    sys.stdout.write("ok\n")
+    return [line for line in stdout.splitlines() if line.startswith("[+] File at ")]
+
+def getFiles(found):
+    """
+    Get the offset and the description of the found files, without the
+    extraction text.
+    """
+    files = []
+    for line in found:
+        text, description = line.split(": ", 1)
+        description = description.split(" => ")[0].split(" (")[0]
+        files.append((int(text.split()[3]), description))
+    return files
+
+def testJobs(directory):
+    print "--- Test --jobs"
+    filename = path.join(directory, "image")
+    # One archive crosses the boundary of the shards of --jobs 4
+    offsets = createImage(filename, (
+        (100000, createTar()),
+        (300000, createZip()),
+        (IMAGE_SIZE // 2 - 1000, createZip()),
+        (900000, createZip()),
+    ))
+    found = runSubfile([filename])
+    for offset in offsets:
+        if not [line for line in found if line.startswith("[+] File at %s " % offset)]:
+            print "File at %s not found!" % offset
+            sys.exit(1)
+    for jobs in (2, 4):
+        if runSubfile(["--jobs", str(jobs), filename]) != found:
+            print "Different result with --jobs %s!" % jobs
+            sys.exit(1)
+    print "--- End of test"
+
+def testStreaming(directory):
+    print "--- Test streaming mode"
+    filename = path.join(directory, "image")
+    # The size of the archives at 5000 and 450000 can not be computed in
+    # the window: they are extracted, truncated to MAX_EXTRACT bytes
+    createImage(filename, (
+        (5000, createZip(300000)),
+        (350000, createTar()),
+        (450000, createZip(300000)),
+        (900000, createZip()),
+    ))
+    found = getFiles(runSubfile([filename]))
+    if len(found) != 4:
+        print "Files not found: %s" % found
+        sys.exit(1)
+    output = path.join(directory, "output")
+    streamed = runSubfile(["--window", str(WINDOW_SIZE),
+        "--max-extract", str(MAX_EXTRACT), "-", output], filename)
+    if getFiles(streamed) != found:
+        print "Different result in streaming mode: %s" % streamed
+        sys.exit(1)
+    sizes = [path.getsize(path.join(output, name))
+        for name in sorted(listdir(output))]
+    if len(sizes) != 4 or sizes[0] != MAX_EXTRACT or sizes[2] != MAX_EXTRACT:
+        print "Invalid sizes of the extracted files: %s" % sizes
+        sys.exit(1)
+    print "--- End of test"
+
+def main():
+    directory = mkdtemp()
+    try:
+        testJobs(directory)
+        testStreaming(directory)
+    finally:
+        rmtree(directory)
+
+if __name__ == "__main__":
+    main()
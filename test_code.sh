@@ -27,3 +27,6 @@ $PYTHON $ROOT/hachoir-metadata/run_testcase.py $TESTCASE
 
 echo "=== hachoir-regex: tests ==="
 $PYTHON $ROOT/hachoir-regex/test_doc.py
+
+echo "=== hachoir-subfile: tests ==="
+$PYTHON $ROOT/hachoir-subfile/test_cli.py